@@ -0,0 +1,79 @@
+"""
+Benchmark of band-parallel compositing: the time of one Camera.render of a sprite-dense 1920x1080 scene
+for several values of Camera.workers, with the speed-up over one worker.
+Also checks that every worker count gives the same picture as one worker.
+Scaling needs as many free cores as workers; this script reports how many the machine has.
+
+Run with: python benchmarks/bands.py [max workers]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+path_here = Path(__file__).parent.resolve()
+sys.path.append(str(path_here.parent.absolute()))
+import numpy as np
+import pygame
+from engine import *
+from renderer import *
+
+WIDTH, HEIGHT = 1920, 1080
+SPRITES = 3000
+SPRITE_SIZES = (32, 64, 128)
+REPEAT_SECONDS = 2.0
+
+
+def makeScene(rng: np.random.Generator) -> Camera:
+    camera = GameObject("camera").addComponent(Camera)
+    SYSTEM.currentScene.surface = pygame.Surface((WIDTH, HEIGHT))
+    images = []
+    for size in SPRITE_SIZES:
+        for translucent in (False, True):
+            image = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+            if not translucent:
+                image[..., 3] = 255
+            images.append(image)
+    for i in range(SPRITES):
+        sprite = GameObject(f"sprite_{i}")
+        sprite.transform.position = Vector3(rng.uniform(-WIDTH / 2, WIDTH / 2), rng.uniform(-HEIGHT / 2, HEIGHT / 2), float(rng.integers(0, 8)))
+        sprite.addComponent(SpriteRenderer).image = images[i % len(images)]
+    return camera
+
+
+def timePerRender(camera: Camera, surface: pygame.Surface, components: list) -> float:
+    renders = 0
+    begin = time.perf_counter()
+    while True:
+        camera.render(surface, components)
+        renders += 1
+        elapsed = time.perf_counter() - begin
+        if elapsed >= REPEAT_SECONDS:
+            return elapsed / renders
+
+
+def main() -> None:
+    maxWorkers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    camera = makeScene(np.random.default_rng(0))
+    surface = SYSTEM.currentScene.surface
+    components = SYSTEM.currentScene.getAllComponents()
+    print(f"{os.cpu_count()} cores, {SPRITES} sprites, {WIDTH}x{HEIGHT}")
+
+    camera.workers = 1
+    camera.render(surface, components)
+    expected = camera.view.copy()
+    single = timePerRender(camera, surface, components)
+
+    print(f"{'workers':>8} {'ms':>9} {'speed-up':>9} {'same':>5}")
+    print(f"{1:>8} {single * 1e3:9.2f} {1.0:8.2f}x {'yes':>5}")
+    workers = 2
+    while workers <= maxWorkers:
+        camera.workers = workers
+        camera.render(surface, components)
+        same = np.array_equal(camera.view, expected)
+        current = timePerRender(camera, surface, components)
+        print(f"{workers:>8} {current * 1e3:9.2f} {single / current:8.2f}x {'yes' if same else 'NO':>5}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
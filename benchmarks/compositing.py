@@ -0,0 +1,107 @@
+"""
+Micro-benchmark of Camera.show: the cost of compositing one sprite at 16x16, 64x64 and 512x512,
+for opaque, binary-alpha and translucent images, next to the float blending Camera.show used before.
+Also checks that both give the same picture within 1 per channel.
+
+Run with: python benchmarks/compositing.py
+"""
+import sys
+import time
+from pathlib import Path
+path_here = Path(__file__).parent.resolve()
+sys.path.append(str(path_here.parent.absolute()))
+import numpy as np
+import pygame
+from engine import *
+from renderer import *
+
+SIZES = (16, 64, 512)
+REPEAT_SECONDS = 0.5
+
+
+def legacyShow(camera: Camera, image: np.ndarray, pos: Vector3) -> None:
+    """
+    The float blending of Camera.show before the integer kernel, kept as the reference.
+    """
+    size_image = image.shape[:2]
+    size_view = camera.view.shape[:2]
+    pos = camera.worldToScreen(pos)
+    px, py = int(pos.x), int(pos.y)
+    x0 = int(clamp(px, 0, size_view[1]))
+    x1 = int(clamp(px + size_image[1], 0, size_view[1]))
+    y0 = int(clamp(py, 0, size_view[0]))
+    y1 = int(clamp(py + size_image[0], 0, size_view[0]))
+    region_z = camera.z_buffer[y0:y1, x0:x1]
+    region_scr = camera.view[y0:y1, x0:x1]
+    region_img = image[y0 - py:y1 - py, x0 - px:x1 - px]
+    alpha = region_img[..., 3] / 255.0
+    final_mask = (alpha > 0) & (pos.z > region_z)
+    region_z[final_mask] = pos.z
+    alpha = alpha[..., np.newaxis]
+    region_scr[final_mask, :3] = (
+        alpha[final_mask] * region_img[final_mask, :3] +
+        (1 - alpha[final_mask]) * region_scr[final_mask, :3]
+    ).astype(np.uint8)
+    region_scr[final_mask, 3] = (
+        alpha[final_mask].squeeze() * 255 +
+        (1 - alpha[final_mask].squeeze()) * region_scr[final_mask, 3]
+    ).astype(np.uint8)
+
+
+KINDS = ("opaque", "binary", "translucent")
+
+
+def makeImage(size: int, kind: str, rng: np.random.Generator) -> np.ndarray:
+    image = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+    if kind != "translucent":
+        image[..., 3] = 255
+    if kind != "opaque":
+        # A quarter of the pixels fully transparent, the rest fully opaque or translucent.
+        image[rng.random((size, size)) < 0.25, 3] = 0
+    return image
+
+
+def resetView(camera: Camera, rng: np.random.Generator) -> None:
+    camera.view[...] = rng.integers(0, 256, camera.view.shape, dtype=np.uint8)
+    camera.z_buffer.fill(-float("inf"))
+
+
+def timePerCall(show, camera: Camera, image: np.ndarray, pos: Vector3) -> float:
+    calls = 0
+    camera.z_buffer.fill(-float("inf"))
+    begin = time.perf_counter()
+    while True:
+        # Every call lands in front of the last one, like the next sprite of a frame.
+        show(image, Vector3(pos.x, pos.y, calls))
+        calls += 1
+        elapsed = time.perf_counter() - begin
+        if elapsed >= REPEAT_SECONDS:
+            return elapsed / calls
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    camera_object = GameObject("camera")
+    camera = camera_object.addComponent(Camera)
+    SYSTEM.currentScene.surface = pygame.Surface((1024, 512))
+
+    print(f"{'sprite':>10} {'kind':>12} {'legacy us':>10} {'integer us':>11} {'speed-up':>9} {'max diff':>9}")
+    for size in SIZES:
+        pos = Vector3(-size / 2, size / 2, 0)
+        for kind in KINDS:
+            image = makeImage(size, kind, rng)
+
+            resetView(camera, np.random.default_rng(1))
+            legacyShow(camera, image, pos)
+            expected = camera.view.copy()
+            resetView(camera, np.random.default_rng(1))
+            camera.show(image, pos)
+            difference = int(np.abs(camera.view.astype(np.int16) - expected).max())
+
+            legacy = timePerCall(lambda i, p: legacyShow(camera, i, p), camera, image, pos)
+            current = timePerCall(camera.show, camera, image, pos)
+            print(f"{size}x{size:<6} {kind:>12} {legacy * 1e6:10.1f} {current * 1e6:11.1f} {legacy / current:8.1f}x {difference:9d}")
+
+
+if __name__ == "__main__":
+    main()
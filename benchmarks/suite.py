@@ -0,0 +1,342 @@
+"""
+Benchmark suite of the engine's hot paths. Every stage is timed on its own, on synthetic scenes built
+the way the examples build theirs: the shooting pattern (bullets with a Rigidbody and a continuous Collider
+flying through a grid of enemy colliders) and the platformer pattern (animated sprites over a Tilemap level).
+Sizes are parametrized: --scale multiplies all of them, and --sprites, --colliders, --bodies, --depth
+and --tilemap set one of them on its own. --filter only builds and times the stages it selects.
+
+Results are written as JSON. Given a baseline from an earlier run, every stage slower than the baseline
+by more than the tolerance is reported as a regression and the exit status is 1.
+
+Run with: python benchmarks/suite.py [--scale 1] [--sprites N] [--colliders N] [--bodies N] [--depth N] [--tilemap N]
+                                     [--output results.json] [--baseline baseline.json]
+                                     [--tolerance 0.25] [--seconds 0.5] [--filter name]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+path_here = Path(__file__).parent.resolve()
+sys.path.append(str(path_here.parent.absolute()))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import numpy as np
+import pygame
+from engine import *
+from renderer import *
+from physic import *
+from tilemap import *
+
+# The sizes of the scenes at --scale 1, with what they count.
+SIZES = {
+    "sprites": 2000,
+    "colliders": 400,
+    "bodies": 200,
+    "depth": 32,
+    "tilemap": 128,
+}
+SIZE_HELP = {
+    "sprites": "animated sprites of the platformer scene",
+    "colliders": "static enemy colliders of the shooting scene",
+    "bodies": "continuous bullets of the shooting scene",
+    "depth": "depth of the transform hierarchy",
+    "tilemap": "width and height of the tilemap, in tiles",
+}
+VIEW_SIZE = (1024, 512)
+BULLET_LAYER = 1
+ROUNDS = 5
+
+
+def measure(call: Callable[[], object], seconds: float) -> float:
+    """
+    Times a call. It runs in ROUNDS rounds of about seconds / ROUNDS each,
+    and the fastest round is kept as the least disturbed by the rest of the machine.
+    :return: The time of one call in seconds.
+    """
+    best = float("inf")
+    for _ in range(ROUNDS):
+        calls = 0
+        begin = time.perf_counter()
+        while True:
+            call()
+            calls += 1
+            elapsed = time.perf_counter() - begin
+            if elapsed >= seconds / ROUNDS:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+class Stages(dict[str, float]):
+    """
+    The results of one benchmark. Only the stages selected with --filter are measured.
+    """
+    def __init__(self, selected: str, seconds: float):
+        super().__init__()
+        self.selected = selected
+        self.seconds = seconds
+    def wants(self, name: str) -> bool:
+        return self.selected in name
+    def measure(self, name: str, call: Callable[[], object], per: int = 1) -> None:
+        """
+        Times a stage if it is selected.
+        :param per: How many operations one call does; the time is given per operation.
+        """
+        if self.wants(name):
+            self[name] = measure(call, self.seconds) / per
+
+
+def newScene() -> Camera:
+    """
+    Replaces the current scene with an empty one holding a camera and an off-screen surface.
+    """
+    SYSTEM.currentScene = Scene()
+    SYSTEM.currentScene.surface = pygame.Surface(VIEW_SIZE)
+    camera = GameObject("camera").addComponent(Camera)
+    SYSTEM.time.start()
+    return camera
+
+
+def randomImage(rng: np.random.Generator, size: int, translucent: bool) -> np.ndarray:
+    image = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+    if not translucent:
+        image[..., 3] = 255
+    return image
+
+
+class Animator(Behaviour):
+    """
+    Cycles a sprite through its frames, like the coins of the platformer.
+    """
+    def __init__(self, gameObject: GameObject):
+        super().__init__(gameObject)
+        self.renderer: SpriteRenderer = self.gameObject.addComponent(SpriteRenderer)
+        self.frames: list[np.ndarray] = []
+        self.mode = 0
+        self.dt = 0.0
+    def update(self) -> None:
+        self.dt += Time.deltaTime
+        if self.dt > 0.2:
+            self.dt -= 0.2
+            self.mode = (self.mode + 1) % len(self.frames)
+        self.renderer.image = self.frames[self.mode]
+
+
+class Bullet(Behaviour):
+    """
+    A bullet of the shooting example that wraps back to the bottom of the screen instead of leaving it.
+    """
+    def __init__(self, gameObject: GameObject):
+        super().__init__(gameObject)
+        self.renderer = self.gameObject.addComponent(SpriteRenderer)
+        self.renderer.image = Asset.rectImage(10, 10, (0, 255, 0, 255))
+        self.body = self.gameObject.addComponent(Rigidbody)
+        self.body.velocity = Vector3(0, 500, 0)
+        self.body.collisionDetection = CollisionDetection.Continuous
+        self.collider = self.gameObject.addComponent(Collider)
+        self.collider.contour = np.array([[-5, -5], [5, -5], [5, 5], [-5, 5]])
+        self.collider.layer = BULLET_LAYER
+    def update(self) -> None:
+        position = self.gameObject.transform.position
+        if position.y > VIEW_SIZE[1] / 2:
+            self.gameObject.transform.position = Vector3(position.x, -VIEW_SIZE[1] / 2, 0)
+
+
+def platformerScene(sizes: dict[str, int], rng: np.random.Generator) -> Camera:
+    camera = newScene()
+    frames = [randomImage(rng, 32, translucent) for translucent in (False, True, False, True)]
+    for i in range(sizes["sprites"]):
+        sprite = GameObject(f"coin_{i}")
+        sprite.transform.position = Vector3(rng.uniform(-VIEW_SIZE[0], VIEW_SIZE[0]), rng.uniform(-VIEW_SIZE[1], VIEW_SIZE[1]), float(i % 4))
+        animator = sprite.addComponent(Animator)
+        animator.frames = frames
+        animator.mode = i % len(frames)
+    return camera
+
+
+def shootingScene(sizes: dict[str, int], rng: np.random.Generator) -> Camera:
+    camera = newScene()
+    Physics.ignoreLayerCollision(BULLET_LAYER, BULLET_LAYER)
+    columns = max(1, int(np.sqrt(sizes["colliders"] * 2)))
+    enemy = randomImage(rng, 50, False)
+    for i in range(sizes["colliders"]):
+        obj = GameObject(f"enemy_{i}")
+        obj.transform.position = Vector3((i % columns - columns / 2) * 30, (i // columns) * 30, 0)
+        obj.addComponent(Collider).contour = np.array([[-12, -12], [12, -12], [12, 12], [-12, 12]])
+        obj.addComponent(SpriteRenderer).image = enemy
+    for i in range(sizes["bodies"]):
+        bullet = GameObject(f"bullet_{i}")
+        bullet.transform.position = Vector3(rng.uniform(-VIEW_SIZE[0] / 2, VIEW_SIZE[0] / 2), rng.uniform(-VIEW_SIZE[1] / 2, VIEW_SIZE[1] / 2), 1)
+        bullet.addComponent(Bullet)
+    # Let the broadphase and the contacts settle first.
+    for _ in range(3):
+        SYSTEM.step(1 / 60)
+    return camera
+
+
+def benchComponents(sizes: dict[str, int], stages: Stages, rng: np.random.Generator) -> None:
+    platformerScene(sizes, rng)
+    scene = SYSTEM.currentScene
+    toggled = GameObject("toggled")
+    toggled.addComponent(SpriteRenderer)
+    def rebuild() -> None:
+        toggled.active = not toggled.active
+        scene.getAllComponents()
+    stages.measure("getAllComponents.cached", scene.getAllComponents)
+    stages.measure("getAllComponents.rebuild", rebuild)
+    stages.measure("Scene.update", scene.update)
+
+
+def benchHierarchy(sizes: dict[str, int], stages: Stages, rng: np.random.Generator) -> None:
+    newScene()
+    root = GameObject("root")
+    node = root
+    for i in range(sizes["depth"]):
+        node = GameObject(f"node_{i}", node.transform)
+        node.transform.localPosition = Vector3(1, 1, 0)
+    leaf = node.transform
+    def moveRoot() -> None:
+        root.transform.position = Vector3(rng.uniform(-1, 1), 0, 0)
+        leaf.position
+    stages.measure("Transform.hierarchy", moveRoot)
+
+
+def benchPhysics(sizes: dict[str, int], stages: Stages, rng: np.random.Generator) -> None:
+    shootingScene(sizes, rng)
+    scene = SYSTEM.currentScene
+    bullets = [c for c in scene.getComponents(Collider) if c.layer == BULLET_LAYER]
+    enemies = [c for c in scene.getComponents(Collider) if c.layer != BULLET_LAYER]
+    pairs = [(bullet, enemies[i % len(enemies)]) for i, bullet in enumerate(bullets)]
+    def check() -> None:
+        for collider in bullets:
+            collider.check()
+    def isTouch() -> None:
+        for a, b in pairs:
+            a.isTouch(b)
+    stages.measure("SYSTEM.step.shooting", lambda: SYSTEM.step(1 / 60))
+    stages.measure("Collider.check", check, len(bullets))
+    stages.measure("Collider.isTouch", isTouch, len(pairs))
+
+
+def benchRendering(sizes: dict[str, int], stages: Stages, rng: np.random.Generator) -> None:
+    camera = platformerScene(sizes, rng)
+    scene = SYSTEM.currentScene
+    surface = scene.surface
+    components = scene.getAllComponents()
+    for translucent in (False, True):
+        image = randomImage(rng, 64, translucent)
+        depth = [0.0]
+        def show() -> None:
+            # Every call lands in front of the last one, like the next sprite of a frame.
+            depth[0] += 1
+            camera.show(image, Vector3(-32, 32, depth[0]))
+        camera.z_buffer.fill(-float("inf")) # type: ignore
+        stages.measure(f"Camera.show.{'translucent' if translucent else 'opaque'}64", show)
+    stages.measure("Camera.render.sprites", lambda: camera.render(surface, components)) # type: ignore
+    camera.render(surface, components) # type: ignore
+    presentation = camera._presentation()
+    stages.measure("Camera.present", lambda: surface.blit(presentation, (0, 0))) # type: ignore
+
+
+def benchTilemap(sizes: dict[str, int], stages: Stages, rng: np.random.Generator) -> None:
+    camera = newScene()
+    size = sizes["tilemap"]
+    tiles = [[randomImage(rng, 16, translucent) for translucent in (False, True, False)] for _ in range(2)]
+    grid = rng.integers(0, 7, (size, size))
+    grid[rng.random(grid.shape) < 0.5] = 0
+    obj = GameObject("map")
+    obj.transform.position = Vector3(-size * 16, size * 16, 0)
+    tilemap = obj.addComponent(Tilemap)
+    tilemap.setTileset(tiles, 32, 32)
+    def bake() -> None:
+        tilemap.grid = grid
+        tilemap.apply()
+    bake()
+    scene = SYSTEM.currentScene
+    components = scene.getAllComponents()
+    stages.measure("Tilemap.bake", bake)
+    stages.measure("Camera.render.tilemap", lambda: camera.render(scene.surface, components)) # type: ignore
+
+
+# Every benchmark with the stages it times, so --filter can skip building the scenes of the others.
+BENCHMARKS: tuple[tuple[Callable[[dict[str, int], Stages, np.random.Generator], None], tuple[str, ...]], ...] = (
+    (benchComponents, ("getAllComponents.cached", "getAllComponents.rebuild", "Scene.update")),
+    (benchHierarchy, ("Transform.hierarchy",)),
+    (benchPhysics, ("SYSTEM.step.shooting", "Collider.check", "Collider.isTouch")),
+    (benchRendering, ("Camera.show.opaque64", "Camera.show.translucent64", "Camera.render.sprites", "Camera.present")),
+    (benchTilemap, ("Tilemap.bake", "Camera.render.tilemap")),
+)
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """
+    Prints every stage against the baseline.
+    :return: The stages slower than the baseline by more than tolerance.
+    """
+    regressions: list[str] = []
+    print(f"\n{'stage':<28} {'baseline us':>12} {'now us':>12} {'ratio':>7}")
+    for name, value in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<28} {'-':>12} {value * 1e6:12.2f} {'new':>7}")
+            continue
+        ratio = value / before
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {before * 1e6:12.2f} {value * 1e6:12.2f} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Times the engine's hot paths on synthetic scenes.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies every scene size.")
+    parser.add_argument("--seconds", type=float, default=0.5, help="The time spent measuring each stage.")
+    parser.add_argument("--output", type=Path, help="Where to write the results as JSON.")
+    parser.add_argument("--baseline", type=Path, help="Results of an earlier run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="How much slower than the baseline a stage may be.")
+    parser.add_argument("--filter", default="", help="Only run the stages whose name contains this.")
+    for name, meaning in SIZE_HELP.items():
+        parser.add_argument(f"--{name}", type=int, help=f"The number of {meaning}, instead of the scaled default.")
+    args = parser.parse_args()
+
+    pygame.init()
+    sizes = {name: max(1, int(size * args.scale)) if getattr(args, name) is None else getattr(args, name) for name, size in SIZES.items()}
+    results: dict[str, float] = {}
+    for benchmark, names in BENCHMARKS:
+        stages = Stages(args.filter, args.seconds)
+        if not any(stages.wants(name) for name in names):
+            continue
+        benchmark(sizes, stages, np.random.default_rng(0))
+        for name, value in stages.items():
+            results[name] = value
+            print(f"{name:<28} {value * 1e6:12.2f} us")
+
+    report = {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "sizes": sizes,
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("sizes") != sizes:
+            print(f"\nWARN : the baseline was run with other sizes: {baseline.get('sizes')}")
+        if compare(results, baseline["results"], args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 from abc import ABCMeta, abstractmethod
+from collections import deque
 from enum import Enum
+import csv
+import json
 import time
-from typing import Annotated, Any, TypeVar
+from typing import Annotated, Any, Callable, Generic, Iterator, TypeVar
 from pathlib import Path
 import cv2
 import numpy as np
@@ -60,9 +63,99 @@ class _Asset:
         return tiles
 Asset = _Asset(Path(__file__).parent.resolve())
 
+class Atlas:
+    """
+    Packs many BGRA images into one buffer, so sprites share one allocation instead of one each.
+    Images are added by name, optionally resized and flipped, and read back as views into the buffer.
+    Views are zero-copy and can be given to SpriteRenderer.image or Camera.show directly.
+    """
+    def __init__(self, width: int = 1024):
+        """
+        Creates an empty atlas.
+        :param width: The width of the buffer. It grows to fit an image wider than this.
+        """
+        self.width = width
+        self.image: cv2.typing.MatLike = np.zeros((0, width, 4), dtype=np.uint8)
+        # The place of every image in the buffer, as (x, y, width, height) in pixels.
+        self.rects: dict[str, tuple[int, int, int, int]] = {}
+        self._sources: dict[str, cv2.typing.MatLike] = {}
+        self._views: dict[str, cv2.typing.MatLike] = {}
+        self._packed = True
+    def add(self, name: str, image: cv2.typing.MatLike, width: int | None = None, height: int | None = None, flipX: bool = False, flipY: bool = False, interpolation: int = cv2.INTER_NEAREST) -> None:
+        """
+        Adds an image, or replaces the image of the same name. The atlas is packed again on the next read.
+        :param name: The name to read the image back with.
+        :param image: The BGRA image.
+        :param width: The width to resize the image to. Defaults to its own width.
+        :param height: The height to resize the image to. Defaults to its own height.
+        :param flipX: Whether to mirror the image left to right.
+        :param flipY: Whether to mirror the image top to bottom.
+        :param interpolation: The cv2 interpolation used to resize.
+        """
+        size = (width or image.shape[1], height or image.shape[0])
+        if size != (image.shape[1], image.shape[0]):
+            image = cv2.resize(image, size, interpolation=interpolation)
+        if flipX:
+            image = image[:, ::-1]
+        if flipY:
+            image = image[::-1]
+        self._sources[name] = image
+        self._packed = False
+    def addTileMap(self, name: str, tiles: list[list[cv2.typing.MatLike]], width: int | None = None, height: int | None = None, flipX: bool = False, flipY: bool = False, interpolation: int = cv2.INTER_NEAREST) -> list[list[str]]:
+        """
+        Adds every tile of Asset.splitTileMap, named "{name}_{row}_{column}".
+        The other parameters are those of add.
+        :return: The names of the tiles, in the layout of tiles.
+        """
+        names: list[list[str]] = []
+        for y, row in enumerate(tiles):
+            names.append([])
+            for x, tile in enumerate(row):
+                names[-1].append(f"{name}_{y}_{x}")
+                self.add(names[-1][-1], tile, width, height, flipX, flipY, interpolation)
+        return names
+    def get(self, name: str) -> cv2.typing.MatLike:
+        """
+        Returns the view of an image into the buffer, packing the atlas first if images were added.
+        Views read before a new pack stay valid but keep the old buffer alive.
+        :param name: The name the image was added with.
+        """
+        if not self._packed:
+            self.pack()
+        return self._views[name]
+    def __getitem__(self, name: str) -> cv2.typing.MatLike:
+        return self.get(name)
+    def __contains__(self, name: str) -> bool:
+        return name in self._sources
+    def pack(self) -> None:
+        """
+        Places all the images on shelves, tallest first, and copies them into a new buffer.
+        """
+        width = max([self.width, *(image.shape[1] for image in self._sources.values())])
+        rects: dict[str, tuple[int, int, int, int]] = {}
+        x = y = shelf = 0
+        for name, image in sorted(self._sources.items(), key=lambda item: -item[1].shape[0]):
+            h, w = image.shape[:2]
+            if x + w > width:
+                x, y, shelf = 0, y + shelf, 0
+            rects[name] = (x, y, w, h)
+            x += w
+            shelf = max(shelf, h)
+        buffer = np.zeros((y + shelf, width, 4), dtype=np.uint8)
+        views: dict[str, cv2.typing.MatLike] = {}
+        for name, (x, y, w, h) in rects.items():
+            view = views[name] = buffer[y:y + h, x:x + w]
+            view[...] = self._sources[name]
+            # The buffer holds the pixels now.
+            self._sources[name] = view
+        self.image, self.rects, self._views = buffer, rects, views
+        self._packed = True
+
 
 
 class Vector3:
+    # Called for every new vector while set, such as by the profiler to count allocations.
+    _onCreate: "Callable[[], None] | None" = None
     def __init__(self, x: float, y: float, z: float=0):
         """
         Initializes a 3D vector with x, y, and z coordinates.
@@ -73,6 +166,8 @@ class Vector3:
         self.x = x
         self.y = y
         self.z = z
+        if Vector3._onCreate is not None:
+            Vector3._onCreate()
     
     def asNumpy(self) -> Annotated[NDArray[np.float64], (2,)]:
         """
@@ -122,6 +217,123 @@ class Vector3:
     def right(cls) -> "Vector3": return Vector3(1, 0, 0)
     
     
+Bounds = tuple[float, float, float, float]
+K = TypeVar("K")
+class SpatialHash(Generic[K]):
+    """
+    A uniform grid that maps axis-aligned bounding boxes (xmin, ymin, xmax, ymax) to the items they belong to.
+    Queries only visit the cells overlapping the requested area, so their cost scales with the number of nearby items.
+    """
+    def __init__(self, cellSize: float = 128.0):
+        """
+        Initializes an empty spatial hash.
+        :param cellSize: The width and height of a grid cell in world units.
+        """
+        self.cellSize = cellSize
+        self._cells: dict[tuple[int, int], dict[K, None]] = {}
+        self._items: dict[K, tuple[Bounds, tuple[int, int, int, int]]] = {}
+    
+    def _cellRange(self, bounds: Bounds) -> tuple[int, int, int, int]:
+        size = self.cellSize
+        return (int(bounds[0] // size), int(bounds[1] // size), int(bounds[2] // size), int(bounds[3] // size))
+    def insert(self, item: K, bounds: Bounds) -> None:
+        """
+        Inserts an item, or moves it if it is already in the hash.
+        Cells are only touched when the item crosses a cell boundary.
+        :param item: The item to insert.
+        :param bounds: The bounding box of the item.
+        """
+        cells = self._cellRange(bounds)
+        previous = self._items.get(item)
+        if previous is not None:
+            if previous[1] == cells:
+                self._items[item] = (bounds, cells)
+                return
+            self.remove(item)
+        self._items[item] = (bounds, cells)
+        for cx in range(cells[0], cells[2] + 1):
+            for cy in range(cells[1], cells[3] + 1):
+                self._cells.setdefault((cx, cy), {})[item] = None
+    def remove(self, item: K) -> None:
+        """
+        Removes an item from the hash. Does nothing if the item is not present.
+        :param item: The item to remove.
+        """
+        previous = self._items.pop(item, None)
+        if previous is None:
+            return
+        cells = previous[1]
+        for cx in range(cells[0], cells[2] + 1):
+            for cy in range(cells[1], cells[3] + 1):
+                bucket = self._cells[(cx, cy)]
+                del bucket[item]
+                if not bucket:
+                    del self._cells[(cx, cy)]
+    def bounds(self, item: K) -> Bounds:
+        """
+        Returns the bounding box an item was inserted with.
+        :param item: The item to look up.
+        """
+        return self._items[item][0]
+    def query(self, bounds: Bounds) -> list[K]:
+        """
+        Finds all items whose bounding box overlaps the given one (touching edges count as overlapping).
+        :param bounds: The area to search.
+        :return: The overlapping items, without duplicates.
+        """
+        xmin, ymin, xmax, ymax = bounds
+        cells = self._cellRange(bounds)
+        if (cells[2] - cells[0] + 1) * (cells[3] - cells[1] + 1) > len(self._items):
+            # The area spans more cells than there are items, so checking every item is cheaper.
+            return [
+                item for item, (other, _) in self._items.items()
+                if other[0] <= xmax and xmin <= other[2] and other[1] <= ymax and ymin <= other[3]
+            ]
+        found: dict[K, None] = {}
+        for cx in range(cells[0], cells[2] + 1):
+            for cy in range(cells[1], cells[3] + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for item in bucket:
+                    if item in found:
+                        continue
+                    other = self._items[item][0]
+                    if other[0] <= xmax and xmin <= other[2] and other[1] <= ymax and ymin <= other[3]:
+                        found[item] = None
+        return list(found)
+    def cells(self) -> Iterator[list[K]]:
+        """
+        Iterates over the occupied cells, yielding the items of each cell.
+        Items spanning several cells are yielded once per cell.
+        """
+        for bucket in self._cells.values():
+            yield list(bucket)
+    def clear(self) -> None:
+        self._cells.clear()
+        self._items.clear()
+    def __contains__(self, item: object) -> bool:
+        return item in self._items
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _TrackedVector3(Vector3):
+    """
+    A Vector3 that reports in-place changes of its fields to its owner.
+    Arithmetic on it returns plain Vector3 objects.
+    """
+    def __init__(self, x: float, y: float, z: float, onChange: "Callable[[_TrackedVector3], None]"):
+        object.__setattr__(self, "_onChange", None)
+        super().__init__(x, y, z)
+        object.__setattr__(self, "_onChange", onChange)
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        onChange = self._onChange
+        if onChange is not None:
+            onChange(self)
+
+
 class Positionable:
     def __init__(self, position: Vector3 | None = None, rotation: float | None = None, scale: Vector3 | None = None):
         """
@@ -130,11 +342,106 @@ class Positionable:
         :param rotation: The local rotation of the object in degrees (default is 0.0).
         :param scale: The local scale of the object (default is Vector3.one()).
         """
+        self._children: list[Transform] = []
+        self._listeners: list[Callable[[], None]] = []
+        
+        # World values are cached and resolved lazily. A dirty node always has dirty descendants.
+        self._worldDirty = True
+        self._worldX = self._worldY = self._worldZ = 0.0
+        self._worldRotation = 0.0
+        self._worldScale = (1.0, 1.0, 0.0)
+        
         self.localPosition = position if position else Vector3.zero()
         self.rotation = rotation if rotation else 0.0
         self.scale = scale if scale else Vector3.one()
-        
-        self._children: list[Transform] = []
+    
+    @property
+    def localPosition(self) -> Vector3:
+        return self._localPosition
+    @localPosition.setter
+    def localPosition(self, value: Vector3) -> None:
+        self._localPosition = _TrackedVector3(value.x, value.y, value.z, self._onLocalChanged)
+        self._invalidate()
+    @property
+    def rotation(self) -> float:
+        return self._rotation
+    @rotation.setter
+    def rotation(self, value: float) -> None:
+        self._rotation = value
+        self._invalidate()
+    @property
+    def scale(self) -> Vector3:
+        return self._scale
+    @scale.setter
+    def scale(self, value: Vector3) -> None:
+        self._scale = _TrackedVector3(value.x, value.y, value.z, self._onLocalChanged)
+        self._invalidate()
+    
+    def addListener(self, listener: Callable[[], None]) -> None:
+        """
+        Registers a callback that is called when the world values of this object become stale,
+        because it or one of its parents has been moved, rotated, scaled or reparented.
+        Changes to the object itself are always reported; changes inherited from a parent are
+        only reported while the cached world values are clean.
+        :param listener: The callback to register.
+        """
+        self._listeners.append(listener)
+    def removeListener(self, listener: Callable[[], None]) -> None:
+        """
+        Removes a callback registered with addListener.
+        :param listener: The callback to remove.
+        """
+        self._listeners.remove(listener)
+    
+    @property
+    def worldRotation(self) -> float:
+        """
+        The rotation of the object in degrees, accumulated over all of its parents.
+        """
+        if self._worldDirty:
+            self._resolveWorld()
+        return self._worldRotation
+    @property
+    def worldScale(self) -> Vector3:
+        """
+        The scale of the object, multiplied over all of its parents.
+        """
+        if self._worldDirty:
+            self._resolveWorld()
+        return Vector3(*self._worldScale)
+    
+    def _setLocalPosition(self, x: float, y: float, z: float) -> None:
+        # Fast path for systems that move many objects: updates the tracked vector in place.
+        local = self._localPosition
+        object.__setattr__(local, "x", x)
+        object.__setattr__(local, "y", y)
+        object.__setattr__(local, "z", z)
+        self._invalidate()
+    
+    def _resolveWorld(self) -> None:
+        local = self._localPosition
+        scale = self._scale
+        self._worldX, self._worldY, self._worldZ = local.x, local.y, local.z
+        self._worldRotation = self._rotation
+        self._worldScale = (scale.x, scale.y, scale.z)
+        self._worldDirty = False
+    def _invalidate(self) -> None:
+        if self._worldDirty:
+            # Descendants are already dirty, but listeners of this node still hear about every direct change.
+            for listener in self._listeners:
+                listener()
+            return
+        stack: list[Positionable] = [self]
+        while stack:
+            node = stack.pop()
+            if node._worldDirty:
+                continue
+            node._worldDirty = True
+            for listener in node._listeners:
+                listener()
+            stack.extend(node._children)
+    def _onLocalChanged(self, _: Vector3) -> None:
+        self._invalidate()
     @property
     def parent(self) -> "Positionable":
         raise NotImplementedError("Cannot get parent of Positionable.")
@@ -178,6 +485,13 @@ class Scene:
         self.transform = SceneTransform(self)
         self.view: ScreenView | None = None
         self.surface: pygame.Surface | None = None
+        
+        self._registry: dict[type[Component], dict[Component, None]] = {}
+        self._snapshot: list[Component] | None = None
+        self._snapshotOrders = -1
+        self._byType: dict[type, list[Component]] = {}
+        self._version = 0
+        self._systems: dict[type[SceneSystem], SceneSystem] = {}
     
     def screenToView(self, pos: Vector3) -> Vector3:
         """
@@ -257,32 +571,95 @@ class Scene:
         :return: None
         """
         if self.view:
-            self.view.render(surface, self.getAllComponents())
+            profiler = SYSTEM.profiler
+            if profiler.enabled:
+                start = time.perf_counter()
+                self.view.render(surface, self.getAllComponents())
+                profiler.record("render", "phase", start, time.perf_counter())
+            else:
+                self.view.render(surface, self.getAllComponents())
     def getAllComponents(self) -> list["Component"]:
         """
-        Collects all components in the scene, sorted by their defined order in SYSTEM.orders.
+        Returns all active components in the scene, sorted by their defined order in SYSTEM.orders.
+        Components of the same type come in the order they entered the scene, by being added, activated or
+        reparented into it; leaving and entering again puts a component last. This is not the order of the hierarchy:
+        it decides which of two components of a type updates first, and which of two sprites at the same depth is drawn on top.
+        The list is a cached snapshot that is only rebuilt when the registry or the orders change,
+        so callers must not modify it.
         :return: A list of all components in the scene, sorted by their order.
         """
-        
-        components: dict[type[Component], list[Component]] = {key: [] for key in SYSTEM.orders.keys()}
-        
-        
-        queue: list[Transform] = [transform for transform in self.transform.children if transform.gameObject.active]
-        while queue:
-            current = queue.pop(0)
-            for c in current.children:
-                if c.gameObject.active:
-                    queue.append(c)
+        if self._snapshot is None or self._snapshotOrders != SYSTEM.orders.version:
+            results: list[Component] = []
+            for type_, _ in sorted(SYSTEM.orders.items(), key=lambda x: x[1]):
+                bucket = self._registry.get(type_)
+                if bucket:
+                    results.extend(bucket)
+            self._snapshot = results
+            self._snapshotOrders = SYSTEM.orders.version
+            self._byType.clear()
+        return self._snapshot
+    def getComponents(self, component: "type[T]") -> "list[T]":
+        """
+        Returns all active components in the scene that are instances of the given type.
+        The list is cached alongside the snapshot of getAllComponents and must not be modified.
+        :param component: The component type (or base class) to filter by.
+        :return: A list of matching components, in the same order as getAllComponents.
+        """
+        components = self.getAllComponents()
+        cached = self._byType.get(component)
+        if cached is None:
+            cached = self._byType[component] = [c for c in components if isinstance(c, component)]
+        return cached # type: ignore
+    @property
+    def version(self) -> int:
+        """
+        A counter that increases every time a component enters or leaves the scene.
+        """
+        return self._version
+    
+    def getSystem(self, system: "type[S]") -> "S":
+        """
+        Returns the instance of a scene system for this scene, creating it on first use.
+        A new system is told about every component already in the scene.
+        :param system: The SceneSystem subclass to get.
+        :return: The system instance owned by this scene.
+        """
+        instance = self._systems.get(system)
+        if instance is None:
+            instance = self._systems[system] = system(self)
+            for component in self.getAllComponents():
+                instance.onComponentAdded(component)
+        return instance # type: ignore
+    
+    def _register(self, component: "Component") -> None:
+        bucket = self._registry.setdefault(type(component), {})
+        if component in bucket:
+            return
+        bucket[component] = None
+        self._invalidate()
+        for system in self._systems.values():
+            system.onComponentAdded(component)
+    def _unregister(self, component: "Component") -> None:
+        bucket = self._registry.get(type(component))
+        if bucket is None or component not in bucket:
+            return
+        del bucket[component]
+        self._invalidate()
+        for system in self._systems.values():
+            system.onComponentRemoved(component)
+    def _registerTree(self, transform: "Transform") -> None:
+        for current in _walkActive(transform):
             for component in current.gameObject.components:
-                components[type(component)].append(component)
-        
-
-        results: list[Component] = []
-        for type_, _ in sorted(SYSTEM.orders.items(), key=lambda x: x[1]):
-                results.extend(components[type_])
-                
-        
-        return results
+                self._register(component)
+    def _unregisterTree(self, transform: "Transform") -> None:
+        for current in _walkActive(transform):
+            for component in current.gameObject.components:
+                self._unregister(component)
+    def _invalidate(self) -> None:
+        self._snapshot = None
+        self._byType.clear()
+        self._version += 1
+    
     def start(self) -> None:
         """
         Starts all components in the scene.
@@ -291,44 +668,299 @@ class Scene:
             component.start()
     def update(self) -> None:
         """
-        Updates all components in the scene.
+        Updates all components in the scene, then the scene systems.
         """
+        if SYSTEM.profiler.enabled:
+            SYSTEM.profiler._run(self, "update")
+            return
         for component in self.getAllComponents():
             component.update()
+        for system in list(self._systems.values()):
+            system.update()
     def fixedUpdate(self) -> None:
         """
-        Fixed update for all components in the scene.
+        Fixed update for all components in the scene, then the scene systems.
         """
+        if SYSTEM.profiler.enabled:
+            SYSTEM.profiler._run(self, "fixedUpdate")
+            return
         for component in self.getAllComponents():
             component.fixedUpdate()
+        for system in list(self._systems.values()):
+            system.fixedUpdate()
+
+class SceneSystem:
+    """
+    Base class for services that belong to a scene and follow the components entering and leaving it,
+    such as spatial indices. Use Scene.getSystem to get the instance of a scene.
+    Systems are updated after the components of their scene.
+    """
+    def __init__(self, scene: Scene):
+        self.scene = scene
+    def onComponentAdded(self, component: "Component") -> None: ...
+    def onComponentRemoved(self, component: "Component") -> None: ...
+    def update(self) -> None: ...
+    def fixedUpdate(self) -> None: ...
+S = TypeVar("S", bound=SceneSystem)
+
+class ProfiledFrame:
+    """
+    The timings of one frame recorded by the profiler.
+    """
+    def __init__(self, index: int, start: float):
+        self.index = index
+        # perf_counter times in seconds.
+        self.start = start
+        self.end = start
+        # Every timed span as (name, category, start, end). Categories are frame, phase, component and system.
+        self.events: list[tuple[str, str, float, float]] = []
+        # The total time of every name over the frame, in seconds.
+        self.totals: dict[str, float] = {}
+        # Work done during the frame, such as "physics.sat" tests or "render.pixels", by name.
+        self.counters: dict[str, int] = {}
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+class _Profiler:
+    """
+    Opt-in timing of every frame: the phases of the main loop (update, fixedUpdate, render, present)
+    and, inside update and fixedUpdate, every component class and scene system.
+    Alongside the timings, every frame counts the work done by the physics, the rendering and the scene,
+    so a growing count can be told apart from a slower constant factor.
+    The last frames are kept in a ring buffer and can be exported as a Chrome trace or as CSV.
+    While disabled, the engine only pays for checking enabled once per phase, and Vector3 for checking its creation hook.
+    """
+    def __init__(self, capacity: int = 300):
+        """
+        :param capacity: How many frames to keep.
+        """
+        self._enabled = False
+        self.frames: deque[ProfiledFrame] = deque(maxlen=capacity)
+        self._current: ProfiledFrame | None = None
+        self._count = 0
+        self._vectors = 0
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        if value == self._enabled:
+            return
+        self._enabled = value
+        # Vector3 allocations are only counted while enabled, through the creation hook of Vector3.
+        if value:
+            Vector3._onCreate = self._countVector
+        elif Vector3._onCreate == self._countVector:
+            Vector3._onCreate = None
+    @property
+    def capacity(self) -> int:
+        return self.frames.maxlen or 0
+    @capacity.setter
+    def capacity(self, value: int) -> None:
+        self.frames = deque(self.frames, maxlen=value)
+    
+    def beginFrame(self) -> None:
+        """
+        Starts recording a new frame, ending the current one. Called by the main loops.
+        """
+        if self._current is not None:
+            self.endFrame()
+        self._current = ProfiledFrame(self._count, time.perf_counter())
+        self._count += 1
+        self._vectors = 0
+    def endFrame(self) -> None:
+        """
+        Ends the current frame and stores it in the ring buffer.
+        """
+        frame = self._current
+        if frame is None:
+            return
+        frame.end = time.perf_counter()
+        frame.events.append(("frame", "frame", frame.start, frame.end))
+        if self._vectors:
+            frame.counters["engine.vectors"] = frame.counters.get("engine.vectors", 0) + self._vectors
+            self._vectors = 0
+        self.frames.append(frame)
+        self._current = None
+    def record(self, name: str, category: str, start: float, end: float) -> None:
+        """
+        Records a timed span in the current frame, starting one if needed.
+        :param name: What was timed, such as a phase or "ClassName.update".
+        :param category: The kind of span: phase, component or system.
+        :param start: The perf_counter time it started at.
+        :param end: The perf_counter time it ended at.
+        """
+        if self._current is None:
+            self.beginFrame()
+        frame: ProfiledFrame = self._current # type: ignore
+        frame.events.append((name, category, start, end))
+        frame.totals[name] = frame.totals.get(name, 0.0) + end - start
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Adds to a work counter of the current frame, starting one if needed.
+        Callers check enabled first, so counting costs nothing while disabled.
+        :param name: What was counted, as "area.what", such as "physics.sat".
+        :param amount: How much work was done.
+        """
+        if self._current is None:
+            self.beginFrame()
+        counters = self._current.counters # type: ignore
+        counters[name] = counters.get(name, 0) + amount
+    def clear(self) -> None:
+        self.frames.clear()
+        self._current = None
+    def _countVector(self) -> None:
+        self._vectors += 1
+    @property
+    def counters(self) -> dict[str, int]:
+        """
+        The work counters of the last recorded frame, empty if there is none.
+        """
+        return dict(self.frames[-1].counters) if self.frames else {}
+    
+    def top(self, count: int = 5, frames: int = 60, categories: tuple[str, ...] = ("component", "system")) -> list[tuple[str, float]]:
+        """
+        Returns what took the most time on average over the last frames.
+        :param count: How many entries to return.
+        :param frames: How many of the last frames to average over.
+        :param categories: The kinds of spans to rank.
+        :return: (name, seconds per frame) pairs, slowest first.
+        """
+        recent = list(self.frames)[-frames:]
+        if not recent:
+            return []
+        kinds = {event[0]: event[1] for frame in recent for event in frame.events}
+        totals: dict[str, float] = {}
+        for frame in recent:
+            for name, total in frame.totals.items():
+                if kinds[name] in categories:
+                    totals[name] = totals.get(name, 0.0) + total
+        ranked = sorted(totals.items(), key=lambda item: -item[1])[:count]
+        return [(name, total / len(recent)) for name, total in ranked]
+    def exportChromeTrace(self, path: str | Path) -> None:
+        """
+        Writes the recorded frames in the Chrome trace-event format, for chrome://tracing or Perfetto.
+        :param path: The JSON file to write.
+        """
+        frames = list(self.frames)
+        origin = frames[0].start if frames else 0.0
+        events = [
+            {"name": name, "cat": category, "ph": "X", "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6, "pid": 1, "tid": 1, "args": {"frame": frame.index}}
+            for frame in frames for name, category, start, end in frame.events
+        ]
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+    def exportCSV(self, path: str | Path) -> None:
+        """
+        Writes one row per recorded frame: its index, its duration in milliseconds and every work counter.
+        Counters a frame did not touch are 0.
+        :param path: The CSV file to write.
+        """
+        frames = list(self.frames)
+        names = sorted({name for frame in frames for name in frame.counters})
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "duration_ms", *names])
+            for frame in frames:
+                writer.writerow([frame.index, f"{frame.duration * 1e3:.3f}", *(frame.counters.get(name, 0) for name in names)])
+    
+    def _run(self, scene: "Scene", method: str) -> None:
+        # Scene.update or Scene.fixedUpdate, timed. Components of a class are contiguous in the snapshot,
+        # so each run of one class is timed as a whole instead of every component.
+        begin = start = time.perf_counter()
+        kind: type | None = None
+        components = scene.getAllComponents()
+        self.count("scene.components", len(components))
+        for component in components:
+            if type(component) is not kind:
+                now = time.perf_counter()
+                if kind is not None:
+                    self.record(f"{kind.__name__}.{method}", "component", start, now)
+                kind, start = type(component), now
+            getattr(component, method)()
+        if kind is not None:
+            self.record(f"{kind.__name__}.{method}", "component", start, time.perf_counter())
+        for system in list(scene._systems.values()):
+            start = time.perf_counter()
+            getattr(system, method)()
+            self.record(f"{type(system).__name__}.{method}", "system", start, time.perf_counter())
+        self.record(method, "phase", begin, time.perf_counter())
 
 class _Time:
+    """
+    The game clock. Runs variable-rate frames and a fixed-rate simulation on top of them:
+    every frame adds its duration to an accumulator, and update() reports how many fixed steps
+    of fixedScale seconds fit into it.
+    """
     def __init__(self):
         self.__lastUpdate = 0.0
-        self.__nextFixedUpdate = 0.01
         self.__deltaTime = 0.0
+        self.__accumulator = 0.0
+        self.__alpha = 1.0
+        self.__inFixedStep = False
+        # The duration of a fixed step in seconds. 0 runs exactly one fixed step per frame.
         self.fixedScale = 0.0
+        # The most fixed steps a single frame may run. Time beyond that is dropped, so a slow frame cannot snowball.
+        self.maxSubSteps = 5
     
     
     
     @property
     def deltaTime(self) -> float: 
+        """
+        The duration of the current frame, or of the current fixed step while inside fixedUpdate.
+        """
+        if self.__inFixedStep:
+            return self.fixedDeltaTime
         return self.__deltaTime
     @property
+    def fixedDeltaTime(self) -> float:
+        """
+        The duration of a fixed step. Equals the frame time when fixedScale is 0.
+        """
+        return self.fixedScale if self.fixedScale > 0 else self.__deltaTime
+    @property
+    def alpha(self) -> float:
+        """
+        How far the current frame is between the last two fixed steps, from 0 to 1.
+        Used to draw objects between their previous and current physics state.
+        """
+        return self.__alpha
+    @property
     def lastUpdate(self) -> float:
         return self.__lastUpdate
     
     def start(self) -> None:
-        self.__lastUpdate = time.time()
-        self.__nextFixedUpdate = self.__lastUpdate + self.fixedScale
-    def update(self) -> bool:
-        now = time.time()
-        self.__deltaTime = now - self.__lastUpdate
+        self.__lastUpdate = time.perf_counter()
+        self.__accumulator = 0.0
+        self.__alpha = 1.0
+    def update(self, deltaTime: float | None = None) -> int:
+        """
+        Advances the clock by one frame.
+        :param deltaTime: The frame duration to use instead of the measured one, for deterministic stepping.
+        :return: The number of fixed steps to run this frame.
+        """
+        if deltaTime is None:
+            now = time.perf_counter()
+            deltaTime = now - self.__lastUpdate
+        else:
+            now = self.__lastUpdate + deltaTime
+        self.__deltaTime = deltaTime
         self.__lastUpdate = now
-        if now >= self.__nextFixedUpdate:
-            self.__nextFixedUpdate += self.fixedScale
-            return True
-        return False
+        if self.fixedScale <= 0:
+            self.__alpha = 1.0
+            return 1
+        self.__accumulator += deltaTime
+        steps = int(self.__accumulator // self.fixedScale)
+        self.__accumulator -= steps * self.fixedScale
+        if steps > self.maxSubSteps:
+            steps = self.maxSubSteps
+        self.__alpha = min(self.__accumulator / self.fixedScale, 1.0)
+        return steps
+    def _beginFixedStep(self) -> None:
+        self.__inFixedStep = True
+    def _endFixedStep(self) -> None:
+        self.__inFixedStep = False
 
 class KeyMotion(Enum):
     Idle = 0
@@ -358,6 +990,24 @@ class _Input:
     def getMousePosition(self) -> Vector3:
         return Vector3(*pygame.mouse.get_pos())
 
+class _ComponentOrders(dict[type["Component"], int]):
+    """
+    The execution order of component types.
+    Keeps a version counter so scenes know when their cached ordering is stale.
+    """
+    def __init__(self):
+        super().__init__()
+        self.version = 0
+    def __setitem__(self, key: type["Component"], value: int) -> None:
+        super().__setitem__(key, value)
+        self.version += 1
+    def __delitem__(self, key: type["Component"]) -> None:
+        super().__delitem__(key)
+        self.version += 1
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self.version += 1
+
 class System:
     def __init__(self):
         self.currentScene = Scene()
@@ -366,10 +1016,31 @@ class System:
         
         self.input = _Input()
         
-        self.orders: dict[type[Component], int] = {}
+        self.orders = _ComponentOrders()
+        
+        self.profiler = _Profiler()
+    
+    def step(self, deltaTime: float | None = None) -> int:
+        """
+        Advances the current scene by one frame: updates the clock, runs update once
+        and then fixedUpdate as many times as the accumulated time requires.
+        :param deltaTime: The frame duration to use instead of the measured one, for deterministic stepping.
+        :return: The number of fixed steps that were run.
+        """
+        steps = self.time.update(deltaTime)
+        scene = self.currentScene
+        scene.update()
+        for _ in range(steps):
+            self.time._beginFixedStep()
+            try:
+                scene.fixedUpdate()
+            finally:
+                self.time._endFixedStep()
+        return steps
 SYSTEM = System()
 Time = SYSTEM.time
 Input = SYSTEM.input
+Profiler = SYSTEM.profiler
 
 class Component(metaclass=ABCMeta):
     def __init__(self, gameObject: "GameObject"):
@@ -435,6 +1106,8 @@ class Transform(UniqueComponent, Positionable):
         UniqueComponent.__init__(self, gameObject)
         Positionable.__init__(self, position, rotation, scale)
         self._parent = parent
+        # Local position before the last fixed step, set by the physics world for interpolated bodies.
+        self._interpolationFrom: tuple[float, float, float] | None = None
         parent._children.append(self)
     
     @property
@@ -443,9 +1116,28 @@ class Transform(UniqueComponent, Positionable):
     @parent.setter
     def parent(self, value: "Positionable") -> None:
         if self._parent is not value:
+            wasActive, oldScene = self.activeInHierarchy, self.scene
             self._parent._children.remove(self)
             value._children.append(self)
             self._parent = value
+            self._invalidate()
+            nowActive, newScene = self.activeInHierarchy, self.scene
+            if wasActive != nowActive or oldScene is not newScene:
+                if wasActive:
+                    oldScene._unregisterTree(self)
+                if nowActive:
+                    newScene._registerTree(self)
+    @property
+    def activeInHierarchy(self) -> bool:
+        """
+        Whether this transform and all of its ancestors belong to active GameObjects.
+        """
+        node: Positionable = self
+        while isinstance(node, Transform):
+            if not node.gameObject.active:
+                return False
+            node = node._parent
+        return True
     @property
     def scene(self) -> Scene:
         parent = self._parent
@@ -456,24 +1148,105 @@ class Transform(UniqueComponent, Positionable):
     
     @property
     def position(self) -> Vector3:
-        return self.localPosition + self._parent.position
+        """
+        The world position of the object. Every read returns a new vector that stays bound to the object:
+        editing it in place, as in position.y += 1, moves the object like assigning it, even through a variable
+        holding an earlier read. To work on a copy, build one with Vector3(position.x, position.y, position.z).
+        """
+        if self._worldDirty:
+            self._resolveWorld()
+        return _TrackedVector3(self._worldX, self._worldY, self._worldZ, self._onWorldMutated)
     @position.setter
     def position(self, value: Vector3) -> None:
         self.localPosition = value - self._parent.position
+    
+    def _resolveWorld(self) -> None:
+        parent = self._parent
+        if parent._worldDirty:
+            parent._resolveWorld()
+        local = self._localPosition
+        scale = self._scale
+        parentScale = parent._worldScale
+        self._worldX = local.x + parent._worldX
+        self._worldY = local.y + parent._worldY
+        self._worldZ = local.z + parent._worldZ
+        self._worldRotation = self._rotation + parent._worldRotation
+        self._worldScale = (scale.x * parentScale[0], scale.y * parentScale[1], scale.z * parentScale[2])
+        self._worldDirty = False
+    @property
+    def renderPosition(self) -> Vector3:
+        """
+        The world position to draw the object at. Transforms moved by the fixed-step simulation
+        are placed between their previous and current state according to Time.alpha.
+        """
+        position = self.position
+        alpha = SYSTEM.time.alpha
+        if alpha >= 1.0:
+            return position
+        back = 1.0 - alpha
+        x, y, z = position.x, position.y, position.z
+        node: Positionable = self
+        while isinstance(node, Transform):
+            start = node._interpolationFrom
+            if start is not None:
+                local = node._localPosition
+                x += (start[0] - local.x) * back
+                y += (start[1] - local.y) * back
+                z += (start[2] - local.z) * back
+            node = node._parent
+        return Vector3(x, y, z)
+    def _onWorldMutated(self, value: Vector3) -> None:
+        # An in-place edit of a vector handed out by position writes the whole vector back.
+        self.position = value
 
 T = TypeVar("T", bound=Component)
+
+def _walkActive(root: Transform) -> Iterator[Transform]:
+    """
+    Walks the hierarchy below root in breadth-first order, skipping inactive subtrees.
+    The root itself is always yielded.
+    """
+    queue: list[Transform] = [root]
+    index = 0
+    while index < len(queue):
+        current = queue[index]
+        index += 1
+        yield current
+        for child in current.children:
+            if child.gameObject.active:
+                queue.append(child)
+
 class GameObject:
     def __init__(self, name: str = "GameObject", parent: "Transform | None" = None):
         self.name = name
         self.tags: list[str] = []
-        self.active = True
+        self._active = True
         self.components: list[Component] = []
         
         self.transform: Transform = Transform(self, parent if parent else SYSTEM.currentScene.transform, Vector3.zero(), 0.0, Vector3.one())
         self.components.append(self.transform)
+        if self.transform.activeInHierarchy:
+            self.transform.scene._register(self.transform)
+    @property
+    def active(self) -> bool:
+        return self._active
+    @active.setter
+    def active(self, value: bool) -> None:
+        if self._active == value:
+            return
+        self._active = value
+        parent = self.transform.parent
+        if isinstance(parent, Transform) and not parent.activeInHierarchy:
+            return
+        if value:
+            self.transform.scene._registerTree(self.transform)
+        else:
+            self.transform.scene._unregisterTree(self.transform)
     def addComponent(self, component: type[T]) -> T:
         new_component = component(self)
         self.components.append(new_component)
+        if self.transform.activeInHierarchy:
+            self.transform.scene._register(new_component)
         return new_component
     def getComponent(self, component: type[T]) -> T:
         for c in self.components:
@@ -63,11 +63,12 @@ class BallScript(Behaviour):
         self.body: Rigidbody = self.gameObject.addComponent(Rigidbody)
         self.body.velocity = Vector3(200, 100, 0)
         
-    def update(self) -> None:
-        if self.collider.isTouch(board1.getComponent(Collider)) or self.collider.isTouch(board2.getComponent(Collider)):
+    def onTriggerEnter(self, other: Collider) -> None:
+        if other.gameObject is board1 or other.gameObject is board2:
             self.body.velocity.x = -self.body.velocity.x
             self.gameObject.transform.position.x += self.body.velocity.x * 0.01
         
+    def update(self) -> None:
         if self.gameObject.transform.position.y < -250:
             self.body.velocity.y = 100
         if self.gameObject.transform.position.y > 250:
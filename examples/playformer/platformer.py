@@ -6,14 +6,21 @@ sys.path.append(str(path_here.parent.parent.absolute()))
 from engine import *
 from renderer import *
 from physic import *
+from tilemap import *
 
 
 path_platformer = path_here / "assets" / "Simple 2D Platformer BE2"
 image_player_grid = Asset.splitTileMap(Asset.loadImage(str(path_platformer / "Sprites" / "Player.png")), 16, 16, 1, 1)
-image_player1_right = cv2.resize(image_player_grid[0][0], (64, 64), interpolation=cv2.INTER_NEAREST)
-image_player2_right = cv2.resize(image_player_grid[0][1], (64, 64), interpolation=cv2.INTER_NEAREST)
-image_player1_left = cv2.flip(image_player1_right, 1)
-image_player2_left = cv2.flip(image_player2_right, 1)
+atlas = Atlas()
+atlas.add("player1_right", image_player_grid[0][0], 64, 64)
+atlas.add("player2_right", image_player_grid[0][1], 64, 64)
+atlas.add("player1_left", image_player_grid[0][0], 64, 64, flipX=True)
+atlas.add("player2_left", image_player_grid[0][1], 64, 64, flipX=True)
+names_coin = atlas.addTileMap("coin", Asset.splitTileMap(Asset.loadImage(str(path_platformer / "Sprites" / "Coins.png")), 16, 16, 1, 1)[-1:], 64, 64)[0]
+image_player1_right = atlas["player1_right"]
+image_player2_right = atlas["player2_right"]
+image_player1_left = atlas["player1_left"]
+image_player2_left = atlas["player2_left"]
 
 player = GameObject("player")
 class PlayerScript(Behaviour):
@@ -97,8 +104,7 @@ class ResizeSky(Behaviour):
         surface = SYSTEM.currentScene.surface
         if surface is None: return
         campos = camera.transform.position
-        campos.z = -10
-        self.gameObject.transform.position = campos
+        self.gameObject.transform.position = Vector3(campos.x, campos.y, -10)
 obj_sky = GameObject("sky")
 # obj_sky.addComponent(SpriteRenderer).image = cv2.resize(image_sky, (1024, 812), interpolation=cv2.INTER_AREA)
 # obj_sky.addComponent(ResizeSky)
@@ -111,21 +117,13 @@ MAP = [
     [10, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11, 11],
 ]
 
-tileindex = {x+3*y+1: (x, y) for y in range(len(tiles)) for x in range(len(tiles[y]))}
-pos_delta = Vector3(-400, 0, 0)
-for x in range(len(MAP)):
-    for y in range(len(MAP[x])):
-        if MAP[x][y] == 0: continue
-        obj = GameObject(f"tile_{x}_{y}")
-        tile_x, tile_y = tileindex[MAP[x][y]]
-        obj.addComponent(SpriteRenderer).image = cv2.resize(tiles[tile_y][tile_x], (64, 64), interpolation=cv2.INTER_NEAREST)
-        obj.transform.position = Vector3(y * 64, -x * 64, 0) + pos_delta
-        obj.addComponent(Collider).contour = np.array([[-32, -32], [32, -32], [32, 32], [-32, 32]])
-
-image_coin_grid = [
-    cv2.resize(image, (64, 64), interpolation=cv2.INTER_NEAREST)
-    for image in Asset.splitTileMap(Asset.loadImage(str(path_platformer / "Sprites" / "Coins.png")), 16, 16, 1, 1)[-1]
-]
+obj_map = GameObject("map")
+obj_map.transform.position = Vector3(-400, 0, 0)
+tilemap = obj_map.addComponent(Tilemap)
+tilemap.setTileset(tiles, 64, 64)
+tilemap.grid = MAP
+
+image_coin_grid = [atlas[name] for name in names_coin]
 class CoinScript(Behaviour):
     def __init__(self, gameObject: "GameObject"):
         super().__init__(gameObject)
@@ -143,10 +141,11 @@ class CoinScript(Behaviour):
             self.dt -= 0.2
             self.mode = (self.mode + 1) % len(image_coin_grid)
         self.renderer.image = image_coin_grid[self.mode]
-        if self.collider.isTouch(player.getComponent(Collider)):
-            self.collider.contour = None
-            self.renderer.image = None
-            self.exist = False
+    def onTriggerEnter(self, other: Collider) -> None:
+        if not self.exist or other.gameObject is not player: return
+        self.collider.contour = None
+        self.renderer.image = None
+        self.exist = False
 coin1 = GameObject("coin1")
 coin1.transform.position = Vector3(-140, 50, 50)
 coin1.addComponent(CoinScript)
@@ -10,6 +10,9 @@ from ui import *
 camera = GameObject("camera")
 camera.addComponent(Camera)
 
+BULLET_LAYER = 1
+Physics.ignoreLayerCollision(BULLET_LAYER, BULLET_LAYER)
+
 class BulletScript(Behaviour):
     def __init__(self, gameObject: "GameObject"):
         super().__init__(gameObject)
@@ -17,21 +20,22 @@ class BulletScript(Behaviour):
         self.renderer.image = Asset.rectImage(10, 10, (0, 255, 0, 255))
         self.body = self.gameObject.addComponent(Rigidbody)
         self.body.velocity = Vector3(0, 500, 0)
+        self.body.collisionDetection = CollisionDetection.Continuous
         self.collider = self.gameObject.addComponent(Collider)
         self.collider.contour = np.array([[-5, -5], [5, -5], [5, 5], [-5, 5]])
+        self.collider.layer = BULLET_LAYER
 
-    def update(self) -> None:
+    def onCollisionEnter(self, other: Collider) -> None:
         global kill_count
-        colli_target = self.collider.check()
-        if colli_target:
-            self.renderer.image = None
-            self.body.velocity = Vector3(0, 0, 0)
-            self.collider.contour = None
-            
-            colli_target.contour = None
-            colli_target.gameObject.getComponent(SpriteRenderer).image = None
-            
-            kill_count += 1
+        if self.collider.contour is None: return
+        self.renderer.image = None
+        self.body.velocity = Vector3(0, 0, 0)
+        self.collider.contour = None
+        
+        other.contour = None
+        other.gameObject.getComponent(SpriteRenderer).image = None
+        
+        kill_count += 1
 
 
 class PlayerScript(Behaviour):
@@ -1,4 +1,6 @@
-from typing import Annotated
+from enum import Enum
+from typing import Annotated, Sequence
+import itertools
 import cv2
 from numpy.typing import NDArray
 import numpy as np
@@ -6,6 +8,54 @@ import engine
 import renderer
 
 ColliderContour = Annotated[NDArray[np.float64], (None, 2)]
+_serials = itertools.count()
+
+class _Physics:
+    """
+    Global physics settings.
+    Holds the layer matrix deciding which collider layers can touch each other; pairs of ignored layers are
+    dropped before any geometry test.
+    """
+    layerCount = 32
+    def __init__(self) -> None:
+        self._layerMatrix = np.ones((self.layerCount, self.layerCount), dtype=bool)
+        # Bumped on every change of the layer matrix, so physics worlds know to test all pairs again.
+        self.version = 0
+    
+    def ignoreLayerCollision(self, layerA: int, layerB: int, ignore: bool = True) -> None:
+        """
+        Make colliders on two layers ignore each other, or collide again.
+        :param layerA: The first layer.
+        :param layerB: The second layer. It may be the same as layerA.
+        :param ignore: True to ignore the pair of layers, False to let them collide.
+        """
+        self._layerMatrix[layerA, layerB] = self._layerMatrix[layerB, layerA] = not ignore
+        self.version += 1
+    def getIgnoreLayerCollision(self, layerA: int, layerB: int) -> bool:
+        """
+        Check if colliders on two layers ignore each other.
+        """
+        return not self._layerMatrix[layerA, layerB]
+    
+    # Spatial queries on the physics world of the current scene. See PhysicsWorld for the parameters.
+    def raycast(self, origin: engine.Vector3, direction: engine.Vector3, maxDistance: float = np.inf,
+                layerMask: int = ~0, includeTriggers: bool = False) -> "RaycastHit | None":
+        return self._world().raycast(origin, direction, maxDistance, layerMask, includeTriggers)
+    def raycastMany(self, origins: NDArray[np.float64], directions: NDArray[np.float64], maxDistance: float = np.inf,
+                    layerMask: int = ~0, includeTriggers: bool = False) -> "list[RaycastHit | None]":
+        return self._world().raycastMany(origins, directions, maxDistance, layerMask, includeTriggers)
+    def overlapPoint(self, point: engine.Vector3, layerMask: int = ~0, includeTriggers: bool = True) -> "list[Collider]":
+        return self._world().overlapPoint(point, layerMask, includeTriggers)
+    def overlapPoints(self, points: NDArray[np.float64], layerMask: int = ~0, includeTriggers: bool = True) -> "list[list[Collider]]":
+        return self._world().overlapPoints(points, layerMask, includeTriggers)
+    def overlapBox(self, bounds: engine.Bounds, layerMask: int = ~0, includeTriggers: bool = True) -> "list[Collider]":
+        return self._world().overlapBox(bounds, layerMask, includeTriggers)
+    def overlapCircle(self, center: engine.Vector3, radius: float, layerMask: int = ~0, includeTriggers: bool = True) -> "list[Collider]":
+        return self._world().overlapCircle(center, radius, layerMask, includeTriggers)
+    def _world(self) -> "PhysicsWorld":
+        return engine.SYSTEM.currentScene.getSystem(PhysicsWorld)
+Physics = _Physics()
+
 class Collider(engine.Component):
     """
     Collider component for detecting collisions with other colliders in the scene.
@@ -13,19 +63,110 @@ class Collider(engine.Component):
     """
     def __init__(self, gameObject: engine.GameObject) -> None:
         super().__init__(gameObject)
+        self._world: PhysicsWorld | None = None
+        # Orders contact pairs independently of where the colliders sit in the physics arrays.
+        self._serial = next(_serials)
+        self._body: Rigidbody | None = None
+        self._localBounds: engine.Bounds | None = None
+        self._points: NDArray[np.float64] | None = None
+        self._axes: NDArray[np.float64] | None = None
+        self._layer = 0
         self.contour: ColliderContour | None = None
         self.isTrigger: bool = False
+        # Make sure the scene steps its physics world from now on.
+        self.gameObject.transform.scene.getSystem(PhysicsWorld)
+    
+    @property
+    def contour(self) -> ColliderContour | None:
+        """
+        The convex outline of the collider, relative to the position of its GameObject.
+        Assign a new array to change it; in-place edits are not tracked.
+        """
+        return self._contour
+    @contour.setter
+    def contour(self, value: ColliderContour | None) -> None:
+        self._contour = value
+        if value is None:
+            self._points = None
+            self._axes = None
+            self._localBounds = None
+        else:
+            self._points = np.asarray(value, dtype=np.float64)
+            self._axes = _edgeAxes(self._points)
+            mins = np.min(value, axis=0)
+            maxs = np.max(value, axis=0)
+            self._localBounds = (float(mins[0]), float(mins[1]), float(maxs[0]), float(maxs[1]))
+        self._onMoved()
+    
+    @property
+    def bounds(self) -> engine.Bounds | None:
+        """
+        The world-space bounding box (xmin, ymin, xmax, ymax) of the collider, or None if it has no contour.
+        """
+        local = self._localBounds
+        if local is None:
+            return None
+        pos = self.gameObject.transform.position
+        return (local[0] + pos.x, local[1] + pos.y, local[2] + pos.x, local[3] + pos.y)
+    
+    @property
+    def layer(self) -> int:
+        """
+        The collision layer of the collider, from 0 to 31. See Physics.ignoreLayerCollision.
+        """
+        return self._layer
+    @layer.setter
+    def layer(self, value: int) -> None:
+        if not 0 <= value < Physics.layerCount:
+            raise ValueError(f"Layer must be between 0 and {Physics.layerCount - 1}.")
+        self._layer = value
+        self._onMoved()
+    @property
+    def isStatic(self) -> bool:
+        """
+        True if there is no Rigidbody on the GameObject of this collider.
+        Static colliders are kept in their own broadphase and are never tested against each other by the physics world.
+        """
+        return self._body is None
+    
+    def _onMoved(self) -> None:
+        if self._world is not None:
+            self._world._markDirty(self)
+    def _attach(self, world: "PhysicsWorld") -> None:
+        self._world = world
+        self._body = world._bodyOf(self.gameObject)
+        self._bindBody()
+        self.gameObject.transform.addListener(self._onMoved)
+        world._markDirty(self)
+    def _detach(self) -> None:
+        if self._world is None:
+            return
+        self.gameObject.transform.removeListener(self._onMoved)
+        self._world.broadphase.remove(self)
+        self._world.staticBroadphase.remove(self)
+        if self._body is not None and self._body.collider is self:
+            self._body.collider = None
+        self._world = None
+        self._body = None
+    def _bindBody(self) -> None:
+        # The first collider to meet a Rigidbody becomes its collider, whichever of the two was added first.
+        if self._body is not None and self._body.collider is None:
+            self._body.collider = self
 
     def check(self) -> "Collider | None":
         """
-        Check if this collider is touching any other non-trigger colliders in the scene.
-        :return: True if touching any collider, False otherwise.
+        Check if this collider is touching any other collider in the scene, skipping layers it ignores.
+        This is a lookup into the contact pairs computed by the PhysicsWorld at the last fixed step.
+        A static collider touching nothing else is also tested on demand against the other static colliders.
+        :return: The first collider found touching this one, or None.
         """
-        for component in self.gameObject.transform.scene.getAllComponents():
-            if isinstance(component, Collider) and component != self:
-                if self.isTouch(component):
-                    return component
-        return None
+        world = self.gameObject.transform.scene.getSystem(PhysicsWorld)
+        contacts = world.contactsOf(self)
+        if contacts:
+            return contacts[0]
+        if self._world is not world or not self.isStatic:
+            return None
+        return world._staticContact(self)
 
     def isTouch(self, other: "Collider") -> bool:
         """
@@ -34,35 +175,874 @@ class Collider(engine.Component):
         :param other: The other collider to check for collision.
         :return: True if colliding, False otherwise.
         """
-        colli1 = self.contour
-        colli2 = other.contour
-        if colli1 is None or colli2 is None:
-            return False
+        return self.penetration(other) is not None
+
+    def penetration(self, other: "Collider") -> engine.Vector3 | None:
+        """
+        Compute the minimum translation vector (MTV) that separates this collider from another one.
+        :param other: The other collider to check for collision.
+        :return: The shortest vector moving this collider out of the other one, or None if they are not colliding.
+        """
+        if self._points is None or other._points is None:
+            return None
+        mtv = _sat(
+            self._points, self._axes, self.gameObject.transform.position.asNumpy(),
+            other._points, other._axes, other.gameObject.transform.position.asNumpy()
+        )
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled:
+            profiler.count("physics.sat")
+            if mtv is None:
+                profiler.count("physics.satEarlyOut")
+        if mtv is None:
+            return None
+        return engine.Vector3(float(mtv[0]), float(mtv[1]), 0)
+
+    def isTouchMany(self, others: Sequence["Collider"]) -> NDArray[np.bool_]:
+        """
+        Check this collider against many colliders with a single batched SAT test.
+        Colliders on layers this one ignores are never touching.
+        :param others: The colliders to test against.
+        :return: A boolean array with one entry per collider in others.
+        """
+        return ~np.isnan(self.penetrationMany(others)[:, 0])
+
+    def penetrationMany(self, others: Sequence["Collider"]) -> NDArray[np.float64]:
+        """
+        Compute the minimum translation vectors against many colliders with a single batched SAT test.
+        Colliders on layers this one ignores are dropped before the test, as in the contacts of the physics world.
+        :param others: The colliders to test against.
+        :return: An array of shape (len(others), 2) holding the MTV for each collider, or NaN where they are not colliding.
+        """
+        result = np.full((len(others), 2), np.nan)
+        if self._points is None:
+            return result
+        allowed = Physics._layerMatrix[self._layer]
+        index = [i for i, other in enumerate(others) if other._points is not None and allowed[other._layer]]
+        if not index:
+            return result
+        candidates = [others[i] for i in index]
+        points, axes = _pack([c._points for c in candidates], [c._axes for c in candidates]) # type: ignore
+        offsets = np.array([c.gameObject.transform.position.asNumpy() for c in candidates])
+        result[index] = _satMany(self._points, self._axes, self.gameObject.transform.position.asNumpy(), points, axes, offsets)
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled:
+            profiler.count("physics.sat", len(index))
+            profiler.count("physics.satEarlyOut", int(np.isnan(result[index, 0]).sum()))
+        return result
+
+    def sweep(self, displacement: engine.Vector3) -> "tuple[Collider, float] | None":
+        """
+        Sweep this collider along a displacement and find the first collider it would run into.
+        Candidates come from the broadphase of the physics world. Triggers, ignored layers and colliders already touching at the start are skipped.
+        :param displacement: The movement to test, in world units.
+        :return: The collider hit first and the fraction of the displacement at which they touch, or None.
+        """
+        world = self.gameObject.transform.scene.getSystem(PhysicsWorld)
+        if self._world is not world:
+            return None
+        world._flush()
+        # A collider without a contour has no slot and cannot hit anything.
+        if self not in world._slots:
+            return None
+        return world._sweep([self], np.array([[displacement.x, displacement.y]]))[0]
+
+
+def _edgeAxes(points: NDArray[np.float64]) -> NDArray[np.float64]:
+    """
+    Computes the unit normals of the edges of a closed polygon, skipping degenerate edges.
+    """
+    edges = np.roll(points, -1, axis=0) - points
+    normals = np.stack((-edges[:, 1], edges[:, 0]), axis=1)
+    lengths = np.linalg.norm(normals, axis=1)
+    keep = lengths > 0
+    return normals[keep] / lengths[keep, np.newaxis]
+
+def _pack(points: list[NDArray[np.float64]], axes: list[NDArray[np.float64]]) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Stacks polygons of different sizes into padded arrays of shape (M, V, 2) and (M, K, 2).
+    Points are padded by repeating the last vertex and axes by repeating a unit axis,
+    neither of which can change the outcome of a SAT test.
+    """
+    count = len(points)
+    packedPoints = np.empty((count, max(len(p) for p in points), 2))
+    packedAxes = np.empty((count, max(max(len(a) for a in axes), 1), 2))
+    for i in range(count):
+        p, a = points[i], axes[i]
+        packedPoints[i, :len(p)] = p
+        packedPoints[i, len(p):] = p[-1]
+        if len(a) == 0:
+            packedAxes[i] = (1.0, 0.0)
+        else:
+            packedAxes[i, :len(a)] = a
+            packedAxes[i, len(a):] = a[-1]
+    return packedPoints, packedAxes
+
+def _sat(pointsA: NDArray[np.float64], axesA: NDArray[np.float64], offsetA: NDArray[np.float64],
+         pointsB: NDArray[np.float64], axesB: NDArray[np.float64], offsetB: NDArray[np.float64]) -> NDArray[np.float64] | None:
+    """
+    Separating Axis Theorem test between two convex polygons given in local coordinates plus a world offset.
+    :return: The minimum translation vector moving A out of B, or None if they are separated.
+    """
+    axes = np.concatenate((axesA, axesB))
+    if len(axes) == 0:
+        axes = np.array([[1.0, 0.0]])
+    projA = pointsA @ axes.T
+    projB = pointsB @ axes.T
+    shift = axes @ (offsetA - offsetB)
+    # Overlap when maxA >= minB and maxB >= minA, exactly like touching edges did before.
+    pushBack = projA.max(axis=0) + shift - projB.min(axis=0)
+    pushForward = projB.max(axis=0) - projA.min(axis=0) - shift
+    if (pushBack < 0).any() or (pushForward < 0).any():
+        return None
+    depth = np.minimum(pushBack, pushForward)
+    k = int(np.argmin(depth))
+    if pushBack[k] < pushForward[k]:
+        return -axes[k] * pushBack[k]
+    return axes[k] * pushForward[k]
+
+def _satMany(pointsA: NDArray[np.float64], axesA: NDArray[np.float64], offsetA: NDArray[np.float64],
+             pointsB: NDArray[np.float64], axesB: NDArray[np.float64], offsetsB: NDArray[np.float64]) -> NDArray[np.float64]:
+    """
+    Batched version of _sat testing one polygon A against M padded polygons B.
+    :param pointsB: Padded points of shape (M, V, 2).
+    :param axesB: Padded axes of shape (M, K, 2).
+    :param offsetsB: World offsets of shape (M, 2).
+    :return: An array of shape (M, 2) with the MTV for each pair, or NaN where separated.
+    """
+    count = len(pointsB)
+    return _satPairs(
+        np.broadcast_to(pointsA, (count, *pointsA.shape)), np.broadcast_to(axesA, (count, *axesA.shape)), np.broadcast_to(offsetA, (count, 2)),
+        pointsB, axesB, offsetsB
+    )
+
+def _satPairs(pointsA: NDArray[np.float64], axesA: NDArray[np.float64], offsetsA: NDArray[np.float64],
+              pointsB: NDArray[np.float64], axesB: NDArray[np.float64], offsetsB: NDArray[np.float64]) -> NDArray[np.float64]:
+    """
+    Runs M independent SAT tests between padded polygons A[m] and B[m] in one NumPy call.
+    :return: An array of shape (M, 2) with the MTV moving A[m] out of B[m], or NaN where separated.
+    """
+    count = len(pointsB)
+    axes = np.concatenate((axesA, axesB), axis=1)
+    projA = np.einsum("mvd,mkd->mkv", pointsA, axes)
+    projB = np.einsum("mvd,mkd->mkv", pointsB, axes)
+    shift = np.einsum("md,mkd->mk", offsetsA - offsetsB, axes)
+    pushBack = projA.max(axis=2) + shift - projB.min(axis=2)
+    pushForward = projB.max(axis=2) - projA.min(axis=2) - shift
+    touching = ((pushBack >= 0) & (pushForward >= 0)).all(axis=1)
+    depth = np.minimum(pushBack, pushForward)
+    k = np.argmin(depth, axis=1)
+    rows = np.arange(count)
+    back = pushBack[rows, k] < pushForward[rows, k]
+    amount = np.where(back, -pushBack[rows, k], pushForward[rows, k])
+    result = axes[rows, k] * amount[:, np.newaxis]
+    result[~touching] = np.nan
+    return result
+
+def _sweepIntervals(pointsA: NDArray[np.float64], axesA: NDArray[np.float64], offsetsA: NDArray[np.float64], displacements: NDArray[np.float64],
+                    pointsB: NDArray[np.float64], axesB: NDArray[np.float64], offsetsB: NDArray[np.float64]
+                    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Swept SAT for M pairs, where A[m] moves by displacements[m] and B[m] stays where it is.
+    On every axis the projections overlap during one interval of the move; A touches B where all these intervals meet.
+    :return: The fractions of the displacement at which A starts and stops touching B, each of shape (M,),
+        and the unit normal of B facing A at the start, of shape (M, 2). They touch when start <= stop.
+    """
+    axes = np.concatenate((axesA, axesB), axis=1)
+    projA = np.einsum("mvd,mkd->mkv", pointsA, axes)
+    projB = np.einsum("mvd,mkd->mkv", pointsB, axes)
+    shift = np.einsum("md,mkd->mk", offsetsA - offsetsB, axes)
+    speed = np.einsum("md,mkd->mk", displacements, axes)
+    # A overlaps B on an axis while it has moved at least low and at most high along it.
+    low = projB.min(axis=2) - projA.max(axis=2) - shift
+    high = projB.max(axis=2) - projA.min(axis=2) - shift
+    overlapping = (low <= 0) & (high >= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lowTime, highTime = low / speed, high / speed
+    enter = np.where(speed > 0, lowTime, np.where(speed < 0, highTime, np.where(overlapping, -np.inf, np.inf)))
+    leave = np.where(speed > 0, highTime, np.where(speed < 0, lowTime, np.where(overlapping, np.inf, -np.inf)))
+    k = np.argmax(enter, axis=1)
+    rows = np.arange(len(k))
+    normal = axes[rows, k] * -np.sign(speed[rows, k])[:, np.newaxis]
+    return enter[rows, k], leave.min(axis=1), normal
+
+def _sweepPairs(pointsA: NDArray[np.float64], axesA: NDArray[np.float64], offsetsA: NDArray[np.float64], displacements: NDArray[np.float64],
+                pointsB: NDArray[np.float64], axesB: NDArray[np.float64], offsetsB: NDArray[np.float64]) -> NDArray[np.float64]:
+    """
+    Batched time of impact of A[m] moving by displacements[m] into B[m], built on _sweepIntervals.
+    :return: An array of shape (M,) with the fraction of the displacement at which A first touches B,
+        or NaN if it does not within the move or already touches it at the start.
+    """
+    first, last, _ = _sweepIntervals(pointsA, axesA, offsetsA, displacements, pointsB, axesB, offsetsB)
+    hit = (first <= last) & (first > 0) & (first <= 1)
+    return np.where(hit, first, np.nan)
+
+ContactPair = tuple[Collider, Collider]
+class RaycastHit:
+    """
+    A hit found by a raycast.
+    """
+    def __init__(self, collider: Collider, point: engine.Vector3, normal: engine.Vector3, distance: float) -> None:
+        self.collider = collider
+        # Where the ray enters the collider, and the outward normal of the face it enters through.
+        self.point = point
+        self.normal = normal
+        self.distance = distance
+class PhysicsWorld(engine.SceneSystem):
+    """
+    The physics state of a scene.
+    Keeps every active collider with a contour in a spatial hash keyed on its world-space bounding box,
+    and mirrors their bounds, offsets and padded contours in struct-of-arrays form.
+    Colliders without a Rigidbody are static and go to a separate hash that only changes when they do.
+    Once per fixed step it updates the set of touching pairs, caches it for Collider.check,
+    and dispatches onCollisionEnter/Stay/Exit and onTriggerEnter/Exit to the components of both GameObjects.
+    Only colliders that moved or changed since the last step are tested again; every other pair keeps its last result.
+    Static colliders are never tested against each other, and neither are colliders on layers ignoring each other.
+    Bodies using continuous collision detection are swept along their move and stop where they first touch something.
+    """
+    cellSize: float = 128.0
+    # A body whose speed and acceleration stay below sleepThreshold for sleepSteps fixed steps goes to sleep.
+    sleepThreshold: float = 1.0
+    sleepSteps: int = 10
+    # How far a swept body is pushed into what it hits, so the contact is found by the next discrete test.
+    sweepSkin: float = 1e-6
+    def __init__(self, scene: engine.Scene) -> None:
+        super().__init__(scene)
+        self.broadphase: engine.SpatialHash[Collider] = engine.SpatialHash(self.cellSize)
+        self.staticBroadphase: engine.SpatialHash[Collider] = engine.SpatialHash(self.cellSize)
+        self._dirty: dict[Collider, None] = {}
+        # Colliders written since the last contact update, whose pairs have to be tested again.
+        self._sources: dict[Collider, None] = {}
         
-        pts1 = colli1 + self.gameObject.transform.position.asNumpy()
-        pts2 = colli2 + other.gameObject.transform.position.asNumpy()
+        self._colliders: list[Collider] = []
+        self._slots: dict[Collider, int] = {}
+        self._offsets = np.zeros((0, 2))
+        self._bounds = np.zeros((0, 4))
+        self._layers = np.zeros(0, dtype=np.intp)
+        self._layerVersion = Physics.version
+        # Bounding box of all colliders, used to cut off infinite rays.
+        self._extent: NDArray[np.float64] | None = None
+        self._points = np.zeros((0, 1, 2))
+        self._axes = np.zeros((0, 1, 2))
         
-        def project(poly: NDArray[np.float64], axis: NDArray[np.float64]) -> tuple[float, float]:
-            projs = [(p[0] * axis[0] + p[1] * axis[1]) for p in poly]
-            return min(projs), max(projs)
-
-        def overlap(minA: float, maxA: float, minB: float, maxB: float) -> bool:
-            return not (maxA < minB or maxB < minA)
-
-        all_points = [pts1, pts2]
-        for points in all_points:
-            for i in range(len(points)):
-                edge = points[(i+1) % len(points)] - points[i]
-                normal = np.array([-edge[1], edge[0]], dtype=float)
-                norm_len = np.linalg.norm(normal)
-                if norm_len == 0:
+        self._contacts: dict[ContactPair, NDArray[np.float64]] | None = None
+        self._touching: dict[Collider, list[Collider]] = {}
+        self._dispatched: dict[ContactPair, None] = {}
+        self._staticChecks: dict[Collider, Collider | None] = {}
+        
+        self._bodies: list[Rigidbody] = []
+        self._bodyStore = _BodyArrays(16)
+        self._writingBack = False
+    
+    def onComponentAdded(self, component: engine.Component) -> None:
+        if isinstance(component, Collider):
+            component._attach(self)
+        elif isinstance(component, Rigidbody):
+            self._addBody(component)
+    def onComponentRemoved(self, component: engine.Component) -> None:
+        if isinstance(component, Collider):
+            self._dirty.pop(component, None)
+            self._sources.pop(component, None)
+            self._removeSlot(component)
+            component._detach()
+        elif isinstance(component, Rigidbody):
+            self._removeBody(component)
+    
+    def query(self, bounds: engine.Bounds) -> list[Collider]:
+        """
+        Finds all colliders whose bounding box overlaps the given area.
+        :param bounds: The area to search, as (xmin, ymin, xmax, ymax) in world coordinates.
+        :return: The candidate colliders. Their contours still need a narrow-phase test.
+        """
+        self._flush()
+        return self.broadphase.query(bounds) + self.staticBroadphase.query(bounds)
+    
+    @property
+    def contacts(self) -> dict[ContactPair, NDArray[np.float64]]:
+        """
+        The touching pairs found by the last fixed step, mapped to the MTV moving the first collider out of the second.
+        """
+        if self._contacts is None:
+            self._computeContacts()
+        return self._contacts # type: ignore
+    def contactsOf(self, collider: Collider) -> list[Collider]:
+        """
+        Returns the colliders that were touching the given one at the last fixed step.
+        :param collider: The collider to look up.
+        """
+        if self._contacts is None:
+            self._computeContacts()
+        return self._touching.get(collider, [])
+    
+    def overlapPoint(self, point: engine.Vector3, layerMask: int = ~0, includeTriggers: bool = True) -> list[Collider]:
+        """
+        Finds the colliders containing a point.
+        :param point: The point in world coordinates.
+        :param layerMask: A bit mask of the layers to consider.
+        :param includeTriggers: Whether trigger colliders are reported too.
+        :return: The colliders containing the point, edges included.
+        """
+        return self.overlapPoints(np.array([[point.x, point.y]]), layerMask, includeTriggers)[0]
+    def overlapPoints(self, points: NDArray[np.float64], layerMask: int = ~0, includeTriggers: bool = True) -> list[list[Collider]]:
+        """
+        Batched version of overlapPoint, testing all points with one SAT call.
+        :param points: The points, as an array of shape (N, 2) in world coordinates.
+        :return: The colliders containing each point.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        rows, slots = self._candidates([(x, y, x, y) for x, y in points.tolist()], layerMask, includeTriggers)
+        touching = self._overlaps(
+            np.zeros((len(rows), 1, 2)), self._axes[slots, :1], points[rows], slots
+        )
+        return self._group(len(points), rows, slots, touching)
+    def overlapBox(self, bounds: engine.Bounds, layerMask: int = ~0, includeTriggers: bool = True) -> list[Collider]:
+        """
+        Finds the colliders touching an axis-aligned box.
+        :param bounds: The box, as (xmin, ymin, xmax, ymax) in world coordinates.
+        :param layerMask: A bit mask of the layers to consider.
+        :param includeTriggers: Whether trigger colliders are reported too.
+        """
+        rows, slots = self._candidates([bounds], layerMask, includeTriggers)
+        xmin, ymin, xmax, ymax = bounds
+        box = np.array([[0.0, 0.0], [xmax - xmin, 0.0], [xmax - xmin, ymax - ymin], [0.0, ymax - ymin]])
+        touching = self._overlaps(
+            np.broadcast_to(box, (len(slots), 4, 2)), np.broadcast_to(np.eye(2), (len(slots), 2, 2)),
+            np.broadcast_to((xmin, ymin), (len(slots), 2)), slots
+        )
+        return self._group(1, rows, slots, touching)[0]
+    def overlapCircle(self, center: engine.Vector3, radius: float, layerMask: int = ~0, includeTriggers: bool = True) -> list[Collider]:
+        """
+        Finds the colliders touching a circle.
+        :param center: The center of the circle in world coordinates.
+        :param radius: The radius of the circle.
+        :param layerMask: A bit mask of the layers to consider.
+        :param includeTriggers: Whether trigger colliders are reported too.
+        """
+        x, y = center.x, center.y
+        rows, slots = self._candidates([(x - radius, y - radius, x + radius, y + radius)], layerMask, includeTriggers)
+        # The circle touches a polygon if its center is inside or close enough to one of the edges.
+        start = self._points[slots] + self._offsets[slots, np.newaxis]
+        edge = np.roll(start, -1, axis=1) - start
+        toCenter = np.array((x, y)) - start
+        length = (edge ** 2).sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(np.nan_to_num((toCenter * edge).sum(axis=2) / length), 0, 1)
+        distance = ((toCenter - edge * t[..., np.newaxis]) ** 2).sum(axis=2).min(axis=1, initial=np.inf)
+        inside = self._overlaps(np.zeros((len(slots), 1, 2)), self._axes[slots, :1], np.broadcast_to((x, y), (len(slots), 2)), slots)
+        return self._group(1, rows, slots, inside | (distance <= radius * radius))[0]
+    def raycast(self, origin: engine.Vector3, direction: engine.Vector3, maxDistance: float = np.inf,
+                layerMask: int = ~0, includeTriggers: bool = False) -> "RaycastHit | None":
+        """
+        Casts a ray and finds the first collider it hits.
+        The broadphase is walked along the ray in short segments, so the search stops at the first hit.
+        :param origin: The start of the ray in world coordinates.
+        :param direction: The direction of the ray. It does not need to be normalized.
+        :param maxDistance: How far the ray reaches.
+        :param layerMask: A bit mask of the layers to consider.
+        :param includeTriggers: Whether trigger colliders can be hit.
+        :return: The closest hit, or None. A ray starting inside a collider hits it at distance 0.
+        """
+        unit = self._unit(np.array([[direction.x, direction.y]]))[0]
+        start = np.array((origin.x, origin.y))
+        reach = self._reach(start, unit)
+        if np.isnan(reach):
+            return None
+        length = min(maxDistance, reach)
+        step = 4 * self.cellSize
+        tested: set[int] = set()
+        best: RaycastHit | None = None
+        begin = 0.0
+        while True:
+            end = min(begin + step, length)
+            a, b = start + unit * begin, start + unit * end
+            _, slots = self._candidates([(min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1]))], layerMask, includeTriggers)
+            slots = np.array([slot for slot in slots.tolist() if slot not in tested], dtype=np.intp)
+            tested.update(slots.tolist())
+            hits = self._rayHits(np.broadcast_to(start, (len(slots), 2)), np.broadcast_to(unit, (len(slots), 2)), np.full(len(slots), length), slots)
+            best = min(hits + ([best] if best else []), key=lambda hit: hit.distance, default=None)
+            # Anything closer than the end of this segment would have been among the candidates by now.
+            if (best is not None and best.distance <= end) or end >= length:
+                return best
+            begin = end
+    def raycastMany(self, origins: NDArray[np.float64], directions: NDArray[np.float64], maxDistance: float = np.inf,
+                    layerMask: int = ~0, includeTriggers: bool = False) -> "list[RaycastHit | None]":
+        """
+        Batched version of raycast for many rays at once, such as line-of-sight checks.
+        Each ray gathers the candidates along its whole length, then all of them are tested with one swept SAT call.
+        :param origins: The starts of the rays, as an array of shape (N, 2).
+        :param directions: The directions of the rays, as an array of shape (N, 2).
+        :return: The closest hit of each ray, or None where it hits nothing.
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+        units = self._unit(np.asarray(directions, dtype=np.float64).reshape(-1, 2))
+        lengths = np.minimum(maxDistance, [self._reach(o, u) for o, u in zip(origins, units)])
+        ends = origins + units * np.nan_to_num(lengths, nan=0)[:, np.newaxis]
+        areas = [
+            (min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1])) if length >= 0 else None
+            for a, b, length in zip(origins.tolist(), ends.tolist(), lengths.tolist())
+        ]
+        rows, slots = self._candidates(areas, layerMask, includeTriggers)
+        result: list[RaycastHit | None] = [None] * len(origins)
+        for row, hit in zip(rows.tolist(), self._rayHits(origins[rows], units[rows], lengths[rows], slots, keepMisses=True)):
+            if hit is not None and (result[row] is None or hit.distance < result[row].distance): # type: ignore
+                result[row] = hit
+        return result
+    
+    def _candidates(self, areas: "list[engine.Bounds | None]", layerMask: int, includeTriggers: bool) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """
+        Looks up the colliders overlapping each area in both broadphases, skipping masked layers and, if asked, triggers.
+        :return: The index of the area and the slot of the collider for every candidate.
+        """
+        self._flush()
+        rows: list[int] = []
+        slots: list[int] = []
+        lookup = self._slots
+        for row, area in enumerate(areas):
+            if area is None:
+                continue
+            for collider in self.broadphase.query(area) + self.staticBroadphase.query(area):
+                if (layerMask >> collider._layer) & 1 and (includeTriggers or not collider.isTrigger):
+                    rows.append(row)
+                    slots.append(lookup[collider])
+        return np.array(rows, dtype=np.intp), np.array(slots, dtype=np.intp)
+    def _overlaps(self, points: NDArray[np.float64], axes: NDArray[np.float64], offsets: NDArray[np.float64], slots: NDArray[np.intp]) -> NDArray[np.bool_]:
+        if len(slots) == 0:
+            return np.zeros(0, dtype=bool)
+        mtv = _satPairs(points, axes, offsets, self._points[slots], self._axes[slots], self._offsets[slots])
+        return ~np.isnan(mtv[:, 0])
+    def _group(self, count: int, rows: NDArray[np.intp], slots: NDArray[np.intp], mask: NDArray[np.bool_]) -> list[list[Collider]]:
+        groups: list[list[Collider]] = [[] for _ in range(count)]
+        colliders = self._colliders
+        for row, slot in zip(rows[mask].tolist(), slots[mask].tolist()):
+            groups[row].append(colliders[slot])
+        return groups
+    def _rayHits(self, origins: NDArray[np.float64], units: NDArray[np.float64], lengths: NDArray[np.float64],
+                 slots: NDArray[np.intp], keepMisses: bool = False) -> "list[RaycastHit | None]":
+        """
+        Tests rays against the colliders in the given slots, one ray per slot, by sweeping a point along each ray.
+        """
+        if len(slots) == 0:
+            return []
+        first, last, normal = _sweepIntervals(
+            np.zeros((len(slots), 1, 2)), self._axes[slots, :1], origins, units * lengths[:, np.newaxis],
+            self._points[slots], self._axes[slots], self._offsets[slots]
+        )
+        hit = (first <= last) & (last >= 0) & (first <= 1)
+        inside = first < 0
+        normal[inside] = -units[inside]
+        distance = np.maximum(first, 0) * lengths
+        point = origins + units * distance[:, np.newaxis]
+        hits: list[RaycastHit | None] = []
+        for k in range(len(slots)) if keepMisses else np.flatnonzero(hit).tolist():
+            if not hit[k]:
+                hits.append(None)
+                continue
+            hits.append(RaycastHit(
+                self._colliders[slots[k]],
+                engine.Vector3(float(point[k, 0]), float(point[k, 1]), 0),
+                engine.Vector3(float(normal[k, 0]), float(normal[k, 1]), 0),
+                float(distance[k])
+            ))
+        return hits
+    def _unit(self, directions: NDArray[np.float64]) -> NDArray[np.float64]:
+        norms = np.linalg.norm(directions, axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(norms > 0, directions / norms, 0.0)
+    def _reach(self, origin: NDArray[np.float64], unit: NDArray[np.float64]) -> float:
+        """
+        Returns how far a ray has to go to leave the bounding box of all colliders, or NaN if it never enters it.
+        A ray without a direction reaches no further than its origin.
+        """
+        # Colliders added or moved since the last query must be in the arrays the extent is taken from.
+        self._flush()
+        count = len(self._colliders)
+        if count == 0:
+            return np.nan
+        if not unit.any():
+            return 0.0
+        if self._extent is None:
+            bounds = self._bounds[:count]
+            self._extent = np.concatenate((bounds[:, :2].min(axis=0), bounds[:, 2:].max(axis=0)))
+        low, high = self._extent[:2], self._extent[2:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a, b = (low - origin) / unit, (high - origin) / unit
+        # Axes the ray runs parallel to must already contain the origin.
+        parallel = unit == 0
+        outside = parallel & ((origin < low) | (origin > high))
+        if outside.any():
+            return np.nan
+        enter = np.where(parallel, -np.inf, np.minimum(a, b)).max()
+        leave = np.where(parallel, np.inf, np.maximum(a, b)).min()
+        if enter > leave or leave < 0:
+            return np.nan
+        return float(leave)
+    
+    def fixedUpdate(self) -> None:
+        self._integrate(engine.Time.deltaTime)
+        self._computeContacts()
+        self._dispatch()
+    
+    def _integrate(self, deltaTime: float) -> None:
+        """
+        Moves all awake rigidbodies by one step in a single vectorized update.
+        A body with a solid collider stops the first step it touches something, as if it landed.
+        Bodies that stay still long enough are put to sleep and skipped until something wakes them.
+        """
+        count = len(self._bodies)
+        if count == 0:
+            return
+        bodies = self._bodies
+        store = self._bodyStore
+        for slot in np.flatnonzero(store.stale[:count]):
+            local = bodies[slot].gameObject.transform.localPosition
+            store.position[slot] = (local.x, local.y, local.z)
+        store.stale[:count] = False
+        
+        if self._contacts is None:
+            self._computeContacts()
+        awake = np.flatnonzero(~store.sleeping[:count])
+        touching = self._touching
+        hit = np.fromiter(
+            (c is not None and not c.isTrigger and c in touching for c in (bodies[slot].collider for slot in awake.tolist())),
+            dtype=bool, count=len(awake)
+        )
+        landing = hit & ~store.grounded[awake]
+        store.grounded[awake] = hit
+        velocity = store.velocity[awake]
+        acceleration = store.acceleration[awake]
+        velocity[landing] = 0
+        acceleration[landing] = 0
+        
+        delta = velocity * deltaTime
+        continuous = store.continuous[awake] & (delta != 0).any(axis=1)
+        if continuous.any():
+            self._sweepBodies(awake[continuous], delta, np.flatnonzero(continuous))
+        previous = store.position[awake]
+        position = previous + delta
+        velocity += acceleration * deltaTime
+        
+        threshold = self.sleepThreshold ** 2
+        calm = ((velocity ** 2).sum(axis=1) < threshold) & ((acceleration ** 2).sum(axis=1) < threshold)
+        steps = np.where(calm, store.calm[awake] + 1, 0)
+        asleep = steps >= self.sleepSteps
+        velocity[asleep] = 0
+        store.velocity[awake] = velocity
+        store.acceleration[awake] = acceleration
+        store.position[awake] = position
+        store.calm[awake] = steps
+        store.sleeping[awake] = asleep
+        
+        moved = (delta != 0).any(axis=1)
+        movedSlots = awake[moved]
+        stopped = np.flatnonzero(store.moving[:count])
+        store.moving[stopped] = False
+        store.moving[movedSlots] = True
+        stopped = stopped[~store.moving[stopped]]
+        self._writingBack = True
+        try:
+            for slot, end, start in zip(movedSlots.tolist(), position[moved].tolist(), previous[moved].tolist()):
+                body = bodies[slot]
+                transform = body.gameObject.transform
+                transform._setLocalPosition(*end)
+                transform._interpolationFrom = tuple(start) if body.interpolate else None # type: ignore
+            for slot in stopped.tolist():
+                bodies[slot].gameObject.transform._interpolationFrom = None
+        finally:
+            self._writingBack = False
+    def _sweepBodies(self, slots: NDArray[np.intp], delta: NDArray[np.float64], rows: NDArray[np.intp]) -> None:
+        """
+        Sweeps the solid colliders of continuous bodies along their step and shortens delta[rows] to the first hit.
+        """
+        self._flush()
+        movers: list[tuple[Rigidbody, Collider, int]] = []
+        for slot, row in zip(slots.tolist(), rows.tolist()):
+            body = self._bodies[slot]
+            body.lastHit = None
+            collider = body.collider
+            if collider is not None and not collider.isTrigger and collider in self._slots:
+                movers.append((body, collider, row))
+        if not movers:
+            return
+        hits = self._sweep([collider for _, collider, _ in movers], delta[[row for _, _, row in movers], :2])
+        for (body, _, row), hit in zip(movers, hits):
+            if hit is None:
+                continue
+            move = delta[row]
+            move *= min(1.0, hit[1] + self.sweepSkin / float(np.linalg.norm(move[:2])))
+            body.lastHit = hit
+    def _sweep(self, colliders: list[Collider], displacements: NDArray[np.float64]) -> "list[tuple[Collider, float] | None]":
+        """
+        Finds the first collider each of the given colliders runs into along its displacement, with one batched swept test.
+        Candidates come from both broadphases over the swept bounding box, minus ignored layers. The colliders must be flushed into their slots.
+        """
+        slots = self._slots
+        pairRows: list[int] = []
+        firsts: list[int] = []
+        seconds: list[int] = []
+        for row, collider in enumerate(colliders):
+            slot = slots[collider]
+            xmin, ymin, xmax, ymax = self._bounds[slot].tolist()
+            dx, dy = displacements[row].tolist()
+            swept = (xmin + min(dx, 0), ymin + min(dy, 0), xmax + max(dx, 0), ymax + max(dy, 0))
+            allowed = Physics._layerMatrix[collider._layer]
+            for other in self.broadphase.query(swept) + self.staticBroadphase.query(swept):
+                if other is collider or other.isTrigger or other.gameObject is collider.gameObject or not allowed[other._layer]:
                     continue
-                normal /= norm_len
-                minA, maxA = project(pts1, normal)
-                minB, maxB = project(pts2, normal)
-                if not overlap(minA, maxA, minB, maxB):
-                    return False
-        return True
+                pairRows.append(row)
+                firsts.append(slot)
+                seconds.append(slots[other])
+        result: list[tuple[Collider, float] | None] = [None] * len(colliders)
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled:
+            profiler.count("physics.sweeps", len(pairRows))
+        if not pairRows:
+            return result
+        first, second = np.array(firsts, dtype=np.intp), np.array(seconds, dtype=np.intp)
+        times = _sweepPairs(
+            self._points[first], self._axes[first], self._offsets[first], displacements[pairRows],
+            self._points[second], self._axes[second], self._offsets[second]
+        )
+        for k in np.flatnonzero(~np.isnan(times)).tolist():
+            row, time = pairRows[k], float(times[k])
+            best = result[row]
+            if best is None or time < best[1]:
+                result[row] = (self._colliders[second[k]], time)
+        return result
+    def _bodyOf(self, gameObject: engine.GameObject) -> "Rigidbody | None":
+        for body in gameObject.getComponents(Rigidbody):
+            if body._world is self:
+                return body
+        return None
+    def _addBody(self, body: "Rigidbody") -> None:
+        slot = len(self._bodies)
+        if slot >= len(self._bodyStore):
+            self._bodyStore.grow(2 * len(self._bodyStore))
+        self._bodies.append(body)
+        self._bodyStore.copyRow(body._store, body._slot, slot)
+        self._bodyStore.stale[slot] = True
+        body._store, body._slot, body._world = self._bodyStore, slot, self
+        body.gameObject.transform.addListener(body._onMoved)
+        self._repartition(body.gameObject)
+    def _removeBody(self, body: "Rigidbody") -> None:
+        if body._world is not self:
+            return
+        transform = body.gameObject.transform
+        transform.removeListener(body._onMoved)
+        transform._interpolationFrom = None
+        slot = body._slot
+        detached = _BodyArrays()
+        detached.copyRow(self._bodyStore, slot, 0)
+        body._store, body._slot, body._world = detached, 0, None
+        last = self._bodies.pop()
+        if last is not body:
+            self._bodies[slot] = last
+            self._bodyStore.copyRow(self._bodyStore, len(self._bodies), slot)
+            last._slot = slot
+        self._repartition(body.gameObject)
+    def _repartition(self, gameObject: engine.GameObject) -> None:
+        """
+        Moves the colliders of a GameObject between the static and the dynamic broadphase after its Rigidbody changed.
+        """
+        body = self._bodyOf(gameObject)
+        for collider in gameObject.getComponents(Collider):
+            if collider._world is self and collider._body is not body:
+                collider._body = body
+                collider._bindBody()
+                self._markDirty(collider)
+    
+    def _computeContacts(self) -> None:
+        self._flush()
+        if self._layerVersion != Physics.version:
+            # The layer matrix changed, so any pair may have been allowed or ignored.
+            self._layerVersion = Physics.version
+            self._sources.update(dict.fromkeys(self._colliders))
+        sources = self._sources
+        self._sources = {}
+        previous = self._contacts or {}
+        slots = self._slots
+        contacts: dict[ContactPair, NDArray[np.float64]] = {
+            pair: mtv for pair, mtv in previous.items()
+            if pair[0] not in sources and pair[1] not in sources and pair[0] in slots and pair[1] in slots
+        }
+        first, second = self._sourcePairs(sources)
+        if len(first):
+            mtv = _satPairs(
+                self._points[first], self._axes[first], self._offsets[first],
+                self._points[second], self._axes[second], self._offsets[second]
+            )
+            hits = np.flatnonzero(~np.isnan(mtv[:, 0]))
+            profiler = engine.SYSTEM.profiler
+            if profiler.enabled:
+                profiler.count("physics.sat", len(first))
+                profiler.count("physics.satEarlyOut", len(first) - len(hits))
+            colliders = self._colliders
+            for k in hits.tolist():
+                a, b = colliders[first[k]], colliders[second[k]]
+                if a._serial < b._serial:
+                    contacts[(a, b)] = mtv[k]
+                else:
+                    contacts[(b, a)] = -mtv[k]
+        touching: dict[Collider, list[Collider]] = {}
+        for a, b in contacts:
+            touching.setdefault(a, []).append(b)
+            touching.setdefault(b, []).append(a)
+        # A sleeping body wakes up as soon as something starts or stops touching it.
+        for a, b in contacts.keys() ^ previous.keys():
+            for collider in (a, b):
+                if collider._body is not None:
+                    collider._body.wakeUp()
+        self._contacts = contacts
+        self._touching = touching
+        self._staticChecks = {}
+    def _sourcePairs(self, sources: dict[Collider, None]) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """
+        Collects the slot pairs that involve a collider written since the last step and whose bounding boxes overlap.
+        Dynamic colliders are looked up in both broadphases, static ones only in the dynamic broadphase.
+        """
+        firsts: list[int] = []
+        seconds: list[int] = []
+        slots = self._slots
+        for collider in sources:
+            slot = slots.get(collider)
+            if slot is None:
+                continue
+            bounds = collider.bounds
+            assert bounds is not None
+            others = self.broadphase.query(bounds)
+            if not collider.isStatic:
+                others += self.staticBroadphase.query(bounds)
+            for other in others:
+                if other is not collider:
+                    firsts.append(slot)
+                    seconds.append(slots[other])
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled:
+            # Pairs whose bounding boxes overlap, before the layer filter and counting both sides of moving pairs.
+            profiler.count("physics.sources", len(sources))
+            profiler.count("physics.candidates", len(firsts))
+        if not firsts:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty
+        a, b = np.array(firsts, dtype=np.intp), np.array(seconds, dtype=np.intp)
+        allowed = Physics._layerMatrix[self._layers[a], self._layers[b]]
+        a, b = a[allowed], b[allowed]
+        first, second = np.minimum(a, b), np.maximum(a, b)
+        # Two moving colliders find each other from both sides.
+        keys = np.unique(first * len(self._colliders) + second)
+        first, second = np.divmod(keys, len(self._colliders))
+        return first, second
+    def _staticContact(self, collider: Collider) -> Collider | None:
+        """
+        Finds a static collider touching another static one. Only runs when asked for, and is cached until the next step.
+        """
+        if collider in self._staticChecks:
+            return self._staticChecks[collider]
+        self._flush()
+        found = None
+        bounds = collider.bounds
+        if bounds is not None:
+            allowed = Physics._layerMatrix[collider._layer]
+            others = [other for other in self.staticBroadphase.query(bounds) if other is not collider and allowed[other._layer]]
+            if others:
+                touching = np.flatnonzero(collider.isTouchMany(others))
+                if len(touching):
+                    found = others[touching[0]]
+        self._staticChecks[collider] = found
+        return found
+    def _dispatch(self) -> None:
+        contacts = self.contacts
+        previous = self._dispatched
+        events: list[tuple[str, Collider, Collider]] = []
+        for pair in previous:
+            if pair not in contacts:
+                a, b = pair
+                kind = "onTrigger" if a.isTrigger or b.isTrigger else "onCollision"
+                events.append((kind + "Exit", a, b))
+        for pair in contacts:
+            a, b = pair
+            trigger = a.isTrigger or b.isTrigger
+            if pair not in previous:
+                events.append(("onTriggerEnter" if trigger else "onCollisionEnter", a, b))
+            elif not trigger:
+                events.append(("onCollisionStay", a, b))
+        self._dispatched = dict.fromkeys(contacts)
+        for method, a, b in events:
+            a.gameObject.invoke(method, b)
+            b.gameObject.invoke(method, a)
+    
+    def _markDirty(self, collider: Collider) -> None:
+        self._dirty[collider] = None
+    def _flush(self) -> None:
+        if not self._dirty:
+            return
+        self._extent = None
+        for collider in self._dirty:
+            bounds = collider.bounds
+            current, other = self.broadphase, self.staticBroadphase
+            if collider.isStatic:
+                current, other = other, current
+            other.remove(collider)
+            if bounds is None:
+                current.remove(collider)
+                self._removeSlot(collider)
+            else:
+                current.insert(collider, bounds)
+                self._writeSlot(collider, bounds)
+            self._sources[collider] = None
+        self._dirty.clear()
+    def _writeSlot(self, collider: Collider, bounds: engine.Bounds) -> None:
+        points, axes = collider._points, collider._axes
+        assert points is not None and axes is not None
+        slot = self._slots.get(collider)
+        if slot is None:
+            slot = self._slots[collider] = len(self._colliders)
+            self._colliders.append(collider)
+        capacity = len(self._offsets)
+        if slot >= capacity or len(points) > self._points.shape[1] or len(axes) > self._axes.shape[1]:
+            self._grow(max(16, 2 * capacity) if slot >= capacity else capacity)
+        pos = collider.gameObject.transform.position
+        self._offsets[slot] = (pos.x, pos.y)
+        self._bounds[slot] = bounds
+        self._layers[slot] = collider._layer
+        self._packSlot(slot, points, axes)
+    def _packSlot(self, slot: int, points: NDArray[np.float64], axes: NDArray[np.float64]) -> None:
+        self._points[slot, :len(points)] = points
+        self._points[slot, len(points):] = points[-1]
+        if len(axes) == 0:
+            self._axes[slot] = (1.0, 0.0)
+        else:
+            self._axes[slot, :len(axes)] = axes
+            self._axes[slot, len(axes):] = axes[-1]
+    def _removeSlot(self, collider: Collider) -> None:
+        slot = self._slots.pop(collider, None)
+        if slot is None:
+            return
+        last = self._colliders.pop()
+        if last is not collider:
+            self._colliders[slot] = last
+            self._slots[last] = slot
+            end = len(self._colliders)
+            for array in (self._offsets, self._bounds, self._layers, self._points, self._axes):
+                array[slot] = array[end]
+    def _grow(self, capacity: int) -> None:
+        """
+        Reallocates the padded arrays so they hold capacity colliders with room for the largest current contour.
+        """
+        count = min(len(self._colliders), len(self._offsets))
+        offsets, bounds = np.zeros((capacity, 2)), np.zeros((capacity, 4))
+        layers = np.zeros(capacity, dtype=np.intp)
+        offsets[:count] = self._offsets[:count]
+        bounds[:count] = self._bounds[:count]
+        layers[:count] = self._layers[:count]
+        self._offsets, self._bounds, self._layers = offsets, bounds, layers
+        contours = [(c._points, c._axes) for c in self._colliders]
+        vertices = max([self._points.shape[1]] + [len(p) for p, _ in contours if p is not None])
+        axes = max([self._axes.shape[1]] + [len(a) for _, a in contours if a is not None])
+        self._points = np.zeros((capacity, vertices, 2))
+        self._axes = np.zeros((capacity, axes, 2))
+        for slot, (p, a) in enumerate(contours):
+            if p is not None and a is not None:
+                self._packSlot(slot, p, a)
 
 class VisuallizeCollider(engine.Behaviour):
     def __init__(self, gameObject: "engine.GameObject"):
@@ -90,16 +1070,154 @@ class VisuallizeCollider(engine.Behaviour):
 
         self.sprite.image = canvas
 
+class _BodyArrays:
+    """
+    Struct-of-arrays storage for the state of rigidbodies, one row per body.
+    A detached Rigidbody keeps its state in a private single-row instance.
+    """
+    def __init__(self, capacity: int = 1) -> None:
+        self.velocity = np.zeros((capacity, 3))
+        self.acceleration = np.zeros((capacity, 3))
+        self.mass = np.ones(capacity)
+        # Local position of the transform, refreshed from it when stale.
+        self.position = np.zeros((capacity, 3))
+        self.stale = np.ones(capacity, dtype=bool)
+        self.grounded = np.zeros(capacity, dtype=bool)
+        self.moving = np.zeros(capacity, dtype=bool)
+        # Number of consecutive calm steps, and whether the body is asleep.
+        self.calm = np.zeros(capacity, dtype=np.int64)
+        self.sleeping = np.zeros(capacity, dtype=bool)
+        self.continuous = np.zeros(capacity, dtype=bool)
+    
+    def __len__(self) -> int:
+        return len(self.mass)
+    def grow(self, capacity: int) -> None:
+        for name, array in vars(self).items():
+            grown = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+    def copyRow(self, source: "_BodyArrays", sourceRow: int, row: int) -> None:
+        for name, array in vars(self).items():
+            array[row] = getattr(source, name)[sourceRow]
+
+
+class _BodyVector3(engine.Vector3):
+    """
+    A live view of the velocity or acceleration of a Rigidbody.
+    Reading and writing x, y and z goes straight to the physics arrays, so edits like velocity.x = 0 work in place.
+    Writing a different value wakes the body up.
+    """
+    def __init__(self, body: "Rigidbody", field: str) -> None:
+        self._body = body
+        self._field = field
+    
+    def _row(self) -> NDArray[np.float64]:
+        body = self._body
+        return getattr(body._store, self._field)[body._slot]
+    def _set(self, axis: int, value: float) -> None:
+        row = self._row()
+        if row[axis] != value:
+            row[axis] = value
+            self._body.wakeUp()
+    @property
+    def x(self) -> float: return float(self._row()[0])
+    @x.setter
+    def x(self, value: float) -> None: self._set(0, value)
+    @property
+    def y(self) -> float: return float(self._row()[1])
+    @y.setter
+    def y(self, value: float) -> None: self._set(1, value)
+    @property
+    def z(self) -> float: return float(self._row()[2])
+    @z.setter
+    def z(self, value: float) -> None: self._set(2, value)
+
+
+class CollisionDetection(Enum):
+    # Test for contacts at the end of each fixed step only.
+    Discrete = 0
+    # Sweep the collider along its move and stop at the first thing it would pass through.
+    Continuous = 1
+
 class Rigidbody(engine.Component):
+    """
+    A body moved by the physics world. Its state lives in the arrays of the PhysicsWorld of its scene,
+    which integrates all bodies in one vectorized step per fixed update.
+    """
     def __init__(self, gameObject: engine.GameObject) -> None:
         super().__init__(gameObject)
-        self.velocity: engine.Vector3 = engine.Vector3(0, 0, 0)
-        self.acceleration: engine.Vector3 = engine.Vector3(0, 0, 0)
-        self.mass: float = 1.0
-        self.collider: Collider | None = None
-        self._isGrounded: bool = False
+        self._world: PhysicsWorld | None = None
+        self._store = _BodyArrays()
+        self._slot = 0
+        self._velocity = _BodyVector3(self, "velocity")
+        self._acceleration = _BodyVector3(self, "acceleration")
+        self._collider: Collider | None = None
+        # Draw the body between its last two fixed steps instead of snapping to the latest one.
+        self.interpolate: bool = True
+        # The collider hit by the last continuous sweep and the fraction of the step at which it was hit.
+        self.lastHit: tuple[Collider, float] | None = None
         if self.gameObject.hasComponent(Collider):
             self.collider = self.gameObject.getComponent(Collider)
+        self.gameObject.transform.scene.getSystem(PhysicsWorld)
+    
+    @property
+    def velocity(self) -> engine.Vector3:
+        return self._velocity
+    @velocity.setter
+    def velocity(self, value: engine.Vector3) -> None:
+        self._write(self._store.velocity, value)
+    @property
+    def acceleration(self) -> engine.Vector3:
+        return self._acceleration
+    @acceleration.setter
+    def acceleration(self, value: engine.Vector3) -> None:
+        self._write(self._store.acceleration, value)
+    @property
+    def mass(self) -> float:
+        return float(self._store.mass[self._slot])
+    @mass.setter
+    def mass(self, value: float) -> None:
+        self._store.mass[self._slot] = value
+    @property
+    def collider(self) -> Collider | None:
+        """
+        The collider whose contacts stop the body when it lands on something.
+        """
+        return self._collider
+    @collider.setter
+    def collider(self, value: Collider | None) -> None:
+        self._collider = value
+    @property
+    def _isGrounded(self) -> bool:
+        return bool(self._store.grounded[self._slot])
+    @property
+    def collisionDetection(self) -> CollisionDetection:
+        """
+        How the body looks for contacts. Continuous detection keeps fast bodies from passing through thin colliders
+        at a coarse fixed step, at the cost of a swept test for every step they move.
+        """
+        return CollisionDetection.Continuous if self._store.continuous[self._slot] else CollisionDetection.Discrete
+    @collisionDetection.setter
+    def collisionDetection(self, value: CollisionDetection) -> None:
+        self._store.continuous[self._slot] = value is CollisionDetection.Continuous
+    @property
+    def isSleeping(self) -> bool:
+        """
+        True while the body is asleep. A sleeping body is not integrated and its contacts are not tested again.
+        """
+        return bool(self._store.sleeping[self._slot])
+
+    def wakeUp(self) -> None:
+        """
+        Wake the body up so it is integrated again from the next fixed step.
+        """
+        self._store.sleeping[self._slot] = False
+        self._store.calm[self._slot] = 0
+    def sleep(self) -> None:
+        """
+        Put the body to sleep until a force, a contact change or a teleport wakes it up.
+        """
+        self._store.sleeping[self._slot] = True
 
     def applyForce(self, force: engine.Vector3) -> None:
         """
@@ -107,21 +1225,16 @@ class Rigidbody(engine.Component):
         :param force: The force vector to apply.
         """
         self.acceleration += force / self.mass
-
-    def update(self) -> None:
-        """
-        Update the rigidbody's position and velocity based on its acceleration.
-        This method should be called every frame to update the physics state.
-        """
-        if self.collider and not self.collider.isTrigger:
-            if self.collider.check():
-                if not self._isGrounded:
-                    self.velocity = engine.Vector3(0, 0, 0)  # Reset velocity on ground contact
-                    self.acceleration = engine.Vector3(0, 0, 0)  # Reset acceleration on ground contact
-                    self._isGrounded = True
-                    return
-                self._isGrounded = True
-            else:
-                self._isGrounded = False
-        self.gameObject.transform.position += self.velocity * engine.Time.deltaTime
-        self.velocity += self.acceleration * engine.Time.deltaTime
\ No newline at end of file
+    
+    def _write(self, array: NDArray[np.float64], value: engine.Vector3) -> None:
+        row = array[self._slot]
+        if row[0] != value.x or row[1] != value.y or row[2] != value.z:
+            row[:] = (value.x, value.y, value.z)
+            self.wakeUp()
+    def _onMoved(self) -> None:
+        world = self._world
+        if world is not None and not world._writingBack:
+            self._store.stale[self._slot] = True
+            # A teleport is drawn where it lands, not swept over from the last fixed step.
+            self.gameObject.transform._interpolationFrom = None
+            self.wakeUp()
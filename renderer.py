@@ -1,4 +1,12 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+import os
+import time
+from typing import Any, Callable, Iterable
+import weakref
 import cv2
+from numpy.typing import NDArray
 import numpy as np
 import engine
 import pygame
@@ -17,148 +25,858 @@ def clamp(value: float, min_value: float, max_value: float) -> float:
     
                         
 
+class SpriteOpacity(Enum):
+    # No visible pixel at all.
+    Empty = 0
+    # Every pixel fully opaque.
+    Opaque = 1
+    # Every pixel either fully opaque or fully transparent.
+    Binary = 2
+    # Some pixels partially transparent.
+    Translucent = 3
+
+class Sprite:
+    """
+    A BGRA image prepared for drawing. Everything Camera.show needs to know about the alpha channel is
+    worked out once here instead of on every draw: the opacity class picking the blend path, the tight
+    bounding box of the visible pixels, and a visibility mask and premultiplied copy of what is left.
+    The image is treated as constant. Use Sprite.of to share one Sprite between all users of an image.
+    A Sprite does not keep its image alive, so the Sprite cached for an image goes away with the image.
+    """
+    _cache: "dict[int, tuple[weakref.ref, Sprite]]" = {}
+    def __init__(self, image: cv2.typing.MatLike) -> None:
+        """
+        Analyzes an image.
+        :param image: The BGRA image, as an array of shape (height, width, 4).
+        """
+        self._image = weakref.ref(image)
+        self.height, self.width = image.shape[:2]
+        alpha = image[..., 3]
+        visible = alpha > 0
+        rows = np.flatnonzero(visible.any(axis=1))
+        columns = np.flatnonzero(visible.any(axis=0))
+        # The visible part of the image as (x0, y0, x1, y1) in pixels, ends excluded.
+        self.trim: tuple[int, int, int, int] = (0, 0, 0, 0)
+        self.pixels: NDArray[np.uint32] | None = None
+        self.mask: NDArray[np.bool_] | None = None
+        self.premultiplied: NDArray[np.uint32] | None = None
+        self.weight: NDArray[np.uint32] | None = None
+        if len(rows) == 0:
+            self.opacity = SpriteOpacity.Empty
+            return
+        x0, x1, y0, y1 = int(columns[0]), int(columns[-1]) + 1, int(rows[0]), int(rows[-1]) + 1
+        self.trim = (x0, y0, x1, y1)
+        trimmed = image[y0:y1, x0:x1]
+        if trimmed.dtype != np.uint8 or trimmed.strides[1:] != (4, 1):
+            trimmed = np.ascontiguousarray(trimmed, dtype=np.uint8)
+        elif image.base is None:
+            # A view of an image that owns its pixels would keep it alive from the cache.
+            trimmed = trimmed.copy()
+        # Each BGRA pixel as one little-endian uint32. Views into a bigger buffer, such as an Atlas, are not copied.
+        self.pixels = trimmed.view(np.uint32)[..., 0]
+        alpha = trimmed[..., 3]
+        if alpha.min() == 255:
+            self.opacity = SpriteOpacity.Opaque
+            return
+        self.mask = alpha > 0
+        if np.count_nonzero(self.mask) == np.count_nonzero(alpha == 255):
+            self.opacity = SpriteOpacity.Binary
+            return
+        self.opacity = SpriteOpacity.Translucent
+        # Blue/red and green/alpha as two 16-bit lanes each, multiplied by alpha; alpha itself counts as 255.
+        a = alpha.astype(np.uint32)
+        self.premultiplied = np.empty((2, *a.shape), dtype=np.uint32)
+        np.bitwise_and(self.pixels, 0x00FF00FF, out=self.premultiplied[0])
+        np.right_shift(self.pixels, 8, out=self.premultiplied[1])
+        self.premultiplied[1] &= 0x000000FF
+        self.premultiplied[1] |= 0x00FF0000
+        self.premultiplied *= a
+        self.weight = 255 - a
+    
+    @property
+    def image(self) -> cv2.typing.MatLike | None:
+        """
+        The analyzed image, or None once nothing else holds it.
+        """
+        return self._image()
+    @classmethod
+    def of(cls, image: "cv2.typing.MatLike | Sprite") -> "Sprite":
+        """
+        Returns the Sprite of an image, analyzing it only the first time it is seen.
+        :param image: The image, or a Sprite which is returned as it is.
+        """
+        if isinstance(image, Sprite):
+            return image
+        key = id(image)
+        entry = cls._cache.get(key)
+        if entry is not None and entry[0]() is image:
+            return entry[1]
+        sprite = Sprite(image)
+        cls._cache[key] = (weakref.ref(image, lambda _, key=key: cls._cache.pop(key, None)), sprite)
+        return sprite
+
 class SpriteRenderer(engine.Component, engine.Drawable):
     def __init__(self, gameObject: engine.GameObject) -> None:
         super().__init__(gameObject)
-        self.image: cv2.typing.MatLike | None = None
-        self.delta: engine.Vector3 = engine.Vector3(0, 0, 0)
+        self._index: SpriteIndex | None = None
+        self._image: cv2.typing.MatLike | None = None
+        self._sprite: Sprite | None = None
+        self._delta: engine.Vector3 = engine._TrackedVector3(0, 0, 0, self._onDeltaChanged)
+    
+    @property
+    def image(self) -> cv2.typing.MatLike | None:
+        """
+        The BGRA image drawn centered on the GameObject.
+        It is analyzed once per array (see Sprite.of), so assign a new array rather than drawing into the current one.
+        """
+        return self._image
+    @image.setter
+    def image(self, value: cv2.typing.MatLike | None) -> None:
+        self._image = value
+        self._sprite = None if value is None else Sprite.of(value)
+        self._onChanged()
+    @property
+    def sprite(self) -> Sprite | None:
+        """
+        The analyzed form of image. Assigning a Sprite also sets image to its image.
+        """
+        return self._sprite
+    @sprite.setter
+    def sprite(self, value: Sprite | None) -> None:
+        self._image = None if value is None else value.image
+        self._sprite = value
+        self._onChanged()
+    @property
+    def delta(self) -> engine.Vector3:
+        """
+        The offset of the image from the position of the GameObject.
+        """
+        return self._delta
+    @delta.setter
+    def delta(self, value: engine.Vector3) -> None:
+        self._delta = engine._TrackedVector3(value.x, value.y, value.z, self._onDeltaChanged)
+        self._onChanged()
+    @property
+    def bounds(self) -> engine.Bounds | None:
+        """
+        The world-space rectangle (xmin, ymin, xmax, ymax) covered by the image, or None if there is no image.
+        """
+        image = self._image
+        if image is None:
+            return None
+        pos = self.gameObject.transform.position
+        delta = self._delta
+        x, y = pos.x + delta.x, pos.y + delta.y
+        width, height = image.shape[1] / 2, image.shape[0] / 2
+        return (x - width, y - height, x + width, y + height)
+    
+    def _onChanged(self) -> None:
+        if self._index is not None:
+            self._index._markDirty(self)
+    def _onDeltaChanged(self, _: engine.Vector3) -> None:
+        self._onChanged()
+    
     def draw(self) -> None:
         """
         Draw the sprite on the screen.
         """
-        if self.image is None:
+        sprite = self._sprite
+        if sprite is None:
             return
-        width = self.image.shape[1]
-        height = self.image.shape[0]
-        self.gameObject.transform.scene.show(self.image, self.gameObject.transform.position + self.delta + engine.Vector3(-width, height, 0) / 2)
+        self.gameObject.transform.scene.show(sprite, self.gameObject.transform.renderPosition + self.delta + engine.Vector3(-sprite.width, sprite.height, 0) / 2) # type: ignore
+
+class SpriteIndex(engine.SceneSystem):
+    """
+    Keeps the world-space bounds of every active SpriteRenderer with an image in a spatial hash,
+    so picking a sprite does not have to visit every sprite of the scene.
+    Use Scene.getSystem(SpriteIndex) to get the index of a scene.
+    """
+    cellSize: float = 128.0
+    def __init__(self, scene: engine.Scene) -> None:
+        super().__init__(scene)
+        self.index: engine.SpatialHash[SpriteRenderer] = engine.SpatialHash(self.cellSize)
+        self._dirty: dict[SpriteRenderer, None] = {}
+    
+    def onComponentAdded(self, component: engine.Component) -> None:
+        if isinstance(component, SpriteRenderer):
+            component._index = self
+            component.gameObject.transform.addListener(component._onChanged)
+            self._markDirty(component)
+    def onComponentRemoved(self, component: engine.Component) -> None:
+        if isinstance(component, SpriteRenderer) and component._index is self:
+            component.gameObject.transform.removeListener(component._onChanged)
+            component._index = None
+            self._dirty.pop(component, None)
+            self.index.remove(component)
+    
+    def query(self, bounds: engine.Bounds) -> list[SpriteRenderer]:
+        """
+        Finds the sprites whose image overlaps an area.
+        :param bounds: The area, as (xmin, ymin, xmax, ymax) in world coordinates.
+        """
+        self._flush()
+        return self.index.query(bounds)
+    def overlapPoint(self, point: engine.Vector3) -> list[SpriteRenderer]:
+        """
+        Finds the sprites whose image covers a point, edges included.
+        :param point: The point in world coordinates.
+        """
+        return self.query((point.x, point.y, point.x, point.y))
+    
+    def _markDirty(self, sprite: SpriteRenderer) -> None:
+        self._dirty[sprite] = None
+    def _flush(self) -> None:
+        for sprite in self._dirty:
+            bounds = sprite.bounds
+            if bounds is None:
+                self.index.remove(sprite)
+            else:
+                self.index.insert(sprite, bounds)
+        self._dirty.clear()
         
         
         
         
         
 class Camera(engine.Component, engine.ScreenView):
+    # How far outside the view, in world units, a sprite's bounds may lie and still be drawn.
+    # Bounds follow the simulated position, while sprites are drawn at the interpolated one.
+    cullMargin: float = 32.0
     def __init__(self, gameObject: engine.GameObject) -> None:
         engine.Component.__init__(self, gameObject)
         engine.ScreenView.__init__(self)
         self.clearColor: tuple[int, int, int, int] = (0, 0, 0, 0)
+        # Whether SpriteRenderers outside the view are skipped, using the SpriteIndex of the scene.
+        self.culling: bool = True
+        # Drawables drawn and SpriteRenderers skipped during the last render.
+        self.drawn: int = 0
+        self.culled: int = 0
+        self._orderOf: list[engine.Component] | None = None
+        self._order: dict[engine.Component, int] = {}
+        self._unculled: list[engine.Component] = []
+        self._surface: pygame.Surface | None = None
+        self._surfaceOf: np.ndarray | None = None
+        # Whether render only recomposites the parts of the view that changed since the last frame.
+        self.dirtyRendering: bool = False
+        # The rectangles of the surface changed by the last render, or None if all of it may have changed.
+        self.dirtyRects: list[pygame.Rect] | None = None
+        self._calls: list[tuple[Sprite, int, int, float]] | None = None
+        self._frame: dict[engine.Component, tuple[tuple[Sprite, int, int, float], ...]] | None = None
+        self._frameOf: tuple[np.ndarray, tuple[int, int, int, int], tuple[float, float], bool] | None = None
+        # The number of threads compositing horizontal bands of the view in parallel. 1, the default, composites on the calling thread.
+        # Only the numpy kernels run outside the GIL, so more workers only pay off on large sprites and free cores;
+        # measure with benchmarks/bands.py before raising it.
+        self.workers: int = 1
+        self._pool: ThreadPoolExecutor | None = None
+        self._poolSize = 0
+        self._closePool: weakref.finalize | None = None
+        # Whether sprites are depth-tested per pixel against z_buffer. Without it no z-buffer is kept:
+        # sprites are painted back to front, sorted by z, and later Drawables go over earlier ones at equal z.
+        self.depthBuffer: bool = True
+        self._paintOrder: list[engine.Component] = []
     
         self.view = np.zeros((512, 1024, 4), dtype=np.uint8)
-        self.z_buffer = np.zeros((512, 1024), dtype=np.float32)
+        self.z_buffer: NDArray[np.float32] | None = np.zeros((512, 1024), dtype=np.float32)
+        self._allocateScratch()
         
         engine.SYSTEM.currentScene.view = self
     
+    def _allocateScratch(self) -> None:
+        # Reused by show for the blend of each sprite, so drawing does not allocate view-sized temporaries.
+        height, width = self.view.shape[:2]
+        self._mask = np.empty((height, width), dtype=bool)
+        self._lanes = np.empty((2, height, width), dtype=np.uint32)
+        self._under = np.empty((2, height, width), dtype=np.uint32)
+    
     def worldToView(self, pos: engine.Vector3) -> engine.Vector3:
         """
         Convert a world position to a view position.
         :param pos: The world position to convert.
         :return: The converted view position.
         """
-        return pos - self.gameObject.transform.position
+        return pos - self.gameObject.transform.renderPosition
     def viewToWorld(self, pos: engine.Vector3) -> engine.Vector3:
         """
         Convert a view position to a world position.
         :param pos: The view position to convert.
         :return: The converted world position.
         """
-        return pos + self.gameObject.transform.position
+        return pos + self.gameObject.transform.renderPosition
     def worldToScreen(self, pos: engine.Vector3) -> engine.Vector3:
         """
         Convert a world position to a screen position.
         :param pos: The world position to convert.
         :return: The converted screen position.
         """
-        return self.gameObject.transform.scene.viewToScreen(pos - self.gameObject.transform.position)
+        return self.gameObject.transform.scene.viewToScreen(pos - self.gameObject.transform.renderPosition)
     def screenToWorld(self, pos: engine.Vector3) -> engine.Vector3:
         """
         Convert a screen position to a world position.
         :param pos: The screen position to convert.
         :return: The converted world position.
         """
-        return self.gameObject.transform.scene.screenToView(pos + self.gameObject.transform.position)
+        return self.gameObject.transform.scene.screenToView(pos + self.gameObject.transform.renderPosition)
         
     def render(self, surface: pygame.Surface, components: list[engine.Component]) -> None:
         if [*surface.get_size()] != [*self.view.shape[:2][::-1]]:
             self.view = np.zeros((surface.get_size()[1], surface.get_size()[0], 4), dtype=np.uint8)
-            self.z_buffer = np.zeros((surface.get_size()[1], surface.get_size()[0]), dtype=np.float32)
-        
-        self.view[:, :] = self.clearColor
+            self._allocateScratch()
+        if not self.depthBuffer:
+            self.z_buffer = None
+        elif self.z_buffer is None or self.z_buffer.shape != self.view.shape[:2]:
+            self.z_buffer = np.zeros(self.view.shape[:2], dtype=np.float32)
+        if self.workers <= 1 and self._pool is not None:
+            self.close()
         
-        self.z_buffer.fill(-float("inf"))
+        if self.dirtyRendering:
+            self._renderDirty(surface, components)
+            return
+        self._frame = None
+        self.dirtyRects = None
         
-        for obj in components:
-            if isinstance(obj, engine.Drawable):
-                obj.draw()
+        if self.workers > 1 or self.z_buffer is None:
+            calls, _ = self._record(components)
+            self._replay(calls, [pygame.Rect(0, 0, self.view.shape[1], self.view.shape[0])])
+        else:
+            self.view[:, :] = self.clearColor
+            
+            self.z_buffer.fill(-float("inf"))
+            
+            for obj in self._visible(components):
+                obj.draw() # type: ignore
     
-        surface.blit(
-            pygame.surfarray.make_surface( # type: ignore
-                np.transpose(
-                    cv2.cvtColor(self.view, cv2.COLOR_BGRA2RGB),
-                    (1, 0, 2)
-                )
-            ),
-            (0, 0)
-        )
-    def show(self, image: cv2.typing.MatLike, pos: engine.Vector3) -> None:
-        size_image = image.shape[:2]
-        size_view = self.view.shape[:2]
+        surface.blit(self._presentation(), (0, 0))
+    def _record(self, components: list[engine.Component]) -> tuple[list[tuple[Sprite, int, int, float]], dict[engine.Component, tuple[tuple[Sprite, int, int, float], ...]]]:
+        """
+        Draws the visible Drawables with their show calls recorded instead of composited.
+        Without a z-buffer the calls are sorted back to front (see _sortCalls).
+        :return: All the calls in the order to composite them, and the calls of each Drawable.
+        """
+        calls: list[tuple[Sprite, int, int, float]] = []
+        frame: dict[engine.Component, tuple[tuple[Sprite, int, int, float], ...]] = {}
+        self._calls = calls
+        try:
+            for obj in self._visible(components):
+                start = len(calls)
+                obj.draw() # type: ignore
+                frame[obj] = tuple(calls[start:])
+        finally:
+            self._calls = None
+        if self.z_buffer is None:
+            calls = self._sortCalls(frame)
+        return calls, frame
+    def _sortCalls(self, frame: dict[engine.Component, tuple[tuple[Sprite, int, int, float], ...]]) -> list[tuple[Sprite, int, int, float]]:
+        """
+        Orders the calls back to front: by z, then by the order of their Drawables, then as they were made.
+        The calls are laid out in the order of the last frame before the stable sort,
+        so it only has to move what changed and runs in close to linear time.
+        """
+        rank = {obj: index for index, obj in enumerate(frame)}
+        laid = [obj for obj in self._paintOrder if obj in rank]
+        if len(laid) != len(rank):
+            known = set(laid)
+            laid.extend(obj for obj in frame if obj not in known)
+        entries = [(call[3], rank[obj], index, obj, call) for obj in laid for index, call in enumerate(frame[obj])]
+        entries.sort(key=lambda entry: entry[:3])
+        self._paintOrder = list(dict.fromkeys(entry[3] for entry in entries))
+        return [entry[4] for entry in entries]
+    def _replay(self, calls: list[tuple[Sprite, int, int, float]], rects: list[pygame.Rect]) -> None:
+        """
+        Clears rectangles of the view and composites the recorded calls overlapping them, clipped to them.
+        With several workers each rectangle is cut into horizontal bands composited in parallel;
+        the rectangles must not overlap.
+        """
+        bounds = [self._callRect(*call) for call in calls]
+        def band(rect: pygame.Rect) -> tuple[int, int]:
+            self.view[rect.top:rect.bottom, rect.left:rect.right] = self.clearColor
+            if self.z_buffer is not None:
+                self.z_buffer[rect.top:rect.bottom, rect.left:rect.right] = -float("inf")
+            # Pixels written and blended, summed per band so the threads never share a counter.
+            pixels = blended = 0
+            for index in rect.collidelistall(bounds):
+                written = self._composite(*calls[index], rect.left, rect.top, rect.right, rect.bottom)
+                pixels += written
+                if calls[index][0].opacity is SpriteOpacity.Translucent:
+                    blended += written
+            return pixels, blended
+        workers = self.workers
+        if workers <= 1:
+            counts = [band(rect) for rect in rects]
+            self._countPixels(counts)
+            return
+        bands: list[pygame.Rect] = []
+        for rect in rects:
+            count = min(workers, rect.h)
+            edges = [rect.top + rect.h * i // count for i in range(count + 1)]
+            bands.extend(pygame.Rect(rect.left, top, rect.w, bottom - top) for top, bottom in zip(edges, edges[1:]))
+        if self._pool is None or self._poolSize != workers:
+            self.close()
+            self._pool = ThreadPoolExecutor(workers, thread_name_prefix="camera")
+            self._poolSize = workers
+            # The threads stop with the camera even if close is never called.
+            self._closePool = weakref.finalize(self, self._pool.shutdown, wait=False)
+        # Waits for every band and raises the first error.
+        self._countPixels(list(self._pool.map(band, bands)))
+    def close(self) -> None:
+        """
+        Stops the threads started for workers. Rendering with several workers again starts new ones.
+        """
+        if self._closePool is not None:
+            self._closePool()
+        self._pool, self._poolSize, self._closePool = None, 0, None
+    def _countPixels(self, counts: list[tuple[int, int]]) -> None:
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled:
+            profiler.count("render.pixels", sum(pixels for pixels, _ in counts))
+            profiler.count("render.blended", sum(blended for _, blended in counts))
+    def _renderDirty(self, surface: pygame.Surface, components: list[engine.Component]) -> None:
+        """
+        Renders like render, but only recomposites where the draw calls differ from the last frame.
+        Every Drawable is drawn with its show calls recorded instead of composited. A call that is new,
+        gone, or moved dirties its rectangles; a camera move scrolls the view and dirties the exposed strips.
+        Each dirty rectangle is then cleared and all the calls overlapping it are replayed, clipped to it.
+        """
+        height, width = self.view.shape[:2]
+        calls, frame = self._record(components)
+        
+        position = self.gameObject.transform.renderPosition
+        camera = (position.x, position.y)
+        previous, previousOf = self._frame, self._frameOf
+        self._frame, self._frameOf = frame, (self.view, self.clearColor, camera, self.z_buffer is None)
+        dirty: list[pygame.Rect] = []
+        scrollX = scrollY = 0
+        full = previous is None or previousOf is None or previousOf[0] is not self.view or previousOf[1] != self.clearColor or previousOf[3] != (self.z_buffer is None)
+        if not full:
+            # A camera move of whole pixels shifts everything already drawn by the same amount.
+            scrollX = round(previousOf[2][0] - camera[0]) # type: ignore
+            scrollY = round(camera[1] - previousOf[2][1]) # type: ignore
+            full = abs(scrollX) >= width or abs(scrollY) >= height or not self._sameOrder(previous, frame) # type: ignore
+        if not full:
+            for obj, drawn in previous.items(): # type: ignore
+                now = frame.get(obj)
+                moved = tuple((sprite, x + scrollX, y + scrollY, z) for sprite, x, y, z in drawn)
+                if now != moved:
+                    dirty.extend(self._callRect(*call) for call in moved)
+                    if now is not None:
+                        dirty.extend(self._callRect(*call) for call in now)
+            for obj, now in frame.items():
+                if obj not in previous: # type: ignore
+                    dirty.extend(self._callRect(*call) for call in now)
+            if scrollX or scrollY:
+                self._scroll(scrollX, scrollY)
+                if scrollX:
+                    dirty.append(pygame.Rect(0 if scrollX > 0 else width + scrollX, 0, abs(scrollX), height))
+                if scrollY:
+                    dirty.append(pygame.Rect(0, 0 if scrollY > 0 else height + scrollY, width, abs(scrollY)))
+            dirty = _mergeRects(dirty, pygame.Rect(0, 0, width, height))
+            full = sum(rect.w * rect.h for rect in dirty) * 2 >= width * height
+        if full:
+            dirty = [pygame.Rect(0, 0, width, height)]
+        
+        self._replay(calls, dirty)
+        
+        presentation = self._presentation()
+        if full or scrollX or scrollY:
+            surface.blit(presentation, (0, 0))
+            self.dirtyRects = [pygame.Rect(0, 0, width, height)]
+        else:
+            for rect in dirty:
+                surface.blit(presentation, rect, rect)
+            self.dirtyRects = dirty
+    def _sameOrder(self, previous: dict[engine.Component, tuple], frame: dict[engine.Component, tuple]) -> bool:
+        """
+        Whether the Drawables of both frames are drawn in the same relative order.
+        Calls at the same depth do not draw over each other, so a change of order can change the picture.
+        """
+        return [obj for obj in previous if obj in frame] == [obj for obj in frame if obj in previous]
+    def _callRect(self, sprite: Sprite, x: int, y: int, z: float) -> pygame.Rect:
+        left, top, right, bottom = sprite.trim
+        return pygame.Rect(x + left, y + top, right - left, bottom - top)
+    def _scroll(self, dx: int, dy: int) -> None:
+        """
+        Moves the contents of the view and the z-buffer by whole pixels. The exposed strips keep stale pixels.
+        """
+        height, width = self.view.shape[:2]
+        target = (slice(max(dy, 0), height + min(dy, 0)), slice(max(dx, 0), width + min(dx, 0)))
+        source = (slice(max(-dy, 0), height + min(-dy, 0)), slice(max(-dx, 0), width + min(-dx, 0)))
+        # Overlapping slices are copied through a temporary by numpy.
+        self.view[target] = self.view[source]
+        if self.z_buffer is not None:
+            self.z_buffer[target] = self.z_buffer[source]
+    def _presentation(self) -> pygame.Surface:
+        """
+        Returns a Surface sharing its pixels with view, made again only when view is replaced.
+        Its per-pixel alpha is off, so blitting it copies the colors as they are.
+        """
+        if self._surfaceOf is not self.view:
+            height, width = self.view.shape[:2]
+            self._surface = pygame.image.frombuffer(self.view, (width, height), "BGRA") # type: ignore
+            self._surface.set_alpha(None)
+            self._surfaceOf = self.view
+        return self._surface # type: ignore
+    def _visible(self, components: list[engine.Component]) -> list[engine.Component]:
+        """
+        Finds the Drawables to draw this frame, in the order of components.
+        SpriteRenderers come from the SpriteIndex, so sprites outside the view are never visited;
+        every other Drawable is always drawn.
+        :param components: All the active components of the scene, as given to render.
+        """
+        if not self.culling:
+            drawables = [obj for obj in components if isinstance(obj, engine.Drawable)]
+            self.drawn, self.culled = len(drawables), 0
+            self._countVisible()
+            return drawables
+        if components is not self._orderOf:
+            # The scene rebuilt its snapshot: rank the components again.
+            self._orderOf = components
+            self._order = {obj: rank for rank, obj in enumerate(components)}
+            self._unculled = [obj for obj in components if isinstance(obj, engine.Drawable) and not isinstance(obj, SpriteRenderer)]
+        scene = self.gameObject.transform.scene
+        center = self.gameObject.transform.renderPosition
+        height, width = self.view.shape[:2]
+        margin = width / 2 + self.cullMargin, height / 2 + self.cullMargin
+        index: SpriteIndex = scene.getSystem(SpriteIndex) # type: ignore
+        sprites = index.query((center.x - margin[0], center.y - margin[1], center.x + margin[0], center.y + margin[1]))
+        order = self._order
+        visible: list[engine.Component] = [sprite for sprite in sprites if sprite in order]
+        # The index only holds the sprites that have an image, so renderers with nothing to draw are not counted.
+        self.culled = len(index.index) - len(visible)
+        if visible:
+            visible.extend(self._unculled)
+            visible.sort(key=order.__getitem__)
+        else:
+            visible = self._unculled
+        self.drawn = len(visible)
+        self._countVisible()
+        return visible
+    def _countVisible(self) -> None:
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled:
+            profiler.count("render.drawn", self.drawn)
+            profiler.count("render.culled", self.culled)
+    def show(self, image: "cv2.typing.MatLike | Sprite", pos: engine.Vector3) -> None:
+        """
+        Composite a BGRA image into the view with its top-left corner at a world position.
+        Pixels are drawn where the image is not fully transparent and pos.z is in front of the z-buffer.
+        Blending is done in integers, out = (src * a + dst * (255 - a)) / 255 rounded, on every channel,
+        with the alpha channel of the source taken as 255; it matches the former float blending within 1.
+        Only the visible part of the image is touched, with the cheapest path its opacity allows.
+        :param image: The BGRA image, as a uint8 array of shape (height, width, 4), or its Sprite.
+        :param pos: The world position of the top-left corner of the image; z is its depth.
+        """
+        sprite = Sprite.of(image)
+        if sprite.opacity is SpriteOpacity.Empty:
+            return
         
         
         pos = self.worldToScreen(pos)
         
         
-        xleft = clamp(pos.x, 0, size_view[1])
-        xright = clamp(pos.x + size_image[1], 0, size_view[1])
-        ytop = clamp(pos.y, 0, size_view[0])
-        ybottom = clamp(pos.y + size_image[0], 0, size_view[0])
+        # Snap to whole pixels before clamping so the screen and image regions always have the same size.
+        call = (sprite, int(pos.x), int(pos.y), pos.z)
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled:
+            profiler.count("render.calls")
+        if self._calls is not None:
+            self._calls.append(call)
+            return
+        size_view = self.view.shape[:2]
+        written = self._composite(*call, 0, 0, size_view[1], size_view[0])
+        if profiler.enabled:
+            self._countPixels([(written, written if sprite.opacity is SpriteOpacity.Translucent else 0)])
+    def _composite(self, sprite: Sprite, x: int, y: int, z: float, left: int, top: int, right: int, bottom: int) -> int:
+        """
+        The compositing of show, restricted to a rectangle of the view.
+        :param sprite: The sprite to draw, not empty.
+        :param x: The screen column of the top-left corner of the image.
+        :param y: The screen row of the top-left corner of the image.
+        :param z: The depth of the image.
+        :param left: The first column of the view to touch.
+        :param top: The first row of the view to touch.
+        :param right: The column after the last one to touch.
+        :param bottom: The row after the last one to touch.
+        :return: The area of the region composited, 0 if the sprite is outside the rectangle or entirely behind the z-buffer.
+        """
+        trimX, trimY, trimX1, trimY1 = sprite.trim
+        px, py = x + trimX, y + trimY
+        x0 = max(px, left)
+        x1 = min(px + trimX1 - trimX, right)
+        y0 = max(py, top)
+        y1 = min(py + trimY1 - trimY, bottom)
+        if x0 >= x1 or y0 >= y1:
+            return 0
+        area = (y1 - y0) * (x1 - x0)
+        source = (slice(y0 - py, y1 - py), slice(x0 - px, x1 - px))
         
-        y0, x0 = int(ytop), int(xleft)
-        y1, x1 = int(ybottom), int(xright)
+        # Each BGRA pixel as one little-endian uint32, so the blend runs on whole pixels.
+        region_scr = self.view[y0:y1, x0:x1].view(np.uint32)[..., 0]
+        region_img = sprite.pixels[source] # type: ignore
+        if self.z_buffer is None:
+            # Painter's order: no depth test, the sprite goes over whatever is drawn already.
+            if sprite.opacity is SpriteOpacity.Opaque:
+                region_scr[...] = region_img
+            elif sprite.opacity is SpriteOpacity.Binary:
+                np.copyto(region_scr, region_img, where=sprite.mask[source]) # type: ignore
+            else:
+                lanes = self._blend(sprite, source, region_scr, y0, y1, x0, x1)
+                np.bitwise_or(lanes[0], lanes[1], out=region_scr)
+            return area
         region_z = self.z_buffer[y0:y1, x0:x1]
-        region_scr = self.view[y0:y1, x0:x1]
-        region_img = image[y0 - int(pos.y):y1 - int(pos.y),
-                            x0 - int(pos.x):x1 - int(pos.x)]
-        alpha = region_img[..., 3] / 255.0
-        alpha_mask = alpha > 0
-        depth_mask = pos.z > region_z
-        final_mask = alpha_mask & depth_mask
+        
+        # Scratch is taken at the same place as the region, so bands composited in parallel never share it.
+        depth_mask = np.less(region_z, z, out=self._mask[y0:y1, x0:x1])
+        if not depth_mask.any():
+            return 0
+        covered = depth_mask.all()
+        if sprite.opacity is SpriteOpacity.Opaque:
+            if covered:
+                region_scr[...] = region_img
+                region_z.fill(z)
+            else:
+                np.copyto(region_scr, region_img, where=depth_mask)
+                np.copyto(region_z, z, where=depth_mask)
+            return area
+        final_mask = np.logical_and(depth_mask, sprite.mask[source], out=depth_mask) # type: ignore
+        np.copyto(region_z, z, where=final_mask)
+        if sprite.opacity is SpriteOpacity.Binary:
+            np.copyto(region_scr, region_img, where=final_mask)
+            return area
+        
+        lanes = self._blend(sprite, source, region_scr, y0, y1, x0, x1)
+        if covered:
+            np.bitwise_or(lanes[0], lanes[1], out=region_scr)
+        else:
+            # Pixels behind the z-buffer keep the view as it was.
+            np.bitwise_or(lanes[0], lanes[1], out=lanes[0])
+            np.copyto(region_scr, lanes[0], where=final_mask)
+        return area
+    def _blend(self, sprite: Sprite, source: tuple[slice, slice], region_scr: NDArray[np.uint32], y0: int, y1: int, x0: int, x1: int) -> NDArray[np.uint32]:
+        """
+        Blends a translucent sprite over a region of the view, without writing it.
+        Transparent pixels have weight 255 and give the view back exactly as it was.
+        :return: The blue/red and green/alpha lanes of the result, to be or-ed together.
+        """
+        lanes = self._lanes[:, y0:y1, x0:x1]
+        under = self._under[:, y0:y1, x0:x1]
+        np.bitwise_and(region_scr, 0x00FF00FF, out=under[0])
+        np.right_shift(region_scr, 8, out=under[1])
+        under[1] &= 0x00FF00FF
+        under *= sprite.weight[source] # type: ignore
+        np.add(sprite.premultiplied[(slice(None), *source)], under, out=lanes) # type: ignore
+        # Divide each lane by 255 with rounding: (v + 128 + ((v + 128) >> 8)) >> 8.
+        lanes += 0x00800080
+        np.right_shift(lanes, 8, out=under)
+        under &= 0x00FF00FF
+        lanes += under
+        lanes >>= 8
+        lanes &= 0x00FF00FF
+        lanes[1] <<= 8
+        return lanes
+        
 
-        region_z[final_mask] = pos.z
-        alpha = alpha[..., np.newaxis]  # for broadcasting
 
-        region_scr[final_mask, :3] = (
-            alpha[final_mask] * region_img[final_mask, :3] +
-            (1 - alpha[final_mask]) * region_scr[final_mask, :3]
-        ).astype(np.uint8)
+def _mergeRects(rects: list[pygame.Rect], area: pygame.Rect) -> list[pygame.Rect]:
+    """
+    Clips rectangles to an area and merges the overlapping ones into their union, until none overlap.
+    :param rects: The rectangles to merge.
+    :param area: The area to clip them to.
+    :return: The merged rectangles, without empty ones.
+    """
+    merged: list[pygame.Rect] = []
+    for rect in rects:
+        rect = rect.clip(area)
+        if rect.w <= 0 or rect.h <= 0:
+            continue
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
 
-        region_scr[final_mask, 3] = (
-            alpha[final_mask].squeeze() * 255 +
-            (1 - alpha[final_mask].squeeze()) * region_scr[final_mask, 3]
-        ).astype(np.uint8)
-        
+Color = tuple[int, int, int, int]
 
+class _TextCache:
+    """
+    Rasterizes text once and keeps it, for everything that draws text every frame.
+    Strings of pygame fonts are composed from cached glyphs, so a changing number only costs a copy;
+    strings of OpenCV Hershey fonts are rasterized whole. Both are kept in LRU caches keyed by font, size, colors and text.
+    The images are BGRA, ready for Camera.show or a SpriteRenderer, and shared between callers, so they are read-only.
+    """
+    def __init__(self, capacity: int = 1024):
+        """
+        :param capacity: How many glyphs, and how many strings, to keep.
+        """
+        self.capacity = capacity
+        self._fonts: dict[tuple[str, int], pygame.font.Font] = {}
+        # Every glyph with the number of rows it rises above the ascent of its font.
+        self._glyphs: OrderedDict[tuple, tuple[int, NDArray[np.uint8]]] = OrderedDict()
+        self._strings: OrderedDict[tuple, NDArray[np.uint8]] = OrderedDict()
+    
+    def font(self, name: str, size: int) -> pygame.font.Font:
+        """
+        Returns the shared system font of a name and size, loading it the first time.
+        """
+        font = self._fonts.get((name, size))
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self._fonts[(name, size)] = pygame.font.SysFont(name, size)
+        return font
+    def render(self, text: str, font: "pygame.font.Font | int", color: Color = (255, 255, 255, 255), background: Color = (0, 0, 0, 255), scale: float = 1, thickness: int = 1) -> NDArray[np.uint8]:
+        """
+        Returns the image of a line of text, rasterizing only what is not cached yet.
+        :param text: The text, on one line.
+        :param font: A pygame font, such as one from font(), or an OpenCV Hershey font face such as cv2.FONT_HERSHEY_SIMPLEX.
+        :param color: The BGRA color of the text.
+        :param background: The BGRA color around the text. With alpha 0, the edges of pygame glyphs stay antialiased.
+        :param scale: The scale of a Hershey font. Pygame fonts have their size already.
+        :param thickness: The stroke thickness of a Hershey font, in pixels.
+        :return: A read-only BGRA image of the text. Hershey text has a margin of thickness pixels on every side,
+            and its baseline is baseline + thickness rows above the bottom, baseline as given by cv2.getTextSize.
+        """
+        color, background = tuple(color), tuple(background)
+        isHershey = isinstance(font, int)
+        key = (font, text, color, background, scale, thickness) if isHershey else (font, text, color, background)
+        image = self._strings.get(key)
+        if image is not None:
+            self._strings.move_to_end(key)
+            return image
+        if isHershey:
+            (width, height), baseline = cv2.getTextSize(text, font, scale, thickness)
+            image = np.empty((height + baseline + 2 * thickness, width + 2 * thickness, 4), dtype=np.uint8)
+            image[...] = background
+            cv2.putText(image, text, (thickness, thickness + height), font, scale, color, thickness)
+        else:
+            image = self._compose([self._glyph(font, char, color, background) for char in text], font.get_height(), background) # type: ignore
+        image.flags.writeable = False
+        return self._remember(self._strings, key, image)
+    def clear(self) -> None:
+        self._glyphs.clear()
+        self._strings.clear()
+    
+    def _compose(self, glyphs: list[tuple[int, NDArray[np.uint8]]], height: int, background: Color) -> NDArray[np.uint8]:
+        """
+        Lays glyphs out side by side on a common baseline. Glyphs rising above the ascent or falling below the descent
+        of their font are taller than the others, so the line grows to fit them, as font.render does.
+        """
+        top = max((rise for rise, _ in glyphs), default=0)
+        height = max([height + top, *(top - rise + glyph.shape[0] for rise, glyph in glyphs)])
+        image = np.empty((height, sum(glyph.shape[1] for _, glyph in glyphs), 4), dtype=np.uint8)
+        image[...] = background if background[3] != 0 else 0
+        x = 0
+        for rise, glyph in glyphs:
+            y = top - rise
+            image[y:y + glyph.shape[0], x:x + glyph.shape[1]] = glyph
+            x += glyph.shape[1]
+        return image
+    def _glyph(self, font: pygame.font.Font, char: str, color: Color, background: Color) -> tuple[int, NDArray[np.uint8]]:
+        key = (font, char, color, background)
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self._glyphs.move_to_end(key)
+            return glyph
+        # Pygame takes RGB colors.
+        if background[3] == 0:
+            surface = font.render(char, True, color[2::-1])
+        else:
+            surface = font.render(char, True, color[2::-1], background[2::-1])
+        glyph = np.frombuffer(pygame.image.tobytes(surface, "BGRA"), dtype=np.uint8).reshape(surface.get_height(), surface.get_width(), 4).copy()
+        if background[3] != 0:
+            glyph[..., 3] = background[3]
+        elif color[3] != 255:
+            glyph[..., 3] = (glyph[..., 3].astype(np.uint16) * color[3] + 127) // 255
+        glyph.flags.writeable = False
+        metrics = font.metrics(char)[0]
+        rise = max(0, metrics[3] - font.get_ascent()) if metrics is not None else 0
+        return self._remember(self._glyphs, key, (rise, glyph))
+    def _remember(self, cache: OrderedDict, key: tuple, value: Any) -> Any:
+        cache[key] = value
+        if len(cache) > self.capacity:
+            cache.popitem(last=False)
+        return value
+
+TextCache = _TextCache()
 
 class Debugger(engine.Component, engine.Drawable):
     def __init__(self, gameObject: engine.GameObject):
         super().__init__(gameObject)
         if not pygame.get_init():
             pygame.init()
-        self.font = pygame.font.SysFont("Arial", 36)
+        self.font = TextCache.font("Arial", 36)
+        self.smallFont = TextCache.font("Arial", 16)
+        # How many of the slowest component classes and systems to list under the FPS while the profiler is enabled.
+        self.profileLines = 5
+        self._lines: list[tuple[str, pygame.font.Font, Color]] = []
+        self._image: NDArray[np.uint8] | None = None
     
     def draw(self) -> None:
         fps = 1 / engine.Time.deltaTime
         text = f"FPS: {fps:.2f}"
-        text_surface = self.font.render(text, True, (255, 255, 255, 255), (0, 0, 0, 0))
-        text_image: cv2.typing.MatLike = pygame.surfarray.array3d(text_surface) # type: ignore
-        text_image = cv2.cvtColor(text_image, cv2.COLOR_RGB2BGRA)
-        text_image = np.transpose(text_image, (1, 0, 2))
+        lines = [(text, self.font, (255, 255, 255, 255))]
+        profiler = engine.SYSTEM.profiler
+        if profiler.enabled and self.profileLines > 0:
+            phases = profiler.top(4, categories=("phase",))
+            if phases:
+                lines.append(("  ".join(f"{name} {seconds * 1e3:.1f}ms" for name, seconds in phases), self.smallFont, (0, 255, 255, 255)))
+            for name, seconds in profiler.top(self.profileLines):
+                lines.append((f"{seconds * 1e3:6.2f}ms {name}", self.smallFont, (255, 255, 255, 255)))
+        if lines != self._lines or self._image is None:
+            self._lines = lines
+            images = [TextCache.render(line, font, color) for line, font, color in lines]
+            text_image = np.zeros((sum(image.shape[0] for image in images), max(image.shape[1] for image in images), 4), dtype=np.uint8)
+            text_image[..., 3] = 255
+            y = 0
+            for image in images:
+                text_image[y:y + image.shape[0], :image.shape[1]] = image
+                y += image.shape[0]
+            self._image = text_image
         self.gameObject.transform.scene.show(
-            text_image,
+            self._image,
             engine.Vector3.zero()
         )
         
     
 
 
+def _advanceKeys() -> None:
+    # Keys pressed last frame are now held, and keys released last frame are forgotten.
+    for key in list(engine.Input.keyInfo.keys()):
+        if engine.Input.keyInfo[key] == engine.KeyMotion.Up:
+            del engine.Input.keyInfo[key]
+        elif engine.Input.keyInfo[key] == engine.KeyMotion.Down:
+            engine.Input.keyInfo[key] = engine.KeyMotion.Hold
+
+def _handleEvent(event: pygame.event.Event) -> bool:
+    """
+    Applies a pygame event to Input.
+    :return: False if the event asks to quit.
+    """
+    if event.type == pygame.QUIT:
+        return False
+    elif event.type == pygame.VIDEORESIZE:
+        pass
+        # TODO
+    elif event.type == pygame.MOUSEMOTION:
+        engine.Input.mousePosition = engine.Vector3(event.pos[0], event.pos[1])
+    elif event.type == pygame.KEYDOWN:
+        engine.Input.keyInfo[f"key-{event.key}"] = engine.KeyMotion.Down
+    elif event.type == pygame.KEYUP:
+        engine.Input.keyInfo[f"key-{event.key}"] = engine.KeyMotion.Up
+    elif event.type == pygame.MOUSEBUTTONDOWN:
+        keyname = engine.Input.MOUSE_BUTTON_MAP.get(event.button)
+        if keyname is not None:
+            engine.Input.keyInfo[keyname] = engine.KeyMotion.Down
+        else:
+            print("Unknown mouse button:", event.button)
+    elif event.type == pygame.MOUSEBUTTONUP:
+        keyname = engine.Input.MOUSE_BUTTON_MAP.get(event.button)
+        if keyname is not None:
+            engine.Input.keyInfo[keyname] = engine.KeyMotion.Up
+        else:
+            print("Unknown mouse button:", event.button)
+    return True
+
 def start():
     pygame.init()
 
@@ -169,43 +887,93 @@ def start():
     running = True
     engine.SYSTEM.currentScene.surface = surface
     engine.SYSTEM.currentScene.start()
+    engine.SYSTEM.time.start()
+    profiler = engine.SYSTEM.profiler
     while running:
-        for key in list(engine.Input.keyInfo.keys()):
-            if engine.Input.keyInfo[key] == engine.KeyMotion.Up:
-                del engine.Input.keyInfo[key]
-            elif engine.Input.keyInfo[key] == engine.KeyMotion.Down:
-                engine.Input.keyInfo[key] = engine.KeyMotion.Hold
+        profiling = profiler.enabled
+        if profiling:
+            profiler.beginFrame()
+            begin = time.perf_counter()
+        _advanceKeys()
         
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.VIDEORESIZE:
-                pass
-                # TODO
-            elif event.type == pygame.MOUSEMOTION:
-                engine.Input.mousePosition = engine.Vector3(event.pos[0], event.pos[1])
-            elif event.type == pygame.KEYDOWN:
-                engine.Input.keyInfo[f"key-{event.key}"] = engine.KeyMotion.Down
-            elif event.type == pygame.KEYUP:
-                engine.Input.keyInfo[f"key-{event.key}"] = engine.KeyMotion.Up
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                keyname = engine.Input.MOUSE_BUTTON_MAP.get(event.button)
-                if keyname is not None:
-                    engine.Input.keyInfo[keyname] = engine.KeyMotion.Down
-                else:
-                    print("Unknown mouse button:", event.button)
-            elif event.type == pygame.MOUSEBUTTONUP:
-                keyname = engine.Input.MOUSE_BUTTON_MAP.get(event.button)
-                if keyname is not None:
-                    engine.Input.keyInfo[keyname] = engine.KeyMotion.Up
-                else:
-                    print("Unknown mouse button:", event.button)
+            running = _handleEvent(event) and running
+        if profiling:
+            profiler.record("events", "phase", begin, time.perf_counter())
                 
         
-        dofixed = engine.SYSTEM.time.update()
-        engine.SYSTEM.currentScene.update()
-        if dofixed:
-            engine.SYSTEM.currentScene.fixedUpdate()
-            engine.SYSTEM.currentScene.render(surface)
-        pygame.display.flip()
+        engine.SYSTEM.step()
+        engine.SYSTEM.currentScene.render(surface)
+        if profiling:
+            begin = time.perf_counter()
+        view = engine.SYSTEM.currentScene.view
+        if isinstance(view, Camera) and view.dirtyRects is not None:
+            pygame.display.update(view.dirtyRects)
+        else:
+            pygame.display.flip()
+        if profiling:
+            profiler.record("present", "phase", begin, time.perf_counter())
+            profiler.endFrame()
 
+def runHeadless(
+    frames: int | None = None,
+    deltaTime: float = 1 / 60,
+    until: Callable[[], bool] | None = None,
+    render: bool = True,
+    size: tuple[int, int] = (1024, 512),
+    events: Callable[[int], Iterable[pygame.event.Event]] | None = None,
+    onFrame: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Runs the current scene like start, but without a window and on a fixed clock, for tests and benchmarks.
+    Every frame advances the time by exactly deltaTime, so two runs of the same scene and events
+    give the same transforms and the same frames.
+    :param frames: The most frames to run, or None to run until until holds.
+    :param deltaTime: The duration of every frame in seconds.
+    :param until: Checked after every frame; the run stops once it returns True.
+    :param render: Whether to render every frame, to an off-screen surface of the given size.
+    :param size: The (width, height) of the off-screen surface.
+    :param events: Gives the pygame events of a frame from its index, to script the input.
+    :param onFrame: Called with the index of every frame once it is stepped and rendered.
+    :return: The number of frames run.
+    """
+    if frames is None and until is None:
+        raise ValueError("runHeadless needs frames or until to stop.")
+    # Fonts and surfaces need pygame, but nothing may need a display.
+    # The dummy driver is only asked for during this init; the environment of the process is left as it was.
+    if not pygame.display.get_init() and "SDL_VIDEODRIVER" not in os.environ:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        try:
+            pygame.init()
+        finally:
+            del os.environ["SDL_VIDEODRIVER"]
+    else:
+        pygame.init()
+    
+    scene = engine.SYSTEM.currentScene
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    scene.surface = surface
+    scene.start()
+    engine.SYSTEM.time.start()
+    profiler = engine.SYSTEM.profiler
+    frame = 0
+    while frames is None or frame < frames:
+        if profiler.enabled:
+            profiler.beginFrame()
+        _advanceKeys()
+        running = True
+        if events is not None:
+            for event in events(frame):
+                running = _handleEvent(event) and running
+        
+        engine.SYSTEM.step(deltaTime)
+        if render:
+            scene.render(surface)
+        if profiler.enabled:
+            profiler.endFrame()
+        if onFrame is not None:
+            onFrame(frame)
+        frame += 1
+        if not running or (until is not None and until()):
+            break
+    return frame
@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+path_here = Path(__file__).parent.resolve()
+sys.path.append(str(path_here.parent.absolute()))
+# Nothing under test needs a window.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pytest
+import engine
+
+
+@pytest.fixture(autouse=True)
+def scene() -> engine.Scene:
+    """
+    Runs every test in a new, empty scene.
+    """
+    engine.SYSTEM.currentScene = engine.Scene()
+    return engine.SYSTEM.currentScene
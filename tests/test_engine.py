@@ -0,0 +1,150 @@
+import pytest
+import engine
+from engine import Component, GameObject, Vector3, _Time
+
+
+def test_position_reads_are_independent():
+    obj = GameObject("obj")
+    obj.transform.position = Vector3(1, 2, 0)
+    a = obj.transform.position
+    b = obj.transform.position
+    b.y += 10
+    assert (a.x, a.y) == (1, 2)
+
+def test_position_in_place_edit_moves_the_object():
+    parent = GameObject("parent")
+    parent.transform.position = Vector3(100, 0, 0)
+    child = GameObject("child", parent.transform)
+    child.transform.localPosition = Vector3(5, 5, 0)
+    child.transform.position.y += 10
+    assert (child.transform.position.x, child.transform.position.y) == (105, 15)
+    assert (child.transform.localPosition.x, child.transform.localPosition.y) == (5, 15)
+
+def test_position_in_place_edit_moves_the_children():
+    parent = GameObject("parent")
+    child = GameObject("child", parent.transform)
+    child.transform.localPosition = Vector3(1, 1, 0)
+    assert child.transform.position.x == 1
+    parent.transform.position.x += 3
+    assert child.transform.position.x == 4
+
+class FixedCounter(Component):
+    """
+    Counts the fixed steps it runs and the deltaTime it sees in them.
+    """
+    def __init__(self, gameObject: GameObject) -> None:
+        super().__init__(gameObject)
+        self.steps = 0
+        self.deltaTimes: list[float] = []
+    def fixedUpdate(self) -> None:
+        self.steps += 1
+        self.deltaTimes.append(engine.Time.deltaTime)
+
+def test_fixed_steps_accumulate_and_clamp():
+    clock = _Time()
+    clock.fixedScale = 0.01
+    clock.start()
+    steps, alphas = [], []
+    for deltaTime in (0.005, 0.005, 0.035, 0.2, 0.001):
+        steps.append(clock.update(deltaTime))
+        alphas.append(clock.alpha)
+    assert steps == [0, 1, 3, 5, 0]
+    assert alphas == pytest.approx([0.5, 0.0, 0.5, 0.5, 0.6], abs=1e-9)
+
+def test_system_step_runs_the_fixed_steps(monkeypatch):
+    counter = GameObject("counter").addComponent(FixedCounter)
+    monkeypatch.setattr(engine.Time, "fixedScale", 0.01)
+    engine.Time.start()
+    try:
+        assert [engine.SYSTEM.step(deltaTime) for deltaTime in (0.005, 0.005, 0.035, 0.2, 0.001)] == [0, 1, 3, 5, 0]
+        assert counter.steps == 9
+        assert counter.deltaTimes == [0.01] * 9
+        assert engine.Time.deltaTime == pytest.approx(0.001)
+    finally:
+        engine.Time.start()
+
+def test_fixed_scale_zero_steps_once_per_frame():
+    clock = _Time()
+    clock.start()
+    assert clock.fixedScale == 0
+    for deltaTime in (0.005, 0.2):
+        assert clock.update(deltaTime) == 1
+        assert clock.alpha == 1.0
+        assert clock.fixedDeltaTime == clock.deltaTime == deltaTime
+    counter = GameObject("counter").addComponent(FixedCounter)
+    assert engine.SYSTEM.step(0.03) == 1
+    assert counter.deltaTimes == [pytest.approx(0.03)]
+
+def test_profiler_counts_vectors_without_patching_them():
+    init = Vector3.__init__
+    engine.Profiler.enabled = True
+    try:
+        engine.Profiler.beginFrame()
+        vectors = [Vector3(i, i) for i in range(10)]
+        engine.Profiler.endFrame()
+        assert engine.Profiler.counters["engine.vectors"] >= len(vectors)
+        assert Vector3.__init__ is init
+    finally:
+        engine.Profiler.enabled = False
+        engine.Profiler.clear()
+    assert Vector3._onCreate is None
+    engine.Profiler.beginFrame()
+    Vector3(1, 2)
+    engine.Profiler.endFrame()
+    assert "engine.vectors" not in engine.Profiler.counters
+    engine.Profiler.clear()
+
+def test_position_read_kept_in_a_variable_stays_bound():
+    player = GameObject("player")
+    player.transform.position = Vector3(10, 20, 0)
+    camera = GameObject("camera", player.transform)
+    camera.transform.localPosition = Vector3(0, 0, -100)
+    sky = GameObject("sky")
+    campos = camera.transform.position
+    sky.transform.position = Vector3(campos.x, campos.y, -10)
+    assert camera.transform.localPosition.z == -100
+    assert (sky.transform.position.x, sky.transform.position.y, sky.transform.position.z) == (10, 20, -10)
+    campos.z = -10
+    assert camera.transform.localPosition.z == -10
+
+class Tag(Component):
+    pass
+
+def test_components_come_in_the_order_they_entered_the_scene():
+    scene = engine.SYSTEM.currentScene
+    a, b = GameObject("a"), GameObject("b")
+    child = GameObject("child", a.transform)
+    tags = {name: obj.addComponent(Tag) for name, obj in (("b", b), ("a", a), ("child", child))}
+    def names(where: engine.Scene) -> list[str]:
+        return [tag.gameObject.name for tag in where.getComponents(Tag)]
+    assert names(scene) == ["b", "a", "child"]
+    # Every Transform comes before every Tag, as in SYSTEM.orders.
+    components = scene.getAllComponents()
+    assert components.index(tags["b"]) == len(components) - 3
+    
+    version = scene.version
+    a.active = False
+    assert names(scene) == ["b"]
+    assert tags["a"] not in scene.getAllComponents() and child.transform not in scene.getAllComponents()
+    a.active = True
+    assert names(scene) == ["b", "a", "child"]
+    b.active = False
+    b.active = True
+    assert names(scene) == ["a", "child", "b"]
+    assert scene.version > version
+    
+    # A child under an inactive parent stays out when activated.
+    a.active = False
+    child.active = False
+    child.active = True
+    assert names(scene) == ["b"]
+    a.active = True
+    assert names(scene) == ["b", "a", "child"]
+    
+    other = engine.Scene()
+    child.transform.parent = other.transform
+    assert names(scene) == ["b", "a"]
+    assert names(other) == ["child"]
+    child.transform.parent = b.transform
+    assert names(other) == []
+    assert names(scene) == ["b", "a", "child"]
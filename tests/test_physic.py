@@ -0,0 +1,265 @@
+import numpy as np
+import pytest
+import engine
+from engine import GameObject, Vector3
+from physic import CollisionDetection, Collider, Physics, PhysicsWorld, Rigidbody
+from renderer import runHeadless
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Steps the physics at 100 Hz from a fresh accumulator, and leaves the clock as it was.
+    """
+    monkeypatch.setattr(engine.Time, "fixedScale", 0.01)
+    engine.Time.start()
+    yield engine.Time
+    engine.Time.start()
+
+def box(name: str, position: Vector3, width: float, height: float) -> Collider:
+    obj = GameObject(name)
+    obj.transform.position = position
+    collider = obj.addComponent(Collider)
+    collider.contour = np.array([[-width / 2, -height / 2], [width / 2, -height / 2], [width / 2, height / 2], [-width / 2, height / 2]])
+    return collider
+
+def body(name: str, position: Vector3, width: float, height: float) -> Collider:
+    collider = box(name, position, width, height)
+    collider.gameObject.addComponent(Rigidbody)
+    return collider
+
+class Recorder(engine.Component):
+    """
+    Records the contact events its GameObject receives, as (event, name of the other GameObject).
+    """
+    def __init__(self, gameObject: GameObject) -> None:
+        super().__init__(gameObject)
+        self.events: list[tuple[str, str]] = []
+    def onCollisionEnter(self, other: Collider) -> None: self.events.append(("onCollisionEnter", other.gameObject.name))
+    def onCollisionStay(self, other: Collider) -> None: self.events.append(("onCollisionStay", other.gameObject.name))
+    def onCollisionExit(self, other: Collider) -> None: self.events.append(("onCollisionExit", other.gameObject.name))
+    def onTriggerEnter(self, other: Collider) -> None: self.events.append(("onTriggerEnter", other.gameObject.name))
+    def onTriggerExit(self, other: Collider) -> None: self.events.append(("onTriggerExit", other.gameObject.name))
+
+def test_continuous_body_added_before_its_collider_does_not_tunnel():
+    box("wall", Vector3(0, 100, 0), 200, 10)
+    # The component order of the bullets of the shooting example: the Rigidbody first.
+    bullet = GameObject("bullet")
+    body = bullet.addComponent(Rigidbody)
+    body.velocity = Vector3(0, 500, 0)
+    body.collisionDetection = CollisionDetection.Continuous
+    collider = bullet.addComponent(Collider)
+    collider.contour = np.array([[-5, -5], [5, -5], [5, 5], [-5, 5]])
+    assert body.collider is collider
+    runHeadless(4, deltaTime=0.25, render=False)
+    assert bullet.transform.position.y < 100
+
+def test_sweep_without_contour_hits_nothing():
+    box("wall", Vector3(0, 100, 0), 200, 10)
+    coin = GameObject("coin").addComponent(Collider)
+    coin.contour = None
+    assert coin.sweep(Vector3(0, 200, 0)) is None
+
+def test_raycast_in_a_fresh_scene():
+    wall = box("wall", Vector3(100, 0, 0), 10, 100)
+    hit = Physics.raycast(Vector3(0, 0, 0), Vector3(1, 0, 0))
+    assert hit is not None and hit.collider is wall
+
+def test_raycast_finds_a_collider_moved_this_frame():
+    wall = box("wall", Vector3(100, 0, 0), 10, 100)
+    runHeadless(1, render=False)
+    wall.gameObject.transform.position = Vector3(1000, 0, 0)
+    hit = Physics.raycast(Vector3(0, 0, 0), Vector3(1, 0, 0))
+    assert hit is not None and hit.collider is wall
+    hits = Physics.raycastMany(np.array([[0.0, 0.0], [0.0, 200.0]]), np.array([[1.0, 0.0], [1.0, 0.0]]))
+    assert hits[0] is not None and hits[0].collider is wall
+    assert hits[1] is None
+
+def test_teleport_is_not_interpolated(clock):
+    obj = GameObject("body")
+    body = obj.addComponent(Rigidbody)
+    body.velocity = Vector3(100, 0, 0)
+    assert engine.SYSTEM.step(0.015) == 1
+    assert clock.alpha == pytest.approx(0.5)
+    assert obj.transform.renderPosition.x == pytest.approx(0.5)
+    obj.transform.position = Vector3(500, 0, 0)
+    assert obj.transform.renderPosition.x == 500
+    assert engine.SYSTEM.step(0.01) == 1
+    assert obj.transform.renderPosition.x == pytest.approx(500.5)
+
+def test_removed_body_is_not_interpolated(clock):
+    obj = GameObject("body")
+    body = obj.addComponent(Rigidbody)
+    body.velocity = Vector3(100, 0, 0)
+    engine.SYSTEM.step(0.015)
+    obj.active = False
+    assert obj.transform.renderPosition.x == obj.transform.position.x == pytest.approx(1)
+
+def test_collision_events_enter_stay_exit():
+    wall = box("wall", Vector3(0, 0, 0), 10, 10)
+    mover = body("mover", Vector3(100, 0, 0), 10, 10)
+    walls, movers = wall.gameObject.addComponent(Recorder), mover.gameObject.addComponent(Recorder)
+    engine.SYSTEM.step(1 / 60)
+    assert walls.events == movers.events == []
+    mover.gameObject.transform.position = Vector3(5, 0, 0)
+    engine.SYSTEM.step(1 / 60)
+    engine.SYSTEM.step(1 / 60)
+    mover.gameObject.transform.position = Vector3(100, 0, 0)
+    engine.SYSTEM.step(1 / 60)
+    engine.SYSTEM.step(1 / 60)
+    assert walls.events == [("onCollisionEnter", "mover"), ("onCollisionStay", "mover"), ("onCollisionExit", "mover")]
+    assert movers.events == [("onCollisionEnter", "wall"), ("onCollisionStay", "wall"), ("onCollisionExit", "wall")]
+
+def test_trigger_events_replace_collision_events():
+    zone = box("zone", Vector3(0, 0, 0), 10, 10)
+    zone.isTrigger = True
+    mover = body("mover", Vector3(5, 0, 0), 10, 10)
+    zones, movers = zone.gameObject.addComponent(Recorder), mover.gameObject.addComponent(Recorder)
+    engine.SYSTEM.step(1 / 60)
+    engine.SYSTEM.step(1 / 60)
+    mover.gameObject.transform.position = Vector3(100, 0, 0)
+    engine.SYSTEM.step(1 / 60)
+    assert zones.events == [("onTriggerEnter", "mover"), ("onTriggerExit", "mover")]
+    assert movers.events == [("onTriggerEnter", "zone"), ("onTriggerExit", "zone")]
+
+def test_deactivated_object_leaves_its_contacts():
+    wall = box("wall", Vector3(0, 0, 0), 10, 10)
+    mover = body("mover", Vector3(5, 0, 0), 10, 10)
+    walls, movers = wall.gameObject.addComponent(Recorder), mover.gameObject.addComponent(Recorder)
+    engine.SYSTEM.step(1 / 60)
+    mover.gameObject.active = False
+    engine.SYSTEM.step(1 / 60)
+    assert walls.events == [("onCollisionEnter", "mover"), ("onCollisionExit", "mover")]
+    assert movers.events == [("onCollisionEnter", "wall"), ("onCollisionExit", "wall")]
+    assert wall.check() is None
+    mover.gameObject.active = True
+    engine.SYSTEM.step(1 / 60)
+    assert walls.events[-1] == ("onCollisionEnter", "mover")
+    assert wall.check() is mover
+
+def test_check_answers_from_the_last_step():
+    wall = box("wall", Vector3(0, 0, 0), 10, 10)
+    mover = body("mover", Vector3(5, 0, 0), 10, 10)
+    engine.SYSTEM.step(1 / 60)
+    assert mover.check() is wall and wall.check() is mover
+    # Moves are seen at the next fixed step.
+    mover.gameObject.transform.position = Vector3(100, 0, 0)
+    assert mover.check() is wall
+    engine.SYSTEM.step(1 / 60)
+    assert mover.check() is None and wall.check() is None
+    # Static colliders are only tested against each other when asked.
+    other = box("other", Vector3(5, 0, 0), 10, 10)
+    engine.SYSTEM.step(1 / 60)
+    assert wall.check() is other and other.check() is wall
+
+def test_integration_matches_per_body_reference():
+    rng = np.random.default_rng(7)
+    world = engine.SYSTEM.currentScene.getSystem(PhysicsWorld)
+    world.sleepThreshold = 0
+    box("floor", Vector3(0, -5, 0), 2000, 10)
+    bodies: list[Rigidbody] = []
+    # Per body: position, velocity, acceleration, whether it has a collider, and whether it is grounded.
+    reference: list[list] = []
+    for i in range(40):
+        solid = i % 2 == 0
+        position = Vector3(i * 20 - 400, float(rng.uniform(6, 60)), 0)
+        velocity = Vector3(0 if solid else float(rng.uniform(-50, 50)), float(rng.uniform(-200, 50)), 0)
+        acceleration = Vector3(0 if solid else float(rng.uniform(-5, 5)), float(rng.uniform(-100, 0)), 0)
+        if solid:
+            obj = body(f"body{i}", position, 10, 10).gameObject
+        else:
+            obj = GameObject(f"body{i}")
+            obj.transform.position = position
+            obj.addComponent(Rigidbody)
+        rigidbody = obj.getComponent(Rigidbody)
+        rigidbody.velocity = velocity
+        rigidbody.acceleration = acceleration
+        bodies.append(rigidbody)
+        reference.append([position, velocity, acceleration, solid, False])
+    deltaTime = 1 / 60
+    for _ in range(60):
+        world._computeContacts()
+        world._integrate(deltaTime)
+        # The per-body update of Rigidbody before the physics world, with the floor test done by hand.
+        for state in reference:
+            position, velocity, acceleration, solid, grounded = state
+            if solid:
+                touching = position.y - 5 < 0
+                if touching and not grounded:
+                    state[1], state[2], state[4] = Vector3(0, 0, 0), Vector3(0, 0, 0), True
+                    continue
+                state[4] = touching
+            state[0] = position + velocity * deltaTime
+            state[1] = velocity + acceleration * deltaTime
+        for rigidbody, (position, velocity, _, _, _) in zip(bodies, reference):
+            actual = rigidbody.gameObject.transform.position
+            assert (actual.x, actual.y) == (pytest.approx(position.x), pytest.approx(position.y))
+            assert (rigidbody.velocity.x, rigidbody.velocity.y) == (pytest.approx(velocity.x), pytest.approx(velocity.y))
+    assert sum(state[4] for state in reference) >= 5
+
+def test_calm_body_falls_asleep_and_stays_put():
+    obj = GameObject("body")
+    rigidbody = obj.addComponent(Rigidbody)
+    rigidbody.velocity = Vector3(0.5, 0, 0)
+    steps = PhysicsWorld.sleepSteps
+    for _ in range(steps - 1):
+        engine.SYSTEM.step(1 / 60)
+    assert not rigidbody.isSleeping
+    engine.SYSTEM.step(1 / 60)
+    assert rigidbody.isSleeping
+    assert rigidbody.velocity.x == 0
+    position = obj.transform.position.x
+    engine.SYSTEM.step(1 / 60)
+    assert obj.transform.position.x == position
+
+def test_sleeping_body_wakes_up():
+    obj = GameObject("body")
+    rigidbody = obj.addComponent(Rigidbody)
+    collider = obj.addComponent(Collider)
+    collider.contour = np.array([[-5, -5], [5, -5], [5, 5], [-5, 5]])
+    engine.SYSTEM.step(1 / 60)
+    
+    rigidbody.sleep()
+    rigidbody.velocity = Vector3(30, 0, 0)
+    assert not rigidbody.isSleeping
+    engine.SYSTEM.step(1 / 60)
+    assert obj.transform.position.x == pytest.approx(0.5)
+    
+    rigidbody.velocity = Vector3(0, 0, 0)
+    rigidbody.sleep()
+    rigidbody.applyForce(Vector3(10, 0, 0))
+    assert not rigidbody.isSleeping
+    
+    rigidbody.acceleration = Vector3(0, 0, 0)
+    rigidbody.sleep()
+    obj.transform.position = Vector3(200, 0, 0)
+    assert not rigidbody.isSleeping
+    
+    rigidbody.sleep()
+    box("wall", Vector3(205, 0, 0), 10, 10)
+    engine.SYSTEM.step(1 / 60)
+    assert not rigidbody.isSleeping
+    assert collider.check() is not None
+
+def test_ignored_layers_never_touch():
+    first, second = body("first", Vector3(0, 0, 0), 10, 10), body("second", Vector3(5, 0, 0), 10, 10)
+    enemy = body("enemy", Vector3(20, 0, 0), 20, 10)
+    first.layer = second.layer = 1
+    Physics.ignoreLayerCollision(1, 1)
+    try:
+        engine.SYSTEM.step(1 / 60)
+        world = engine.SYSTEM.currentScene.getSystem(PhysicsWorld)
+        assert {tuple(c.gameObject.name for c in pair) for pair in world.contacts} == {("second", "enemy")}
+        assert first.check() is None and second.check() is enemy
+        assert first.isTouchMany([second, enemy]).tolist() == [False, False]
+        assert second.isTouchMany([first, enemy]).tolist() == [False, True]
+        assert np.isnan(second.penetrationMany([first, enemy])[0]).all()
+        # Rays have no layer of their own, so they leave layers out through their mask.
+        hit = Physics.raycast(Vector3(-100, 0, 0), Vector3(1, 0, 0), layerMask=~(1 << 1))
+        assert hit is not None and hit.collider is enemy
+        Physics.ignoreLayerCollision(1, 1, False)
+        engine.SYSTEM.step(1 / 60)
+        assert first.check() is second
+        assert second.isTouchMany([first, enemy]).tolist() == [True, True]
+    finally:
+        Physics.ignoreLayerCollision(1, 1, False)
@@ -0,0 +1,331 @@
+import gc
+import cv2
+import os
+import weakref
+import numpy as np
+import pygame
+import engine
+from engine import Atlas, GameObject, Vector3
+from renderer import Camera, Debugger, Sprite, SpriteRenderer, runHeadless
+from renderer import TextCache
+from physic import Collider, Rigidbody
+
+
+def test_sprite_of_a_dropped_image_is_freed():
+    before = len(Sprite._cache)
+    for _ in range(100):
+        image = np.full((8, 8, 4), 255, dtype=np.uint8)
+        sprite = weakref.ref(Sprite.of(image))
+        del image
+    gc.collect()
+    assert sprite() is None
+    assert len(Sprite._cache) == before
+
+def test_sprite_of_a_kept_image_is_shared():
+    image = np.full((8, 8, 4), 255, dtype=np.uint8)
+    assert Sprite.of(image) is Sprite.of(image)
+    assert Sprite.of(image).image is image
+
+def test_sprite_of_an_atlas_view_is_not_copied():
+    atlas = Atlas(64)
+    atlas.add("a", np.full((8, 8, 4), 255, dtype=np.uint8))
+    sprite = Sprite.of(atlas["a"])
+    assert np.shares_memory(sprite.pixels, atlas.image)
+
+def test_culled_counts_only_sprites_with_an_image():
+    camera = GameObject("camera").addComponent(Camera)
+    surface = pygame.Surface((200, 100))
+    engine.SYSTEM.currentScene.surface = surface
+    inside = GameObject("inside").addComponent(SpriteRenderer)
+    inside.image = np.full((8, 8, 4), 255, dtype=np.uint8)
+    outside = GameObject("outside")
+    outside.transform.position = Vector3(5000, 0, 0)
+    outside.addComponent(SpriteRenderer).image = np.full((8, 8, 4), 255, dtype=np.uint8)
+    GameObject("empty").addComponent(SpriteRenderer)
+    camera.render(surface, engine.SYSTEM.currentScene.getAllComponents())
+    assert (camera.drawn, camera.culled) == (1, 1)
+
+
+WIDTH, HEIGHT = 320, 200
+CLEAR = (5, 6, 7, 255)
+
+def randomImage(rng: np.random.Generator) -> np.ndarray:
+    size = int(rng.integers(4, 40))
+    image = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+    kind = rng.integers(0, 3)
+    if kind == 0:
+        image[..., 3] = 255
+    elif kind == 1:
+        image[..., 3] = np.where(rng.random((size, size)) < 0.5, 0, 255)
+    return image
+
+def randomScene(rng: np.random.Generator, count: int, spread: float, depths: int) -> tuple[list[np.ndarray], list[GameObject]]:
+    images = [randomImage(rng) for _ in range(10)]
+    objects = []
+    for i in range(count):
+        obj = GameObject(f"sprite_{i}")
+        obj.transform.position = Vector3(*rng.uniform(-spread, spread, 2), float(rng.integers(0, depths)))
+        obj.addComponent(SpriteRenderer).image = images[i % len(images)]
+        objects.append(obj)
+    return images, objects
+
+def randomEdits(rng: np.random.Generator, camera: GameObject, images: list[np.ndarray], objects: list[GameObject], depths: int) -> None:
+    if rng.random() < 0.3:
+        camera.transform.position += Vector3(float(rng.integers(-5, 6)), float(rng.integers(-5, 6)), 0)
+    elif rng.random() < 0.1:
+        camera.transform.position += Vector3(*rng.uniform(-3, 3, 2), 0)
+    for _ in range(int(rng.integers(0, 4))):
+        obj = objects[rng.integers(len(objects))]
+        edit = rng.random()
+        if edit < 0.3:
+            obj.transform.position += Vector3(*rng.integers(-8, 9, 2).astype(float), 0)
+        elif edit < 0.5:
+            obj.transform.position.z = float(rng.integers(0, depths))
+        elif edit < 0.7:
+            obj.getComponent(SpriteRenderer).image = images[rng.integers(len(images))]
+        else:
+            obj.active = not obj.active
+
+def renderWith(camera: Camera, surface: pygame.Surface) -> np.ndarray:
+    engine.SYSTEM.currentScene.view = camera
+    camera.render(surface, engine.SYSTEM.currentScene.getAllComponents())
+    return camera.view
+
+def test_dirty_rendering_matches_full_redraw():
+    rng = np.random.default_rng(0)
+    engine.SYSTEM.currentScene.surface = pygame.Surface((WIDTH, HEIGHT))
+    cameraObject = GameObject("camera")
+    dirty, full = cameraObject.addComponent(Camera), cameraObject.addComponent(Camera)
+    dirty.dirtyRendering = True
+    dirty.clearColor = full.clearColor = CLEAR
+    images, objects = randomScene(rng, 150, 400, 3)
+    surfaces = pygame.Surface((WIDTH, HEIGHT)), pygame.Surface((WIDTH, HEIGHT))
+    for frame in range(100):
+        randomEdits(rng, cameraObject, images, objects, 3)
+        expected = renderWith(full, surfaces[1]).copy()
+        assert np.array_equal(renderWith(dirty, surfaces[0]), expected), f"frame {frame}"
+        assert pygame.image.tobytes(surfaces[0], "RGB") == pygame.image.tobytes(surfaces[1], "RGB")
+
+def paintedReference(camera: GameObject) -> np.ndarray:
+    """
+    Composites every sprite back to front, one at a time, with the rounding of Camera.show.
+    """
+    view = np.zeros((HEIGHT, WIDTH, 4), dtype=np.uint8)
+    view[...] = CLEAR
+    scene = engine.SYSTEM.currentScene
+    calls = []
+    renderers = [component for component in scene.getAllComponents() if isinstance(component, SpriteRenderer)]
+    for rank, sprite in enumerate(renderers):
+        image = sprite.image
+        if image is None:
+            continue
+        corner = sprite.gameObject.transform.renderPosition + sprite.delta + Vector3(-image.shape[1], image.shape[0], 0) / 2
+        screen = scene.viewToScreen(corner - camera.transform.renderPosition)
+        calls.append((screen.z, rank, int(screen.x), int(screen.y), image))
+    calls.sort(key=lambda call: call[:2])
+    for _, _, x, y, image in calls:
+        x0, x1 = max(x, 0), min(x + image.shape[1], WIDTH)
+        y0, y1 = max(y, 0), min(y + image.shape[0], HEIGHT)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        source = image[y0 - y:y1 - y, x0 - x:x1 - x].astype(np.uint32)
+        under = view[y0:y1, x0:x1].astype(np.uint32)
+        alpha = source[..., 3:4]
+        out = (source * alpha + under * (255 - alpha) + 127) // 255
+        out[..., 3] = (255 * alpha[..., 0] + under[..., 3] * (255 - alpha[..., 0]) + 127) // 255
+        view[y0:y1, x0:x1] = out
+    return view
+
+def floatShow(view: np.ndarray, depth: np.ndarray, image: np.ndarray, x: int, y: int, z: float) -> None:
+    """
+    Composites an image with its top-left corner at a screen position, with the per-pixel depth test
+    and the float blending Camera.show had before its integer kernel, as legacyShow in benchmarks/compositing.py.
+    """
+    x0, x1 = max(x, 0), min(x + image.shape[1], view.shape[1])
+    y0, y1 = max(y, 0), min(y + image.shape[0], view.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    source = image[y0 - y:y1 - y, x0 - x:x1 - x]
+    under = view[y0:y1, x0:x1]
+    alpha = source[..., 3] / 255.0
+    mask = (alpha > 0) & (z > depth[y0:y1, x0:x1])
+    depth[y0:y1, x0:x1][mask] = z
+    a = alpha[mask][:, np.newaxis]
+    under[mask, :3] = (a * source[mask, :3] + (1 - a) * under[mask, :3]).astype(np.uint8)
+    under[mask, 3] = (a[:, 0] * 255 + (1 - a[:, 0]) * under[mask, 3]).astype(np.uint8)
+
+def test_depth_buffer_matches_float_compositing():
+    rng = np.random.default_rng(2)
+    scene = engine.SYSTEM.currentScene
+    scene.surface = pygame.Surface((WIDTH, HEIGHT))
+    cameraObject = GameObject("camera")
+    single, banded = cameraObject.addComponent(Camera), cameraObject.addComponent(Camera)
+    single.clearColor = banded.clearColor = CLEAR
+    banded.workers = 3
+    images, objects = randomScene(rng, 300, 180, 5)
+    # Depths between the integers too, and ties, which the sprite drawn first wins.
+    for obj in objects[::3]:
+        obj.transform.position.z += float(rng.uniform(0, 1))
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    renderWith(single, surface)
+    
+    # Every sprite blended by Camera.show over the picture of the float blending so far: within 1 per channel,
+    # with the same depths.
+    view = np.empty((HEIGHT, WIDTH, 4), dtype=np.uint8)
+    view[...] = CLEAR
+    depth = np.full((HEIGHT, WIDTH), -np.inf, dtype=np.float32)
+    for sprite in scene.getComponents(SpriteRenderer):
+        image = sprite.image
+        corner = sprite.gameObject.transform.renderPosition + sprite.delta + Vector3(-image.shape[1], image.shape[0], 0) / 2
+        screen = single.worldToScreen(corner)
+        single.view[...] = view
+        single.z_buffer[...] = depth
+        sprite.draw()
+        floatShow(view, depth, image, int(screen.x), int(screen.y), screen.z)
+        assert int(np.abs(single.view.astype(np.int16) - view).max()) <= 1
+        assert np.array_equal(single.z_buffer, depth)
+    
+    # Whole frames, one thread and in bands, keep exactly the same depths.
+    for camera in (single, banded):
+        renderWith(camera, surface)
+        assert np.array_equal(camera.z_buffer, depth)
+    banded.close()
+
+def test_painter_mode_matches_brute_force_reference():
+    rng = np.random.default_rng(1)
+    engine.SYSTEM.currentScene.surface = pygame.Surface((WIDTH, HEIGHT))
+    cameraObject = GameObject("camera")
+    painter, dirty, banded = (cameraObject.addComponent(Camera) for _ in range(3))
+    for camera in (painter, dirty, banded):
+        camera.depthBuffer = False
+        camera.clearColor = CLEAR
+    dirty.dirtyRendering = True
+    banded.workers = 3
+    images, objects = randomScene(rng, 120, 200, 4)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    for frame in range(60):
+        randomEdits(rng, cameraObject, images, objects, 4)
+        view = renderWith(painter, surface).copy()
+        assert painter.z_buffer is None
+        assert int(np.abs(view.astype(np.int16) - paintedReference(cameraObject)).max()) <= 1, f"frame {frame}"
+        assert np.array_equal(renderWith(dirty, surface), view), f"frame {frame}"
+        assert np.array_equal(renderWith(banded, surface), view), f"frame {frame}"
+
+def test_band_threads_stop_with_the_camera():
+    engine.SYSTEM.currentScene.surface = pygame.Surface((64, 64))
+    camera = GameObject("camera").addComponent(Camera)
+    assert camera.workers == 1
+    camera.workers = 2
+    camera.render(engine.SYSTEM.currentScene.surface, engine.SYSTEM.currentScene.getAllComponents())
+    pool = camera._pool
+    assert pool is not None
+    camera.workers = 1
+    camera.render(engine.SYSTEM.currentScene.surface, engine.SYSTEM.currentScene.getAllComponents())
+    assert camera._pool is None and pool._shutdown
+
+    # A camera of a scene that is dropped.
+    engine.SYSTEM.currentScene = engine.Scene()
+    engine.SYSTEM.currentScene.surface = pygame.Surface((64, 64))
+    camera = GameObject("camera").addComponent(Camera)
+    camera.workers = 2
+    camera.render(engine.SYSTEM.currentScene.surface, engine.SYSTEM.currentScene.getAllComponents())
+    pool = camera._pool
+    engine.SYSTEM.currentScene = engine.Scene()
+    del camera
+    gc.collect()
+    assert pool._shutdown
+
+def test_run_headless_leaves_the_video_driver_alone(monkeypatch):
+    monkeypatch.delenv("SDL_VIDEODRIVER", raising=False)
+    pygame.display.quit()
+    runHeadless(1, render=False)
+    assert "SDL_VIDEODRIVER" not in os.environ
+    monkeypatch.setenv("SDL_VIDEODRIVER", "x11")
+    runHeadless(1, render=False)
+    assert os.environ["SDL_VIDEODRIVER"] == "x11"
+
+MIXED = "Ågjpqy aÅb|()"
+
+def test_pygame_text_lines_up_like_whole_string_rendering():
+    for size in (16, 36):
+        font = TextCache.font("arial", size)
+        for background in ((0, 0, 0, 0), (40, 30, 20, 255)):
+            for text in (MIXED, "ag", "gÅ", "a"):
+                image = TextCache.render(text, font, (255, 255, 255, 255), background)
+                expected = pygame.surfarray.pixels_alpha(font.render(text, True, (255, 255, 255))).T
+                assert image.shape[0] == expected.shape[0]
+                if background[3] == 0:
+                    assert np.array_equal(image[..., 3].any(axis=1), expected.any(axis=1))
+
+def test_hershey_text_matches_put_text():
+    color, background = (10, 200, 30, 255), (0, 0, 0, 255)
+    for text in ("Agjpqy|()", MIXED.encode("ascii", "ignore").decode()):
+        image = TextCache.render(text, cv2.FONT_HERSHEY_SIMPLEX, color, background, 0.8, 2)
+        (width, height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+        expected = np.empty((height + baseline + 4, width + 4, 4), dtype=np.uint8)
+        expected[...] = background
+        cv2.putText(expected, text, (2, 2 + height), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+        assert np.array_equal(image, expected)
+
+def test_profiled_frames_with_a_debugger():
+    camera = GameObject("camera")
+    camera.addComponent(Camera)
+    camera.addComponent(Debugger)
+    GameObject("sprite").addComponent(SpriteRenderer).image = np.full((8, 8, 4), 255, dtype=np.uint8)
+    engine.Profiler.clear()
+    engine.Profiler.enabled = True
+    try:
+        assert runHeadless(3, size=(160, 120)) == 3
+        frames = list(engine.Profiler.frames)
+        assert len(frames) == 3
+        assert {"update", "render"} <= set(frames[-1].totals)
+        counters = engine.Profiler.counters
+        assert counters["render.drawn"] >= 1 and counters["scene.components"] >= 3
+        assert counters["engine.vectors"] > 0
+        assert engine.Profiler.top(categories=("phase",))
+    finally:
+        engine.Profiler.enabled = False
+        engine.Profiler.clear()
+    assert Vector3._onCreate is None
+
+def simulate(seed: int) -> tuple[list[tuple[float, float, float]], np.ndarray]:
+    """
+    Builds a scene of falling bodies landing on a floor and runs it headless.
+    :return: The final world position of every object and the last rendered view.
+    """
+    engine.SYSTEM.currentScene = engine.Scene()
+    rng = np.random.default_rng(seed)
+    cameraObject = GameObject("camera")
+    camera = cameraObject.addComponent(Camera)
+    camera.clearColor = CLEAR
+    floor = GameObject("floor")
+    floor.transform.position = Vector3(0, -80, 1)
+    floor.addComponent(Collider).contour = np.array([[-160.0, -10.0], [160.0, -10.0], [160.0, 10.0], [-160.0, 10.0]])
+    floor.addComponent(SpriteRenderer).image = np.full((20, 320, 4), 200, dtype=np.uint8)
+    objects = [cameraObject, floor]
+    for i in range(30):
+        obj = GameObject(f"body_{i}")
+        obj.transform.position = Vector3(float(rng.uniform(-150, 150)), float(rng.uniform(-40, 90)), float(rng.integers(0, 3)))
+        obj.addComponent(SpriteRenderer).image = randomImage(rng)
+        obj.addComponent(Collider).contour = np.array([[-4.0, -4.0], [4.0, -4.0], [4.0, 4.0], [-4.0, 4.0]])
+        body = obj.addComponent(Rigidbody)
+        body.velocity = Vector3(float(rng.uniform(-30, 30)), float(rng.uniform(-20, 40)), 0)
+        body.acceleration = Vector3(0, -98, 0)
+        objects.append(obj)
+    runHeadless(90, deltaTime=1 / 60, size=(WIDTH, HEIGHT))
+    positions = [(obj.transform.position.x, obj.transform.position.y, obj.transform.position.z) for obj in objects]
+    return positions, camera.view.copy()
+
+def test_headless_runs_are_deterministic(monkeypatch):
+    # Fixed steps that do not line up with the frames, so the accumulator and the interpolation take part.
+    monkeypatch.setattr(engine.Time, "fixedScale", 1 / 50)
+    try:
+        positions, view = simulate(3)
+        again, viewAgain = simulate(3)
+        other, _ = simulate(4)
+    finally:
+        engine.Time.start()
+    assert positions == again
+    assert np.array_equal(view, viewAgain)
+    assert (view[..., :3] != CLEAR[:3]).any()
+    assert positions != other
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+import pygame
+import engine
+from engine import GameObject, Vector3
+from physic import Physics
+from renderer import Camera, SpriteRenderer
+from tilemap import Tilemap
+
+TILE = 32
+ORIGIN = Vector3(-700.0, 300.0, 0)
+
+def randomMap(rng: np.random.Generator) -> tuple[list[list[np.ndarray]], np.ndarray]:
+    tileset = [[rng.integers(0, 256, (16, 16, 4), dtype=np.uint8) for _ in range(3)] for _ in range(2)]
+    for row in tileset:
+        for tile in row:
+            tile[..., 3] = np.where(rng.random((16, 16)) < 0.3, 0, 255)
+    grid = rng.integers(0, 7, (40, 50))
+    grid[rng.random(grid.shape) < 0.4] = 0
+    return tileset, grid
+
+def makeTilemap(tileset: list[list[np.ndarray]], grid: np.ndarray) -> Tilemap:
+    obj = GameObject("map")
+    obj.transform.position = ORIGIN
+    tilemap = obj.addComponent(Tilemap)
+    tilemap.setTileset(tileset, TILE, TILE)
+    tilemap.grid = grid
+    tilemap.apply()
+    return tilemap
+
+def assertCollidersMatchTiles(tilemap: Tilemap, grid: np.ndarray) -> None:
+    # A per-tile collider sits under every solid cell center and none under the others;
+    # the merged rectangles must give the same answer everywhere without overlapping.
+    colliders = [collider for chunk in tilemap._chunks.values() for collider in chunk.colliders if collider.contour is not None]
+    area = 0.0
+    for collider in colliders:
+        x0, y0, x1, y1 = collider.bounds # type: ignore
+        area += (x1 - x0) * (y1 - y0)
+    assert area == np.count_nonzero(grid) * TILE * TILE
+    for row in range(grid.shape[0]):
+        for column in range(grid.shape[1]):
+            hits = [hit for hit in Physics.overlapPoint(tilemap.cellToWorld(column, row)) if hit in colliders]
+            assert len(hits) == (1 if grid[row, column] else 0), (column, row)
+
+def test_merged_colliders_cover_exactly_the_solid_tiles():
+    tileset, grid = randomMap(np.random.default_rng(0))
+    tilemap = makeTilemap(tileset, grid)
+    assertCollidersMatchTiles(tilemap, grid)
+    assert sum(len(chunk.colliders) for chunk in tilemap._chunks.values()) < np.count_nonzero(grid)
+    tilemap.setTile(20, 35, 0)
+    tilemap.setTile(21, 35, 5)
+    tilemap.apply()
+    grid[35, 20], grid[35, 21] = 0, 5
+    assertCollidersMatchTiles(tilemap, grid)
+
+def test_baked_chunks_look_like_one_sprite_per_tile():
+    tileset, grid = randomMap(np.random.default_rng(1))
+    surface = pygame.Surface((1024, 512))
+    engine.SYSTEM.currentScene.surface = surface
+    camera = GameObject("camera").addComponent(Camera)
+    tiles = [tile for row in tileset for tile in row]
+    perTile = []
+    for row, column in zip(*np.nonzero(grid)):
+        obj = GameObject(f"tile_{column}_{row}")
+        obj.transform.position = ORIGIN + Vector3(column * TILE, -row * TILE, 0)
+        obj.addComponent(SpriteRenderer).image = cv2.resize(tiles[grid[row, column] - 1], (TILE, TILE), interpolation=cv2.INTER_NEAREST)
+        perTile.append(obj)
+    camera.render(surface, engine.SYSTEM.currentScene.getAllComponents())
+    expected = camera.view.copy()
+    for obj in perTile:
+        obj.active = False
+    makeTilemap(tileset, grid)
+    camera.render(surface, engine.SYSTEM.currentScene.getAllComponents())
+    assert np.array_equal(camera.view, expected)
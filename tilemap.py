@@ -0,0 +1,212 @@
+from typing import Sequence
+import cv2
+from numpy.typing import NDArray
+import numpy as np
+import engine
+import physic
+import renderer
+
+
+
+class _Chunk:
+    """
+    One square block of a Tilemap: a child GameObject drawing the block as a single baked image,
+    with one Collider per merged rectangle of solid tiles.
+    """
+    def __init__(self, tilemap: "Tilemap", column: int, row: int) -> None:
+        self.gameObject = engine.GameObject(f"{tilemap.gameObject.name}_chunk_{column}_{row}", tilemap.gameObject.transform)
+        self.renderer: renderer.SpriteRenderer = self.gameObject.addComponent(renderer.SpriteRenderer)
+        self.colliders: list[physic.Collider] = []
+
+class Tilemap(engine.Component):
+    """
+    A grid of tiles, drawn and collided per chunk of chunkSize x chunkSize tiles instead of per tile.
+    Each chunk is baked once into one image and its solid tiles are merged into few rectangles;
+    editing a tile only bakes its chunk again, during the next update of the scene.
+    The center of the tile at column 0, row 0 is at the position of the GameObject, and rows go down.
+    """
+    chunkSize: int = 16
+    def __init__(self, gameObject: engine.GameObject) -> None:
+        super().__init__(gameObject)
+        self.tileWidth: int = 32
+        self.tileHeight: int = 32
+        self._tiles: list[cv2.typing.MatLike] = []
+        self._grid: NDArray[np.int32] = np.zeros((0, 0), dtype=np.int32)
+        self._solid: set[int] | None = None
+        self._chunks: dict[tuple[int, int], _Chunk] = {}
+        self._dirty: set[tuple[int, int]] = set()
+        gameObject.transform.scene.getSystem(TilemapBaker)
+
+    def setTileset(self, tileset: Sequence[Sequence[cv2.typing.MatLike]], tileWidth: int | None = None, tileHeight: int | None = None) -> None:
+        """
+        Sets the images of the tiles, as returned by Asset.splitTileMap.
+        Tile 0 is empty; tile i is the i-th image of the tileset read row by row, starting at 1.
+        :param tileset: The rows of tile images.
+        :param tileWidth: The width to draw each tile at, in pixels. Defaults to the width of the first tile.
+        :param tileHeight: The height to draw each tile at, in pixels. Defaults to the height of the first tile.
+        """
+        tiles = [tile for row in tileset for tile in row]
+        if not tiles:
+            raise ValueError("The tileset has no tiles.")
+        self.tileWidth = tileWidth if tileWidth is not None else tiles[0].shape[1]
+        self.tileHeight = tileHeight if tileHeight is not None else tiles[0].shape[0]
+        self._tiles = [
+            tile if tile.shape[:2] == (self.tileHeight, self.tileWidth) else
+            cv2.resize(tile, (self.tileWidth, self.tileHeight), interpolation=cv2.INTER_NEAREST)
+            for tile in tiles
+        ]
+        self._markAll()
+    @property
+    def grid(self) -> NDArray[np.int32]:
+        """
+        The tile index of every cell, as an array of shape (rows, columns). Use setTile to edit it.
+        Assigning a list of rows replaces the whole map; shorter rows are padded with empty tiles.
+        """
+        return self._grid
+    @grid.setter
+    def grid(self, value: Sequence[Sequence[int]] | NDArray[np.integer]) -> None:
+        width = max((len(row) for row in value), default=0)
+        grid = np.zeros((len(value), width), dtype=np.int32)
+        for y, row in enumerate(value):
+            grid[y, :len(row)] = row
+        self._grid = grid
+        self._markAll()
+    @property
+    def solid(self) -> set[int] | None:
+        """
+        The tile indices that collide, or None if every non-empty tile does.
+        """
+        return self._solid
+    @solid.setter
+    def solid(self, value: set[int] | None) -> None:
+        self._solid = None if value is None else set(value)
+        self._markAll()
+
+    def getTile(self, column: int, row: int) -> int:
+        """
+        Returns the tile index of a cell, 0 if it is empty or outside the grid.
+        """
+        if 0 <= row < self._grid.shape[0] and 0 <= column < self._grid.shape[1]:
+            return int(self._grid[row, column])
+        return 0
+    def setTile(self, column: int, row: int, tile: int) -> None:
+        """
+        Changes the tile of a cell. Only the chunk holding the cell is baked again.
+        :param column: The column of the cell, inside the grid.
+        :param row: The row of the cell, inside the grid.
+        :param tile: The new tile index, 0 for empty.
+        """
+        if not (0 <= row < self._grid.shape[0] and 0 <= column < self._grid.shape[1]):
+            raise IndexError(f"Cell ({column}, {row}) is outside the {self._grid.shape[1]}x{self._grid.shape[0]} grid.")
+        if self._grid[row, column] == tile:
+            return
+        self._grid[row, column] = tile
+        self._dirty.add((column // self.chunkSize, row // self.chunkSize))
+    def worldToCell(self, pos: engine.Vector3) -> tuple[int, int]:
+        """
+        Returns the (column, row) of the cell covering a world position. It may lie outside the grid.
+        """
+        origin = self.gameObject.transform.position
+        column = int(np.floor((pos.x - origin.x) / self.tileWidth + 0.5))
+        row = int(np.floor((origin.y - pos.y) / self.tileHeight + 0.5))
+        return column, row
+    def cellToWorld(self, column: int, row: int) -> engine.Vector3:
+        """
+        Returns the world position of the center of a cell.
+        """
+        origin = self.gameObject.transform.position
+        return engine.Vector3(origin.x + column * self.tileWidth, origin.y - row * self.tileHeight, origin.z)
+
+    def apply(self) -> None:
+        """
+        Bakes the chunks changed since the last bake right away, instead of during the next update.
+        """
+        dirty, self._dirty = self._dirty, set()
+        for key in sorted(dirty):
+            self._bake(*key)
+    def _markAll(self) -> None:
+        rows, columns = self._grid.shape
+        size = self.chunkSize
+        self._dirty.update((x, y) for y in range(-(-rows // size)) for x in range(-(-columns // size)))
+        # Chunks beyond a shrunk grid are baked empty.
+        self._dirty.update(self._chunks)
+    def _bake(self, chunkX: int, chunkY: int) -> None:
+        size = self.chunkSize
+        cells = self._grid[chunkY * size:(chunkY + 1) * size, chunkX * size:(chunkX + 1) * size]
+        chunk = self._chunks.get((chunkX, chunkY))
+        if chunk is None:
+            if not cells.any():
+                return
+            chunk = self._chunks[(chunkX, chunkY)] = _Chunk(self, chunkX, chunkY)
+        rows, columns = cells.shape
+        width, height = self.tileWidth, self.tileHeight
+        # The chunk is centered on its image: offset from the center of its first tile.
+        chunk.gameObject.transform.localPosition = engine.Vector3(
+            (chunkX * size - 0.5) * width + columns * width / 2,
+            -(chunkY * size - 0.5) * height - rows * height / 2,
+            0
+        )
+
+        if not cells.any():
+            chunk.renderer.image = None
+        else:
+            image = np.zeros((rows * height, columns * width, 4), dtype=np.uint8)
+            for y, x in zip(*np.nonzero(cells)):
+                tile = self._tiles[cells[y, x] - 1]
+                target = image[y * height:(y + 1) * height, x * width:(x + 1) * width]
+                target[:tile.shape[0], :tile.shape[1]] = tile[:height, :width]
+            chunk.renderer.image = image
+
+        solid = cells != 0 if self._solid is None else np.isin(cells, list(self._solid))
+        rects = _mergeCells(solid)
+        while len(chunk.colliders) < len(rects):
+            chunk.colliders.append(chunk.gameObject.addComponent(physic.Collider))
+        for collider, (x0, y0, x1, y1) in zip(chunk.colliders, rects):
+            left, right = x0 * width - columns * width / 2, x1 * width - columns * width / 2
+            top, bottom = rows * height / 2 - y0 * height, rows * height / 2 - y1 * height
+            collider.contour = np.array([[left, bottom], [right, bottom], [right, top], [left, top]])
+        for collider in chunk.colliders[len(rects):]:
+            collider.contour = None
+
+def _mergeCells(solid: NDArray[np.bool_]) -> list[tuple[int, int, int, int]]:
+    """
+    Covers the true cells of a grid with few rectangles: each one grows from its first free cell
+    to the right as far as it can, then down while the whole span is free.
+    :param solid: The cells to cover, as an array of shape (rows, columns).
+    :return: The rectangles as (x0, y0, x1, y1) in cells, ends excluded.
+    """
+    free = solid.copy()
+    rows, columns = free.shape
+    rects: list[tuple[int, int, int, int]] = []
+    for y0, x0 in zip(*np.nonzero(solid)):
+        if not free[y0, x0]:
+            continue
+        x1 = x0 + 1
+        while x1 < columns and free[y0, x1]:
+            x1 += 1
+        y1 = y0 + 1
+        while y1 < rows and free[y1, x0:x1].all():
+            y1 += 1
+        free[y0:y1, x0:x1] = False
+        rects.append((int(x0), int(y0), int(x1), int(y1)))
+    return rects
+
+class TilemapBaker(engine.SceneSystem):
+    """
+    Bakes the edited chunks of every Tilemap of a scene once per frame, after all the components
+    have updated and before the fixed steps and the rendering.
+    """
+    def __init__(self, scene: engine.Scene) -> None:
+        super().__init__(scene)
+        self.tilemaps: dict[Tilemap, None] = {}
+
+    def onComponentAdded(self, component: engine.Component) -> None:
+        if isinstance(component, Tilemap):
+            self.tilemaps[component] = None
+    def onComponentRemoved(self, component: engine.Component) -> None:
+        if isinstance(component, Tilemap):
+            self.tilemaps.pop(component, None)
+    def update(self) -> None:
+        for tilemap in self.tilemaps:
+            if tilemap._dirty:
+                tilemap.apply()
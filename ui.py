@@ -21,15 +21,12 @@ class Button(engine.Behaviour):
         self.spriteRenderer = self.gameObject.getComponent(renderer.SpriteRenderer)
     
     def update(self):
-        image = self.spriteRenderer.image
-        if image is None: return
+        if self.spriteRenderer.image is None: return
         if not engine.Input.isUp("mouse-left"): return
         
-        width, height = image.shape[1], image.shape[0]
-        clicked = self.gameObject.transform.scene.screenToWorld(engine.Input.getMousePosition())
-        x, y = clicked.x, clicked.y
-        pos = self.gameObject.transform.position
-        if pos.x - width/2 <= x <= pos.x + width/2 and pos.y - height/2 <= y <= pos.y + height/2:
+        scene = self.gameObject.transform.scene
+        clicked = scene.screenToWorld(engine.Input.getMousePosition())
+        if self.spriteRenderer in scene.getSystem(renderer.SpriteIndex).overlapPoint(clicked):
             if self.onClick: self.onClick()
 
 #Label도 굳이 만들어야하나 의문
@@ -43,6 +40,7 @@ class Entry(engine.Behaviour):
         self.background_color: tuple[int, int, int, int] = (255, 255, 255, 255)
         self.font_scale: float = 1
         self.thickness: int = 2
+        self._shown: tuple | None = None
 
     def update(self) -> None:
         # 마우스 클릭으로 포커스 판단
@@ -55,14 +53,25 @@ class Entry(engine.Behaviour):
             else:
                 self.focused = False
 
-        # 텍스트 이미지 만들기
+        # 텍스트 이미지 만들기, 내용이 바뀔 때만
         spriteRenderer = self.gameObject.getComponent(renderer.SpriteRenderer)
         if spriteRenderer:
-            img = np.ones((50, 200, 4), dtype=np.uint8) * 255
-            img[:, :] = self.background_color
             display_text = self.text + ("|" if self.focused else "")
-            cv2.putText(img, display_text, (5, 35), cv2.FONT_HERSHEY_SIMPLEX,
-                        self.font_scale, self.font_color, self.thickness)
+            shown = (display_text, tuple(self.font_color), tuple(self.background_color), self.font_scale, self.thickness)
+            if shown == self._shown and spriteRenderer.image is not None:
+                return
+            self._shown = shown
+            img = np.empty((50, 200, 4), dtype=np.uint8)
+            img[:, :] = self.background_color
+            text = renderer.TextCache.render(display_text, cv2.FONT_HERSHEY_SIMPLEX, self.font_color, self.background_color,
+                                             self.font_scale, self.thickness)
+            # The baseline starts at (5, 35), like cv2.putText at that origin.
+            (_, height), _ = cv2.getTextSize(display_text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, self.thickness)
+            x, y = 5 - self.thickness, 35 - height - self.thickness
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + text.shape[1], img.shape[1]), min(y + text.shape[0], img.shape[0])
+            if x0 < x1 and y0 < y1:
+                img[y0:y1, x0:x1] = text[y0 - y:y1 - y, x0 - x:x1 - x]
             spriteRenderer.image = img
 
 